@@ -0,0 +1 @@
+"""Pipeline benchmarks on synthetic data."""
@@ -0,0 +1,234 @@
+"""Synthetic datasets matching the schemas of the sample and exercise CSVs.
+
+Every generator writes its CSV in chunks of ``CHUNK_ROWS`` rows, so memory
+stays flat from 1e3 up to 1e8 rows, and is deterministic for a given seed.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+import numpy as np
+import pandas as pd
+
+# Rows generated and written per chunk
+CHUNK_ROWS = 1_000_000
+
+COUNTRIES = np.array(["SE", "ES", "US", "DE", "FR", "GB", "BR", "IN"])
+EVENT_TYPES = np.array(["page_view", "click"])
+
+START = datetime(2025, 3, 1)
+
+
+def _chunks(rows: int):
+    """Yield (offset, size) pairs covering ``rows`` in CHUNK_ROWS steps."""
+    for offset in range(0, rows, CHUNK_ROWS):
+        yield offset, min(CHUNK_ROWS, rows - offset)
+
+
+def _write(path: Path, frames) -> Path:
+    """Write DataFrame chunks to one CSV, header first."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        header = True
+        for frame in frames:
+            frame.to_csv(f, index=False, header=header)
+            header = False
+    return path
+
+
+def _timestamps(rng, size: int, start: datetime, seconds: int) -> pd.Series:
+    """Uniform random timestamps in [start, start + seconds)."""
+    offsets = rng.integers(0, seconds, size=size)
+    return pd.Series(pd.Timestamp(start) + pd.to_timedelta(offsets, unit="s"))
+
+
+def generate_sample_data(path: str, rows: int, seed: int = 0) -> Path:
+    """Generate ``data/sample_data.csv``-style rows (id,name,email,created_at,amount).
+    
+    About 2% of emails are empty, so the staging quality flag has both values.
+    
+    Args:
+        path: Output CSV path
+        rows: Number of rows
+        seed: Random seed
+    
+    Returns:
+        Path of the CSV
+    """
+    rng = np.random.default_rng(seed)
+    
+    def frames():
+        for offset, size in _chunks(rows):
+            ids = np.arange(offset + 1, offset + size + 1)
+            emails = pd.Series(ids).map("user{}@example.com".format)
+            emails[rng.random(size) < 0.02] = ""
+            yield pd.DataFrame({
+                "id": ids,
+                "name": pd.Series(ids).map("User {}".format),
+                "email": emails,
+                "created_at": _timestamps(rng, size, START, 30 * 86400)
+                    .dt.strftime("%Y-%m-%d %H:%M:%S"),
+                "amount": rng.integers(100, 50_000, size=size) / 100,
+            })
+    
+    return _write(Path(path), frames())
+
+
+def generate_users(path: str, rows: int, seed: int = 0) -> Path:
+    """Generate batch level 1 users (user_id,country,signup_date).
+    
+    Args:
+        path: Output CSV path
+        rows: Number of users
+        seed: Random seed
+    
+    Returns:
+        Path of the CSV
+    """
+    rng = np.random.default_rng(seed)
+    
+    def frames():
+        for offset, size in _chunks(rows):
+            yield pd.DataFrame({
+                "user_id": [f"U{i}" for i in range(offset + 1, offset + size + 1)],
+                "country": rng.choice(COUNTRIES, size=size),
+                "signup_date": _timestamps(rng, size, datetime(2024, 1, 1), 425 * 86400)
+                    .dt.strftime("%Y-%m-%d"),
+            })
+    
+    return _write(Path(path), frames())
+
+
+def generate_payments(path: str, rows: int, users: int, seed: int = 0) -> Path:
+    """Generate batch level 1 payments (user_id,amount,ts).
+    
+    About 5% of payments reference user ids outside ``users``, exercising
+    the UNKNOWN branch of the report.
+    
+    Args:
+        path: Output CSV path
+        rows: Number of payments
+        users: Number of generated users
+        seed: Random seed
+    
+    Returns:
+        Path of the CSV
+    """
+    rng = np.random.default_rng(seed + 1)
+    id_range = max(1, int(users * 1.05))
+    
+    def frames():
+        for _, size in _chunks(rows):
+            yield pd.DataFrame({
+                "user_id": pd.Series(rng.integers(1, id_range + 1, size=size)).map("U{}".format),
+                "amount": rng.integers(1, 500, size=size),
+                "ts": _timestamps(rng, size, START, 10 * 86400)
+                    .dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            })
+    
+    return _write(Path(path), frames())
+
+
+def generate_events(
+    output_dir: str,
+    rows: int,
+    days: int = 3,
+    users: int = 1000,
+    duplicate_rate: float = 0.02,
+    seed: int = 0
+) -> List[Path]:
+    """Generate batch level 2 event files (user_id,ts,event_type,event_id).
+    
+    Rows are spread over one ``events_YYYY-MM-DD.csv`` per day. A fraction of
+    each day's events is re-sent in the next day's file, so deduplication on
+    event_id has work to do.
+    
+    Args:
+        output_dir: Directory for the event files
+        rows: Total number of events (before duplicates)
+        days: Number of daily files
+        users: Number of distinct users
+        duplicate_rate: Fraction of events repeated in the following file
+        seed: Random seed
+    
+    Returns:
+        Paths of the event files in date order
+    """
+    rng = np.random.default_rng(seed + 2)
+    per_day = -(-rows // days)
+    paths = []
+    resend = None
+    
+    for day in range(days):
+        day_start = START + timedelta(days=day)
+        first_id = day * per_day
+        day_rows = max(0, min(per_day, rows - first_id))
+        
+        def frames(day_start=day_start, first_id=first_id, day_rows=day_rows, carry=resend):
+            if carry is not None:
+                yield carry
+            for offset, size in _chunks(day_rows):
+                ids = np.arange(first_id + offset, first_id + offset + size)
+                yield pd.DataFrame({
+                    "user_id": pd.Series(rng.integers(1, users + 1, size=size)).map("U{}".format),
+                    "ts": _timestamps(rng, size, day_start, 86400)
+                        .dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "event_type": rng.choice(EVENT_TYPES, size=size, p=[0.8, 0.2]),
+                    "event_id": pd.Series(ids).map("evt_{:09d}".format),
+                })
+        
+        path = Path(output_dir) / f"events_{day_start:%Y-%m-%d}.csv"
+        _write(path, frames())
+        paths.append(path)
+        
+        # Resend a sample of today's events in tomorrow's file
+        sample = pd.read_csv(path, nrows=min(day_rows, CHUNK_ROWS))
+        resend = sample.sample(frac=duplicate_rate, random_state=seed + day)
+    
+    return paths
+
+
+def generate_sensor_stream(
+    path: str,
+    rows: int,
+    devices: int = 10,
+    duplicate_rate: float = 0.01,
+    late_rate: float = 0.01,
+    seed: int = 0
+) -> Path:
+    """Generate a streaming level 1 sensor stream (device_id,ts,temperature,humidity,event_id).
+    
+    Devices report about once a minute each. Rows are in arrival order: a
+    fraction arrive a few minutes late and a fraction are duplicated.
+    
+    Args:
+        path: Output CSV path
+        rows: Number of readings (before duplicates)
+        devices: Number of devices
+        duplicate_rate: Fraction of readings delivered twice
+        late_rate: Fraction of readings delivered 1-15 minutes late
+        seed: Random seed
+    
+    Returns:
+        Path of the CSV
+    """
+    rng = np.random.default_rng(seed + 3)
+    
+    def frames():
+        for offset, size in _chunks(rows):
+            seq = np.arange(offset, offset + size)
+            seconds = (seq // devices) * 60 + rng.integers(0, 60, size=size)
+            late = rng.random(size) < late_rate
+            seconds[late] -= rng.integers(60, 900, size=int(late.sum()))
+            frame = pd.DataFrame({
+                "device_id": pd.Series(seq % devices + 1).map("device_{:03d}".format),
+                "ts": (pd.Timestamp(START) + pd.to_timedelta(seconds, unit="s"))
+                    .strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "temperature": np.round(rng.normal(22.5, 1.5, size=size), 1),
+                "humidity": np.round(rng.normal(45.0, 3.0, size=size), 1),
+                "event_id": pd.Series(seq).map("sensor_{:09d}".format),
+            })
+            duplicates = frame[rng.random(size) < duplicate_rate]
+            yield pd.concat([frame, duplicates]).sort_index(kind="stable")
+    
+    return _write(Path(path), frames())
@@ -0,0 +1,331 @@
+"""Time each pipeline stage on synthetic data and report the results as JSON.
+
+Each stage runs in a fresh subprocess so its peak RSS is its own. Ingestion
+and transformation run on the local backend (see ``src/local_backend.py``),
+so no GCP project is needed.
+
+Usage:
+    python -m benchmarks.run --rows 1e6 --output results.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Empty
+from typing import Optional, List, Dict, Any
+from benchmarks import generators
+from src.metrics import peak_rss_bytes
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+EXERCISES_DIR = PROJECT_ROOT / "exercises"
+
+STAGES = ["ingest", "transform", "batch_level_1", "batch_level_2", "streaming_level_1"]
+
+# Generated datasets each stage reads
+STAGE_DATASETS = {
+    "ingest": ["sample_data"],
+    "transform": ["sample_data"],
+    "batch_level_1": ["users", "payments"],
+    "batch_level_2": ["events"],
+    "streaming_level_1": ["sensor_stream"],
+}
+
+# Stages run in fresh interpreters so their peak RSS is their own
+START_METHOD = "spawn"
+
+# Seconds between checks that a stage process is still alive
+POLL_SECONDS = 1.0
+
+
+def _load_reference_solution(exercise: str):
+    """Import an exercise's reference_solution.py as a module."""
+    path = EXERCISES_DIR / exercise / "reference_solution.py"
+    spec = importlib.util.spec_from_file_location(f"{exercise}_reference_solution", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _use_local_backend(workdir: Path) -> None:
+    """Point the pipeline config at a local warehouse inside the work directory."""
+    from src.config import Config
+    
+    Config.PIPELINE_BACKEND = "local"
+    Config.GCP_PROJECT_ID = Config.GCP_PROJECT_ID or "benchmark"
+    Config.LOCAL_WAREHOUSE_DIR = workdir / "warehouse"
+    Config.INGEST_MANIFEST_PATH = workdir / "config" / "ingestion_manifest.json"
+    Config.SCHEMA_DIR = workdir / "config" / "schemas"
+    Config.CHUNK_STATE_DIR = workdir / "config" / "chunk_state"
+
+
+def run_ingest(workdir: Path) -> None:
+    """Load the generated sample table into the local warehouse."""
+    _use_local_backend(workdir)
+    from src.ingestion import DataIngestion
+    
+    summaries = DataIngestion().ingest_directory(str(workdir / "data"), force=True)
+    failed = [summary["file"] for summary in summaries if summary["error"]]
+    if failed:
+        raise RuntimeError(f"Ingestion failed for {failed}")
+
+
+def run_transform(workdir: Path) -> None:
+    """Build every SQL model from the ingested sample table."""
+    _use_local_backend(workdir)
+    from src.transformation import DataTransformation
+    
+    DataTransformation().run_full_pipeline(full_refresh=True)
+
+
+def run_batch_level_1(workdir: Path) -> None:
+    """Build the country revenue report from generated users and payments."""
+    solution = _load_reference_solution("batch_level_1")
+    solution.build_daily_country_signup_report(
+        run_date="2025-03-10",
+        users_path=str(workdir / "batch_level_1" / "users.csv"),
+        payments_path=str(workdir / "batch_level_1" / "payments.csv")
+    )
+
+
+def run_batch_level_2(workdir: Path) -> None:
+    """Build user_daily from the generated event files."""
+    solution = _load_reference_solution("batch_level_2")
+    files = sorted((workdir / "batch_level_2").glob("events_*.csv"))
+    solution.build_user_daily(run_date="2025-03-03", new_files=[str(f) for f in files])
+
+
+def run_streaming_level_1(workdir: Path) -> None:
+    """Compute sliding window device stats over the generated sensor stream."""
+    solution = _load_reference_solution("streaming_level_1")
+    solution.process_device_stats_batch_simulation(
+        str(workdir / "streaming_level_1" / "sensor_stream.csv")
+    )
+
+
+STAGE_FUNCTIONS = {
+    "ingest": run_ingest,
+    "transform": run_transform,
+    "batch_level_1": run_batch_level_1,
+    "batch_level_2": run_batch_level_2,
+    "streaming_level_1": run_streaming_level_1,
+}
+
+
+def generate_datasets(
+    workdir: Path,
+    rows: int,
+    seed: int = 0,
+    names: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Generate input datasets into the work directory.
+    
+    Args:
+        workdir: Benchmark work directory
+        rows: Rows per dataset (users are a tenth of that)
+        seed: Random seed
+        names: Datasets to generate (default: all)
+    
+    Returns:
+        Rows, bytes and generation seconds per dataset
+    """
+    users = max(1, rows // 10)
+    jobs = {
+        # The SQL models read raw_data.sample_table
+        "sample_data": lambda: [generators.generate_sample_data(
+            workdir / "data" / "sample_table.csv", rows, seed)],
+        "users": lambda: [generators.generate_users(
+            workdir / "batch_level_1" / "users.csv", users, seed)],
+        "payments": lambda: [generators.generate_payments(
+            workdir / "batch_level_1" / "payments.csv", rows, users, seed)],
+        "events": lambda: generators.generate_events(
+            workdir / "batch_level_2", rows, users=users, seed=seed),
+        "sensor_stream": lambda: [generators.generate_sensor_stream(
+            workdir / "streaming_level_1" / "sensor_stream.csv", rows, seed=seed)],
+    }
+    
+    datasets = {}
+    for name, generate in jobs.items():
+        if names is not None and name not in names:
+            continue
+        start = time.perf_counter()
+        paths = generate()
+        datasets[name] = {
+            "rows": users if name == "users" else rows,
+            "bytes": sum(os.path.getsize(path) for path in paths),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"Generated {name}: {datasets[name]}")
+    return datasets
+
+
+def _stage_worker(stage: str, workdir: str, queue) -> None:
+    """Subprocess body: run one stage and send back its timing."""
+    start = time.perf_counter()
+    error = None
+    try:
+        # Keep the reference solutions' prints out of the JSON on stdout
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            STAGE_FUNCTIONS[stage](Path(workdir))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    queue.put({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "error": error,
+    })
+
+
+def _failed_measurement(error: str) -> Dict[str, Any]:
+    return {"seconds": None, "peak_rss_bytes": None, "error": error}
+
+
+def run_stage(stage: str, workdir: Path, rows: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Run one stage in a fresh subprocess and measure it.
+    
+    Args:
+        stage: Stage name from STAGES
+        workdir: Benchmark work directory with generated data
+        rows: Input rows the stage processes
+        timeout: Seconds before the stage is killed (None for no limit; a
+            stage process that dies is reported either way)
+    
+    Returns:
+        Dict with stage, rows, seconds, rows_per_sec, peak_rss_bytes and error
+    """
+    context = multiprocessing.get_context(START_METHOD)
+    results = context.Queue()
+    process = context.Process(target=_stage_worker, args=(stage, str(workdir), results))
+    
+    logger.info(f"Running stage {stage}")
+    process.start()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    measurement = None
+    while measurement is None:
+        try:
+            measurement = results.get(timeout=POLL_SECONDS)
+        except Empty:
+            if not process.is_alive():
+                # Killed (e.g. by the OOM killer) or crashed before reporting
+                process.join()
+                try:
+                    measurement = results.get(timeout=POLL_SECONDS)
+                except Empty:
+                    measurement = _failed_measurement(
+                        f"Stage process exited with code {process.exitcode} without reporting"
+                    )
+            elif deadline is not None and time.monotonic() > deadline:
+                process.kill()
+                measurement = _failed_measurement(f"Timed out after {timeout}s")
+    process.join()
+    
+    seconds = measurement["seconds"]
+    result = {
+        "stage": stage,
+        "rows": rows,
+        "seconds": round(seconds, 3) if seconds is not None else None,
+        "rows_per_sec": round(rows / seconds, 1) if seconds and not measurement["error"] else None,
+        "peak_rss_bytes": measurement["peak_rss_bytes"],
+        "error": measurement["error"],
+    }
+    logger.info(f"Stage {stage}: {result}")
+    return result
+
+
+def run_benchmarks(
+    rows: int,
+    stages: Optional[List[str]] = None,
+    workdir: Optional[str] = None,
+    seed: int = 0,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """Generate data at the given scale and benchmark each stage on it.
+    
+    Args:
+        rows: Rows per dataset
+        stages: Stages to run, in order (default: all)
+        workdir: Directory for generated data and outputs (default: a
+            temporary directory removed afterwards)
+        seed: Random seed
+        timeout: Per-stage timeout in seconds
+    
+    Returns:
+        Machine-readable benchmark report
+    """
+    stages = stages or STAGES
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}")
+    # Transformation reads what ingestion wrote
+    if "transform" in stages and "ingest" not in stages:
+        stages = ["ingest"] + list(stages)
+    
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp_dir:
+        path = Path(tmp_dir)
+        needed = {name for stage in stages for name in STAGE_DATASETS[stage]}
+        datasets = generate_datasets(path, rows, seed, sorted(needed))
+        results = [run_stage(stage, path, rows, timeout) for stage in stages]
+    
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "rows": rows,
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "datasets": datasets,
+        "stages": results,
+    }
+
+
+def main():
+    """Main entry point with CLI arguments."""
+    parser = argparse.ArgumentParser(description='Pipeline benchmarks on synthetic data')
+    parser.add_argument(
+        '--rows',
+        type=lambda value: int(float(value)),
+        default=100_000,
+        help='Rows per generated dataset, e.g. 1e3 to 1e8 (default: 1e5)'
+    )
+    parser.add_argument(
+        '--stages',
+        nargs='+',
+        choices=STAGES,
+        help='Stages to run (default: all)'
+    )
+    parser.add_argument('--workdir', help='Parent directory for generated data')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--timeout', type=float, help='Per-stage timeout in seconds')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    
+    args = parser.parse_args()
+    report = run_benchmarks(args.rows, args.stages, args.workdir, args.seed, args.timeout)
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        logger.info(f"Wrote benchmark report to {args.output}")
+    else:
+        print(text)
+    
+    if any(result["error"] for result in report["stages"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
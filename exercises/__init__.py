@@ -0,0 +1,6 @@
+"""Interview exercises with pandas reference solutions.
+
+Each reference_solution.py is self-contained, so it can be handed out and
+run on its own (``python reference_solution.py`` in its directory). The
+package only lets tests and benchmarks import them.
+"""
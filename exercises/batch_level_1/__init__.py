@@ -0,0 +1 @@
+"""Batch level 1: country revenue by signup month."""
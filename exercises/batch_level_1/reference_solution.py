@@ -3,18 +3,70 @@ Batch Level 1: Country Revenue by Signup Month
 Reference implementation using pandas (for illustration purposes)
 """
 
+import os
+import tempfile
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
 
+DISTINCT_MODES = ('exact', 'hll')
 
-def build_daily_country_signup_report(run_date: str, users_path: str, payments_path: str):
+REPORT_COLUMNS = ['country', 'signup_month', 'total_revenue', 'unique_payers', 'report_date']
+REPORT_FILE = 'report.csv'
+
+# Bits of the group code in exact distinct keys (user codes use the rest)
+USER_CODE_BITS = 40
+
+
+def _aggregate_country_revenue(mapped: pd.DataFrame) -> pd.DataFrame:
+    """Revenue and distinct payers per (country, signup_month)."""
+    return mapped.groupby(['country', 'signup_month']).agg(
+        total_revenue=('amount', 'sum'),
+        unique_payers=('user_id', 'nunique')
+    ).reset_index()
+
+
+def _combine_country_revenue(partials: pd.DataFrame) -> pd.DataFrame:
+    """Merge partial reports computed on disjoint sets of users."""
+    return partials.groupby(['country', 'signup_month'])[['total_revenue', 'unique_payers']].sum().reset_index()
+
+
+def _hash_user_ids(user_ids: pd.Series) -> np.ndarray:
+    """uint64 hash per user_id (as text), stable across runs."""
+    return pd.util.hash_array(user_ids.astype(str).to_numpy(dtype=object))
+
+
+def _aggregate_by_user_partition(mapped: pd.DataFrame, processes: int) -> pd.DataFrame:
+    """_aggregate_country_revenue on user_id hash partitions in a process pool."""
+    partition = _hash_user_ids(mapped['user_id']) % np.uint64(processes)
+    parts = [mapped[partition == i] for i in range(processes)]
+    parts = [part for part in parts if not part.empty] or [mapped]
+    with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+        partials = list(executor.map(_aggregate_country_revenue, parts))
+    return _combine_country_revenue(pd.concat(partials, ignore_index=True))
+
+
+def build_daily_country_signup_report(
+    run_date: str,
+    users_path: str,
+    payments_path: str,
+    processes: int = 1
+):
     """
     Build daily report of revenue by country and signup month.
     
+    With processes > 1 the aggregation runs on user_id hash partitions in a
+    process pool. Every payer falls in exactly one partition, so summing the
+    partial revenues and distinct payer counts gives the same report.
+    
     Args:
         run_date: Report date in YYYY-MM-DD format
         users_path: Path to users CSV file
         payments_path: Path to payments CSV file
+        processes: Worker processes for the aggregation
     
     Returns:
         DataFrame with aggregated results
@@ -38,10 +90,12 @@ def build_daily_country_signup_report(run_date: str, users_path: str, payments_p
     mapped['signup_month'] = mapped['signup_month'].fillna('UNKNOWN')
     
     # Step 5: Aggregate by country and signup month
-    report = mapped.groupby(['country', 'signup_month']).agg(
-        total_revenue=('amount', 'sum'),
-        unique_payers=('user_id', 'nunique')
-    ).reset_index()
+    if processes > 1:
+        report = _aggregate_by_user_partition(
+            mapped[['user_id', 'amount', 'country', 'signup_month']], processes
+        )
+    else:
+        report = _aggregate_country_revenue(mapped)
     
     # Step 6: Add report metadata
     report['report_date'] = run_date
@@ -49,19 +103,363 @@ def build_daily_country_signup_report(run_date: str, users_path: str, payments_p
     return report
 
 
+def load_users_lookup(users_path: str) -> pd.DataFrame:
+    """
+    Load the users dimension as a compact lookup indexed by user_id.
+    
+    Only user_id, country and signup month are kept, the latter two as
+    categoricals, and each row gets a dense user_code. user_id is read as
+    text, so it matches payment chunks whatever their inferred dtype.
+    
+    Args:
+        users_path: Path to users CSV file
+    
+    Returns:
+        DataFrame indexed by user_id with country, signup_month and user_code
+    """
+    users = pd.read_csv(users_path, usecols=['user_id', 'country', 'signup_date'], dtype={'user_id': str})
+    users['signup_month'] = pd.to_datetime(users['signup_date']).dt.strftime('%Y-%m')
+    lookup = pd.DataFrame({
+        'country': users['country'].astype('category'),
+        'signup_month': users['signup_month'].astype('category'),
+        'user_code': np.arange(len(users), dtype=np.int64),
+    })
+    lookup.index = pd.Index(users['user_id'], name='user_id')
+    return lookup
+
+
+class GroupedHyperLogLog:
+    """
+    HyperLogLog distinct counters for many groups, updated with numpy.
+    
+    Each group has 2^precision one-byte registers; the relative error is
+    about 1.04 / sqrt(2^precision) (0.8% at the default precision of 14).
+    """
+    
+    def __init__(self, precision: int = 14):
+        """
+        Initialize empty counters.
+        
+        Args:
+            precision: Register index bits (4-18)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros((0, 1 << precision), dtype=np.uint8)
+    
+    def add(self, group_codes: np.ndarray, hashes: np.ndarray) -> None:
+        """
+        Add 64-bit hashes of values to their groups.
+        
+        Args:
+            group_codes: Group code per value (0..n_groups-1)
+            hashes: uint64 hash per value
+        """
+        if len(group_codes) and group_codes.max() >= len(self.registers):
+            grown = np.zeros((group_codes.max() + 1, self.registers.shape[1]), dtype=np.uint8)
+            grown[:len(self.registers)] = self.registers
+            self.registers = grown
+        
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        # Bit length via frexp on the 32-bit halves, which float64 holds
+        # exactly (a whole suffix of more than 53 bits would be rounded)
+        high = suffix >> np.uint64(32)
+        low = suffix & np.uint64(0xFFFFFFFF)
+        bit_length = np.where(
+            high > 0,
+            np.frexp(high.astype(np.float64))[1] + 32,
+            np.frexp(low.astype(np.float64))[1]
+        )
+        rank = (suffix_bits - bit_length + 1).astype(np.uint8)
+        
+        flat = self.registers.reshape(-1)
+        np.maximum.at(flat, group_codes.astype(np.int64) * self.registers.shape[1] + index, rank)
+    
+    def estimate(self, n_groups: int) -> np.ndarray:
+        """
+        Estimated distinct count per group.
+        
+        Args:
+            n_groups: Number of groups to report (groups never added are 0)
+        
+        Returns:
+            int64 array of estimates
+        """
+        m = self.registers.shape[1]
+        registers = np.zeros((n_groups, m), dtype=np.uint8)
+        registers[:len(self.registers)] = self.registers[:n_groups]
+        
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)), axis=1)
+        zeros = np.count_nonzero(registers == 0, axis=1)
+        # Linear counting for small cardinalities
+        with np.errstate(divide='ignore'):
+            linear = m * np.log(m / np.maximum(zeros, 1))
+        estimate = np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+        return np.rint(estimate).astype(np.int64)
+
+
+def _aggregate_payment_chunks(
+    chunks: Iterable[pd.DataFrame],
+    users: pd.DataFrame,
+    group_by: List[str],
+    distinct: str = 'exact',
+    hll_precision: int = 14,
+    compact_rows: int = 1_000_000
+) -> pd.DataFrame:
+    """
+    Revenue and unique payers per group over payment chunks.
+    
+    Each chunk is joined to the users lookup (missing country and signup
+    month become 'UNKNOWN') and aggregated, and the partial results are
+    merged: revenue sums add up exactly, and unique payers are either
+    - 'exact': distinct (group, user) pairs as packed int64 codes, compacted
+      as they grow (unknown user ids get codes from a dict), or
+    - 'hll': per-group HyperLogLog registers, fixed-size whatever the volume
+    
+    Args:
+        chunks: Payment chunks with user_id (text), amount and any other
+            group_by columns
+        users: Lookup from load_users_lookup
+        group_by: Group columns, e.g. ['country', 'signup_month']
+        distinct: 'exact' or 'hll'
+        hll_precision: HyperLogLog register index bits
+        compact_rows: Pending exact pairs that trigger a compaction
+    
+    Returns:
+        DataFrame with the group_by columns, total_revenue and unique_payers,
+        sorted by the group_by columns
+    """
+    group_codes: Dict[tuple, int] = {}
+    revenue: Dict[int, float] = {}
+    unknown_user_codes: Dict[str, int] = {}
+    pair_chunks: List[np.ndarray] = []
+    pairs = np.zeros(0, dtype=np.int64)
+    sketch = GroupedHyperLogLog(hll_precision) if distinct == 'hll' else None
+    
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        mapped = chunk.merge(users, left_on='user_id', right_index=True, how='left')
+        mapped['country'] = mapped['country'].astype(object).fillna('UNKNOWN')
+        mapped['signup_month'] = mapped['signup_month'].astype(object).fillna('UNKNOWN')
+        
+        keys, uniques = pd.MultiIndex.from_arrays([mapped[column] for column in group_by]).factorize()
+        codes = np.array([group_codes.setdefault(key, len(group_codes)) for key in uniques], dtype=np.int64)[keys]
+        
+        partial = pd.Series(mapped['amount'].to_numpy()).groupby(codes).sum()
+        for code, amount in partial.items():
+            revenue[code] = revenue.get(code, 0) + amount
+        
+        has_user = mapped['user_id'].notna().to_numpy()
+        if distinct == 'hll':
+            sketch.add(codes[has_user], _hash_user_ids(mapped['user_id'][has_user]))
+            continue
+        
+        user_codes = mapped['user_code'].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        unknown = np.isnan(user_codes) & has_user
+        if unknown.any():
+            offset = len(users)
+            user_codes[unknown] = [
+                offset + unknown_user_codes.setdefault(user_id, len(unknown_user_codes))
+                for user_id in mapped['user_id'][unknown]
+            ]
+        pair_chunks.append(np.unique(
+            (codes[has_user] << USER_CODE_BITS) | user_codes[has_user].astype(np.int64)
+        ))
+        # Compact once the pending pairs outgrow the compacted ones
+        if sum(len(c) for c in pair_chunks) > max(len(pairs), compact_rows):
+            pairs = np.unique(np.concatenate([pairs] + pair_chunks))
+            pair_chunks = []
+    
+    n_groups = len(group_codes)
+    if distinct == 'hll':
+        unique_payers = sketch.estimate(n_groups)
+    else:
+        pairs = np.unique(np.concatenate([pairs] + pair_chunks))
+        unique_payers = np.bincount(pairs >> USER_CODE_BITS, minlength=n_groups)
+    
+    report = pd.DataFrame(list(group_codes), columns=group_by)
+    report['total_revenue'] = [revenue[code] for code in range(n_groups)]
+    report['unique_payers'] = unique_payers[:n_groups]
+    return report.sort_values(group_by).reset_index(drop=True)
+
+
+def build_daily_country_signup_report_chunked(
+    run_date: str,
+    users_path: str,
+    payments_path: str,
+    chunksize: int = 1_000_000,
+    distinct: str = 'exact',
+    hll_precision: int = 14
+) -> pd.DataFrame:
+    """
+    Out-of-core build_daily_country_signup_report.
+    
+    The users dimension is held as a compact lookup while payments are read
+    in chunks of user_id and amount, joined and aggregated chunk by chunk
+    (see _aggregate_payment_chunks), so memory follows the dimension and
+    the number of payers, not the number of payments.
+    
+    Args:
+        run_date: Report date in YYYY-MM-DD format
+        users_path: Path to users CSV file
+        payments_path: Path to payments CSV file
+        chunksize: Payments read per chunk
+        distinct: 'exact' or 'hll'
+        hll_precision: HyperLogLog register index bits
+    
+    Returns:
+        DataFrame with the same rows as build_daily_country_signup_report
+    """
+    if distinct not in DISTINCT_MODES:
+        raise ValueError(f"Unknown distinct mode: {distinct} (expected one of {DISTINCT_MODES})")
+    
+    # Step 1: Compact users lookup
+    users = load_users_lookup(users_path)
+    
+    # Step 2: Stream payments and merge partial aggregates. user_id is pinned
+    # to text: a chunk with a missing id would otherwise read numeric ids as
+    # floats, and "1.0" would hash and join differently from "1".
+    payment_chunks = pd.read_csv(
+        payments_path, usecols=['user_id', 'amount'], dtype={'user_id': str}, chunksize=chunksize
+    )
+    report = _aggregate_payment_chunks(
+        payment_chunks, users, ['country', 'signup_month'], distinct, hll_precision, chunksize
+    )
+    report['report_date'] = run_date
+    
+    return report
+
+
+def _write_report(output_dir: Path, report_date: str, report: pd.DataFrame) -> str:
+    """Replace one report_date partition's file atomically."""
+    partition_dir = output_dir / f"report_date={report_date}"
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=partition_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        report.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, partition_dir / REPORT_FILE)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return str(partition_dir / REPORT_FILE)
+
+
+def backfill_daily_country_signup_reports(
+    start_date: str,
+    end_date: str,
+    users_path: str,
+    payments_path: str,
+    output_dir: str,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1_000_000
+) -> Dict[str, str]:
+    """
+    Build the daily report for every date in a range in one pass.
+    
+    Each report_date covers the payments whose pay_date is that date, i.e.
+    what build_daily_country_signup_report returns for that day's drop.
+    pay_date is the payment's date in its own offset, as ts.dt.date gives
+    it. Users are parsed once and payments streamed once in chunks: each
+    chunk is joined to the users lookup and aggregated per
+    (pay_date, country, signup_month), and the partials are merged across
+    chunks, so memory does not grow with the payments file. The
+    report_date= partitions are then written in parallel. Dates without
+    payments get an empty report, so the range is complete.
+    
+    Args:
+        start_date: First report date (YYYY-MM-DD, inclusive)
+        end_date: Last report date (YYYY-MM-DD, inclusive)
+        users_path: Path to users CSV file
+        payments_path: Path to payments CSV file
+        output_dir: Directory for report_date=YYYY-MM-DD/report.csv partitions
+        max_workers: Writer threads (default: ThreadPoolExecutor's default)
+        chunksize: Payments read per chunk
+    
+    Returns:
+        Dict mapping each report date to the file written
+    
+    Raises:
+        ValueError: If start_date is after end_date
+    """
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range(start_date, end_date, freq='D')]
+    if not dates:
+        raise ValueError(f"start_date {start_date} is after end_date {end_date}")
+    
+    # Step 1: Users once, as a compact lookup
+    users = load_users_lookup(users_path)
+    
+    # Step 2: Payments once, in chunks, keeping the requested dates
+    def dated_chunks() -> Iterator[pd.DataFrame]:
+        for chunk in pd.read_csv(
+            payments_path, usecols=['user_id', 'amount', 'ts'], dtype={'user_id': str}, chunksize=chunksize
+        ):
+            # Local date of each payment, ISO strings sort like dates
+            pay_date = pd.to_datetime(chunk['ts']).dt.strftime('%Y-%m-%d')
+            chunk = chunk.drop(columns=['ts']).assign(pay_date=pay_date)
+            yield chunk[chunk['pay_date'].between(dates[0], dates[-1])]
+    
+    # Step 3: Join and aggregate every day, merging the chunks' partials
+    reports = _aggregate_payment_chunks(
+        dated_chunks(), users, ['pay_date', 'country', 'signup_month'], compact_rows=chunksize
+    )
+    reports['report_date'] = reports['pay_date']
+    by_date = {
+        report_date: day[REPORT_COLUMNS].reset_index(drop=True)
+        for report_date, day in reports.groupby('report_date')
+    }
+    empty = pd.DataFrame(columns=REPORT_COLUMNS)
+    
+    # Step 4: Write the report_date= partitions in parallel
+    output = Path(output_dir)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        paths = executor.map(
+            lambda report_date: _write_report(output, report_date, by_date.get(report_date, empty)),
+            dates
+        )
+        return dict(zip(dates, paths))
+
+
 if __name__ == '__main__':
+    # Sample data sits next to this file
+    DATA_DIR = Path(__file__).parent
+    
     # Example usage
     report = build_daily_country_signup_report(
         run_date='2025-03-10',
-        users_path='users.csv',
-        payments_path='payments.csv'
+        users_path=str(DATA_DIR / 'users.csv'),
+        payments_path=str(DATA_DIR / 'payments.csv')
     )
     
     print("\nCountry Revenue by Signup Month Report")
     print("=" * 70)
     print(report.to_string(index=False))
     
-    # Optionally write to partitioned output
-    output_path = f"output/report_date={report['report_date'].iloc[0]}/report.csv"
-    print(f"\nWriting to: {output_path}")
-    # report.to_csv(output_path, index=False)
+    # Same report with payments streamed in chunks
+    for distinct in DISTINCT_MODES:
+        chunked = build_daily_country_signup_report_chunked(
+            run_date='2025-03-10',
+            users_path=str(DATA_DIR / 'users.csv'),
+            payments_path=str(DATA_DIR / 'payments.csv'),
+            chunksize=2,
+            distinct=distinct
+        )
+        print(f"Chunked ({distinct}) matches: {chunked.equals(report)}")
+    
+    # Backfill one report_date= partition per day of payments
+    with tempfile.TemporaryDirectory() as output_dir:
+        written = backfill_daily_country_signup_reports(
+            start_date='2025-03-01',
+            end_date='2025-03-10',
+            users_path=str(DATA_DIR / 'users.csv'),
+            payments_path=str(DATA_DIR / 'payments.csv'),
+            output_dir=output_dir
+        )
+        print(f"\nBackfilled {len(written)} partitions, e.g.:")
+        print(Path(written['2025-03-05']).relative_to(output_dir))
+        print(pd.read_csv(written['2025-03-05']).to_string(index=False))
@@ -0,0 +1 @@
+"""Batch level 2: incremental daily build with idempotency."""
@@ -3,10 +3,34 @@ Batch Level 2: Incremental Daily Build with Idempotency
 Reference implementation using pandas (for illustration purposes)
 """
 
+import os
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+# dt=YYYY-MM-DD directories, one Parquet file each
+PARTITIONING = ds.partitioning(pa.schema([('dt', pa.date32())]), flavor='hive')
+PARTITION_FILE = 'part-0.parquet'
+USER_DAILY_COLUMNS = ['user_id', 'dt', 'pageviews', 'active_minutes']
+
+# Columns read from event files and their types; the low-cardinality
+# strings are dictionary-encoded (pandas categoricals). ts is left as text
+# for pd.to_datetime, which keeps the files' own offsets (or none).
+EVENT_COLUMN_TYPES = {
+    'user_id': pa.dictionary(pa.int32(), pa.string()),
+    'ts': pa.string(),
+    'event_type': pa.dictionary(pa.int32(), pa.string()),
+    'event_id': pa.string(),
+}
 
 
 def calculate_active_minutes(timestamps: pd.Series, gap_threshold_minutes: int = 5) -> float:
@@ -36,57 +60,230 @@ def calculate_active_minutes(timestamps: pd.Series, gap_threshold_minutes: int =
     return round(active_time, 2)
 
 
-def build_user_daily(
+def compute_user_day_metrics(events: pd.DataFrame, gap_threshold_minutes: int = 5) -> pd.DataFrame:
+    """
+    Compute pageviews and active minutes for every (user_id, dt) in one pass.
+    
+    Vectorized equivalent of grouping by (user_id, dt) and applying
+    calculate_active_minutes to each group: events are sorted once by
+    (user_id, dt, ts), consecutive gaps are taken with one diff, gaps that
+    cross a group boundary or exceed the threshold are masked out, and both
+    metrics are summed per group with np.bincount. Gaps are computed and
+    added in timestamp order and rounded with Python's round, so the
+    results match the per-group loop exactly.
+    
+    Args:
+        events: Deduplicated events with user_id, ts (datetime) and event_type
+        gap_threshold_minutes: Maximum gap to consider same session
+    
+    Returns:
+        DataFrame with user_id, dt, pageviews and active_minutes
+    """
+    columns = ['user_id', 'dt', 'pageviews', 'active_minutes']
+    events = events[events['user_id'].notna() & events['ts'].notna()]
+    if events.empty:
+        return pd.DataFrame(columns=columns)
+    
+    user_codes, users = pd.factorize(events['user_id'])
+    ts = events['ts']
+    if ts.dt.tz is not None:
+        # Local wall time, so days are the same dates as ts.dt.date
+        ts = ts.dt.tz_localize(None)
+    ts = ts.to_numpy(dtype='datetime64[ns]')
+    days = ts.astype('datetime64[D]')
+    is_pageview = (events['event_type'] == 'page_view').to_numpy()
+    
+    # One global sort; lexsort uses the last key as the primary one
+    order = np.lexsort((ts, days, user_codes))
+    user_codes, ts, days, is_pageview = (
+        user_codes[order], ts[order], days[order], is_pageview[order]
+    )
+    
+    # Group boundaries and a dense group id per row
+    new_group = np.empty(len(ts), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = (user_codes[1:] != user_codes[:-1]) | (days[1:] != days[:-1])
+    group_ids = np.cumsum(new_group) - 1
+    n_groups = group_ids[-1] + 1
+    
+    # Minutes since the previous event, kept only within a group and session
+    gaps = pd.TimedeltaIndex(np.diff(ts)).total_seconds().to_numpy() / 60.0
+    gaps = np.where(~new_group[1:] & (gaps <= gap_threshold_minutes), gaps, 0.0)
+    
+    active_minutes = np.bincount(group_ids[1:], weights=gaps, minlength=n_groups)
+    pageviews = np.bincount(group_ids, weights=is_pageview, minlength=n_groups)
+    
+    first = new_group.nonzero()[0]
+    user_ids = users.take(user_codes[first])
+    if isinstance(user_ids.dtype, pd.CategoricalDtype):
+        user_ids = user_ids.astype(user_ids.categories.dtype)
+    return pd.DataFrame({
+        'user_id': user_ids,
+        'dt': pd.to_datetime(days[first]).date,
+        'pageviews': pageviews,
+        'active_minutes': [round(minutes, 2) for minutes in active_minutes.tolist()],
+    })
+
+
+def keep_latest_events(event_ids: pd.Series, timestamps: pd.Series) -> np.ndarray:
+    """
+    Mask keeping, per event_id, the copy with the latest timestamp.
+    
+    Ties keep the last copy in input order. The rows are not sorted: the
+    latest timestamp per id is found with a hash aggregation instead.
+    
+    Args:
+        event_ids: Event id per row
+        timestamps: Event time per row
+    
+    Returns:
+        Boolean mask of the rows to keep
+    """
+    codes, uniques = pd.factorize(event_ids, use_na_sentinel=False)
+    times = timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    latest = np.full(len(uniques), np.iinfo(np.int64).min)
+    np.maximum.at(latest, codes, times)
+    candidates = np.nonzero(times == latest[codes])[0]
+    winner = np.full(len(uniques), -1)
+    np.maximum.at(winner, codes[candidates], candidates)
+    keep = np.zeros(len(times), dtype=bool)
+    keep[winner] = True
+    return keep
+
+
+def _metrics_by_user_partition(events: pd.DataFrame, processes: int) -> pd.DataFrame:
+    """
+    compute_user_day_metrics on user_id hash partitions in a process pool.
+    
+    Every user falls in one partition, so the partial results are disjoint;
+    they come back sorted by user_id and dt.
+    """
+    partition = pd.util.hash_array(events['user_id'].astype(str).to_numpy(dtype=object)) % np.uint64(processes)
+    parts = [events[partition == i] for i in range(processes)]
+    parts = [part for part in parts if not part.empty] or [events]
+    with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+        partials = list(executor.map(compute_user_day_metrics, parts))
+    result = pd.concat(partials, ignore_index=True)
+    return result.sort_values(['user_id', 'dt'], kind='stable').reset_index(drop=True)
+
+
+def _read_event_file(file_path: str, use_threads: bool) -> pa.Table:
+    """Read one event file with only the needed columns, typed during parsing."""
+    return pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(use_threads=use_threads),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(EVENT_COLUMN_TYPES),
+            column_types=EVENT_COLUMN_TYPES
+        )
+    )
+
+
+def load_events(files: List[str], max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Load event files concurrently into one DataFrame.
+    
+    Files are parsed in parallel by pyarrow's CSV reader (which releases
+    the GIL), keeping only user_id, ts, event_type and event_id; user_id
+    and event_type arrive as categoricals. The per-file tables are
+    concatenated without copying and converted to pandas once, and ts is
+    then parsed with pd.to_datetime over all files, as read_csv + concat
+    would: naive timestamps stay naive, a common offset is kept (so dt is
+    the source's local date), and mixed offsets raise.
+    
+    Args:
+        files: Event file paths
+        max_workers: Files read at once (default: one per CPU)
+    
+    Returns:
+        DataFrame with the events of all files, in file order
+    """
+    if len(files) == 1:
+        tables = [_read_event_file(files[0], use_threads=True)]
+    else:
+        workers = min(len(files), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tables = list(executor.map(lambda path: _read_event_file(path, use_threads=False), files))
+    
+    events = pa.concat_tables(tables).to_pandas(split_blocks=True, self_destruct=True)
+    events['ts'] = pd.to_datetime(events['ts'])
+    return events
+
+
+def aggregate_new_events(
     run_date: str,
     new_files: List[str],
-    existing_data_path: Optional[str] = None,
-    update_window_days: int = 2
-) -> pd.DataFrame:
+    processes: int = 1
+) -> Optional[pd.DataFrame]:
     """
-    Build idempotent daily user metrics from event files.
+    Load, deduplicate and aggregate new event files into per-user daily rows.
     
     Args:
-        run_date: Report date in YYYY-MM-DD format
+        run_date: Report date in YYYY-MM-DD format (later events are ignored)
         new_files: List of new event file paths to process
-        existing_data_path: Path to existing user_daily table (if any)
-        update_window_days: How many days back to allow updates
+        processes: Worker processes for the metrics; above 1, user_id hash
+            partitions are aggregated in parallel and rows come back sorted
+            by user_id and dt
     
     Returns:
-        DataFrame with updated user daily metrics
+        DataFrame with user_id, dt, pageviews and active_minutes, or None
+        if there are no files
     """
     # Step 1: Load all new event files
     if not new_files:
         print("No new files to process")
-        return pd.DataFrame()
+        return None
     
-    all_events = []
-    for file_path in new_files:
-        df = pd.read_csv(file_path)
-        all_events.append(df)
-    
-    raw = pd.concat(all_events, ignore_index=True)
+    raw = load_events(new_files)
     
     # Step 2: Add date column and filter
-    raw['ts'] = pd.to_datetime(raw['ts'])
     raw['dt'] = raw['ts'].dt.date
     run_date_obj = datetime.strptime(run_date, '%Y-%m-%d').date()
     raw = raw[raw['dt'] <= run_date_obj]
     
-    # Step 3: Deduplicate by event_id (keep latest by timestamp)
-    clean = raw.sort_values('ts').drop_duplicates(subset=['event_id'], keep='last')
+    # Step 3: Deduplicate by event_id (keep latest by timestamp, no sort)
+    clean = raw[keep_latest_events(raw['event_id'], raw['ts'])]
     
-    # Step 4: Calculate per-user daily metrics
-    def aggregate_user_day(group):
-        return pd.Series({
-            'pageviews': (group['event_type'] == 'page_view').sum(),
-            'active_minutes': calculate_active_minutes(group['ts'])
-        })
+    # Step 4: Calculate per-user daily metrics (vectorized, single pass)
+    if processes > 1:
+        per_user_day = _metrics_by_user_partition(clean, processes)
+    else:
+        per_user_day = compute_user_day_metrics(clean)
+    
+    return per_user_day
+
+
+def build_user_daily(
+    run_date: str,
+    new_files: List[str],
+    existing_data_path: Optional[str] = None,
+    update_window_days: int = 2,
+    processes: int = 1
+) -> pd.DataFrame:
+    """
+    Build idempotent daily user metrics from event files.
+    
+    Args:
+        run_date: Report date in YYYY-MM-DD format
+        new_files: List of new event file paths to process
+        existing_data_path: Path to existing user_daily table (if any)
+        update_window_days: How many days back to allow updates
+        processes: Worker processes for the per-user metrics
     
-    per_user_day = clean.groupby(['user_id', 'dt']).apply(aggregate_user_day).reset_index()
+    Returns:
+        DataFrame with updated user daily metrics
+    """
+    # Steps 1-4: Aggregate the new events
+    per_user_day = aggregate_new_events(run_date, new_files, processes)
+    if per_user_day is None:
+        return pd.DataFrame()
+    run_date_obj = datetime.strptime(run_date, '%Y-%m-%d').date()
     
     # Step 5: Merge with existing data (if any)
     if existing_data_path and Path(existing_data_path).exists():
-        existing = pd.read_csv(existing_data_path)
+        # user_id is text, as in the new events: inferred numeric ids would
+        # not match them and (user_id, dt) would be kept twice
+        existing = pd.read_csv(existing_data_path, dtype={'user_id': str})
         existing['dt'] = pd.to_datetime(existing['dt']).dt.date
         
         # Only keep existing data outside update window
@@ -107,7 +304,166 @@ def build_user_daily(
     return result
 
 
+def _partition_dir(table_dir: Path, dt: date) -> Path:
+    return table_dir / f"dt={dt.isoformat()}"
+
+
+def list_partitions(table_dir: str) -> List[date]:
+    """
+    List the dt partitions of a partitioned user_daily table (no data is read).
+    
+    Args:
+        table_dir: Root directory of the table
+    
+    Returns:
+        Partition dates in ascending order
+    """
+    table_dir = Path(table_dir)
+    if not table_dir.exists():
+        return []
+    return sorted(
+        datetime.strptime(path.name[len('dt='):], '%Y-%m-%d').date()
+        for path in table_dir.glob('dt=*')
+        if (path / PARTITION_FILE).exists()
+    )
+
+
+def read_user_daily(
+    table_dir: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> pd.DataFrame:
+    """
+    Read a partitioned user_daily table, opening only partitions in range.
+    
+    Args:
+        table_dir: Root directory of the table
+        start_date: First dt to read (inclusive, None: no lower bound)
+        end_date: Last dt to read (inclusive, None: no upper bound)
+    
+    Returns:
+        DataFrame with user_id, dt, pageviews and active_minutes sorted by
+        dt and user_id
+    """
+    if not list_partitions(table_dir):
+        return pd.DataFrame(columns=USER_DAILY_COLUMNS)
+    
+    dataset = ds.dataset(table_dir, format='parquet', partitioning=PARTITIONING)
+    condition = None
+    if start_date is not None:
+        condition = ds.field('dt') >= pa.scalar(start_date, pa.date32())
+    if end_date is not None:
+        upper = ds.field('dt') <= pa.scalar(end_date, pa.date32())
+        condition = upper if condition is None else condition & upper
+    
+    result = dataset.to_table(filter=condition).to_pandas()[USER_DAILY_COLUMNS]
+    return result.sort_values(['dt', 'user_id']).reset_index(drop=True)
+
+
+def _write_partition(table_dir: Path, dt: date, rows: pd.DataFrame) -> None:
+    """Replace one partition's file atomically."""
+    partition_dir = _partition_dir(table_dir, dt)
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(
+        rows.drop(columns=['dt']).sort_values('user_id'),
+        preserve_index=False
+    )
+    fd, tmp_path = tempfile.mkstemp(dir=partition_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, partition_dir / PARTITION_FILE)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_user_daily_partitions(
+    per_user_day: pd.DataFrame,
+    table_dir: str,
+    run_date: str,
+    update_window_days: int = 2
+) -> Dict[str, List[date]]:
+    """
+    Merge new per-user daily rows into a dt-partitioned Parquet table.
+    
+    Same result as build_user_daily's merge, but only the partitions the
+    run affects are touched, so the cost depends on the update window and
+    not on the table's history:
+    - Partitions from run_date - update_window_days on are replaced by the
+      new rows (or removed if the run has none for that day)
+    - Older partitions the new rows fall into keep their other users' rows;
+      the new rows replace the same (user_id, dt)
+    - All other partitions are left untouched
+    
+    Args:
+        per_user_day: Rows from aggregate_new_events
+        table_dir: Root directory of the table
+        run_date: Report date in YYYY-MM-DD format
+        update_window_days: How many days back to allow updates
+    
+    Returns:
+        Dict with the 'written' and 'removed' partition dates
+    """
+    table_dir = Path(table_dir)
+    run_date_obj = datetime.strptime(run_date, '%Y-%m-%d').date()
+    cutoff_date = run_date_obj - timedelta(days=update_window_days)
+    
+    existing = set(list_partitions(str(table_dir)))
+    new_by_dt = {dt: rows for dt, rows in per_user_day.groupby('dt', sort=False)}
+    affected = set(new_by_dt) | {dt for dt in existing if dt >= cutoff_date}
+    
+    summary = {'written': [], 'removed': []}
+    for dt in sorted(affected):
+        rows = new_by_dt.get(dt)
+        if dt < cutoff_date and dt in existing:
+            old = pq.read_table(_partition_dir(table_dir, dt) / PARTITION_FILE).to_pandas()
+            old['user_id'] = old['user_id'].astype(str)
+            old['dt'] = dt
+            rows = pd.concat([old[~old['user_id'].isin(rows['user_id'])], rows], ignore_index=True)
+        
+        if rows is None or rows.empty:
+            shutil.rmtree(_partition_dir(table_dir, dt))
+            summary['removed'].append(dt)
+        else:
+            _write_partition(table_dir, dt, rows[USER_DAILY_COLUMNS])
+            summary['written'].append(dt)
+    
+    print(f"Partitions written: {[dt.isoformat() for dt in summary['written']]}")
+    print(f"Partitions removed: {[dt.isoformat() for dt in summary['removed']]}")
+    return summary
+
+
+def build_user_daily_partitioned(
+    run_date: str,
+    new_files: List[str],
+    table_dir: str,
+    update_window_days: int = 2,
+    processes: int = 1
+) -> Dict[str, List[date]]:
+    """
+    Incremental variant of build_user_daily for a dt-partitioned Parquet table.
+    
+    Args:
+        run_date: Report date in YYYY-MM-DD format
+        new_files: List of new event file paths to process
+        table_dir: Root directory of the user_daily table
+        update_window_days: How many days back to allow updates
+        processes: Worker processes for the per-user metrics
+    
+    Returns:
+        Dict with the 'written' and 'removed' partition dates
+    """
+    per_user_day = aggregate_new_events(run_date, new_files, processes)
+    if per_user_day is None:
+        return {'written': [], 'removed': []}
+    return write_user_daily_partitions(per_user_day, table_dir, run_date, update_window_days)
+
+
 if __name__ == '__main__':
+    # Sample data sits next to this file
+    DATA_DIR = Path(__file__).parent
+    
     # Example usage: process files incrementally
     
     # First run: process initial files
@@ -116,8 +472,8 @@ if __name__ == '__main__':
     print("=" * 70)
     
     run1_files = [
-        'events_2025-03-01.csv',
-        'events_2025-03-02.csv'
+        str(DATA_DIR / 'events_2025-03-01.csv'),
+        str(DATA_DIR / 'events_2025-03-02.csv')
     ]
     
     result1 = build_user_daily(
@@ -129,7 +485,7 @@ if __name__ == '__main__':
     print(result1.to_string(index=False))
     
     # Save intermediate result
-    result1.to_csv('user_daily_interim.csv', index=False)
+    result1.to_csv(DATA_DIR / 'user_daily_interim.csv', index=False)
     
     # Second run: process resent file (demonstrates idempotency)
     print("\n" + "=" * 70)
@@ -137,13 +493,13 @@ if __name__ == '__main__':
     print("=" * 70)
     
     run2_files = [
-        'events_2025-03-02_resent.csv'  # Contains duplicates + new data
+        str(DATA_DIR / 'events_2025-03-02_resent.csv')  # Contains duplicates + new data
     ]
     
     result2 = build_user_daily(
         run_date='2025-03-03',
         new_files=run2_files,
-        existing_data_path='user_daily_interim.csv'
+        existing_data_path=str(DATA_DIR / 'user_daily_interim.csv')
     )
     
     print("\nUser Daily Metrics (Run 2 - After Deduplication):")
@@ -156,3 +512,16 @@ if __name__ == '__main__':
     print("✓ New events from resent file (evt_017, evt_018, evt_019) added")
     print("✓ Existing metrics updated within reprocessing window")
     print("✓ Pipeline is idempotent - same input produces same output")
+    
+    # Same two runs against a dt-partitioned Parquet table
+    print("\n" + "=" * 70)
+    print("Partitioned table: each run rewrites only the partitions it affects")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as table_dir:
+        build_user_daily_partitioned('2025-03-02', run1_files, table_dir)
+        build_user_daily_partitioned('2025-03-03', run2_files, table_dir)
+        partitioned = read_user_daily(table_dir)
+        
+        print(f"\nMatches the CSV result: {partitioned.equals(result2)}")
+        print(f"Pruned read of 2025-03-03 only: {len(read_user_daily(table_dir, date(2025, 3, 3), date(2025, 3, 3)))} rows")
@@ -0,0 +1 @@
+"""Streaming level 1: rolling device stats."""
@@ -9,9 +9,39 @@ Note: This is a simplified batch simulation. In production, you would use:
 - Cloud-native streaming (AWS Kinesis, GCP Dataflow, Azure Stream Analytics)
 """
 
+import csv
+import heapq
+import json
+import math
+import os
+import tempfile
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Iterator, Tuple
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+OUTPUT_MODES = ('update', 'append')
+
+CHECKPOINT_FILE = 'checkpoint.json'
+
+NANOS_PER_MINUTE = 60 * 10**9
+
+# Partial aggregates kept per (device, pane) and combined per window
+PANE_AGGREGATES = {
+    'event_count': 'sum',
+    'temp_sum': 'sum',
+    'temp_count': 'sum',
+    'temp_abs_sum': 'sum',
+    'min_temp': 'min',
+    'max_temp': 'max',
+}
+
+# Relative distance from a half-cent below which a pane-summed mean may
+# round differently from a directly computed one
+TIE_TOLERANCE = 1e-9
 
 
 def create_sliding_windows(
@@ -41,11 +71,140 @@ def create_sliding_windows(
         current += slide
 
 
+def compute_sliding_window_stats(
+    events: pd.DataFrame,
+    window_length_minutes: int = 5,
+    slide_minutes: int = 1,
+    origin: Optional[pd.Timestamp] = None
+) -> pd.DataFrame:
+    """
+    Compute per-device sliding window stats from pane partial aggregates.
+    
+    Windows start at the earliest event and every slide after it, as in
+    create_sliding_windows. Time is cut into panes of
+    gcd(window_length, slide) minutes: every event is assigned to exactly one
+    pane, each (device, pane) keeps count, sum, min and max, and every window
+    is combined from the panes it covers. This costs
+    O(events + windows x devices) instead of filtering all events per window.
+    Pane sums add the temperatures in a different order than a per-window
+    mean, so the rare windows whose mean sits on a half-cent within float
+    error are averaged from their own events; avg_temp then matches the
+    per-window loop exactly.
+    
+    Args:
+        events: Deduplicated events with device_id, ts and temperature
+        window_length_minutes: Window size
+        slide_minutes: Window slide interval
+        origin: Start of the first window (default: the earliest event);
+            pass the global one when events are a subset of devices
+    
+    Returns:
+        DataFrame with device_id, window_start, window_end, avg_temp,
+        event_count, min_temp and max_temp
+    """
+    columns = ['device_id', 'window_start', 'window_end', 'avg_temp',
+               'event_count', 'min_temp', 'max_temp']
+    events = events[events['ts'].notna()]
+    if events.empty:
+        return pd.DataFrame(columns=columns)
+    
+    pane_minutes = math.gcd(window_length_minutes, slide_minutes)
+    panes_per_window = window_length_minutes // pane_minutes
+    panes_per_slide = slide_minutes // pane_minutes
+    pane_length = timedelta(minutes=pane_minutes)
+    
+    # Step 1: Assign every event to its pane once, relative to the first event
+    if origin is None:
+        origin = events['ts'].min()
+    temperature = events['temperature']
+    panes = pd.DataFrame({
+        'device_id': events['device_id'],
+        'pane': (events['ts'] - origin) // pane_length,
+        'event_count': 1,
+        'temp_sum': temperature.fillna(0.0),
+        'temp_count': temperature.notna().astype('int64'),
+        'temp_abs_sum': temperature.abs().fillna(0.0),
+        'min_temp': temperature,
+        'max_temp': temperature,
+    }).groupby(['device_id', 'pane'], sort=False).agg(PANE_AGGREGATES).reset_index()
+    
+    # Step 2: Window k covers panes [k * panes_per_slide, k * panes_per_slide + panes_per_window)
+    contributions = []
+    for offset in range(panes_per_window):
+        start_pane = panes['pane'] - offset
+        covers = (start_pane >= 0) & (start_pane % panes_per_slide == 0)
+        contribution = panes[covers].copy()
+        contribution['window'] = start_pane[covers] // panes_per_slide
+        contributions.append(contribution)
+    
+    windows = pd.concat(contributions, ignore_index=True).groupby(
+        ['window', 'device_id'], sort=True
+    ).agg(PANE_AGGREGATES).reset_index()
+    
+    # Step 3: Finalize averages and window bounds
+    window_start = origin + windows['window'] * timedelta(minutes=slide_minutes)
+    window_end = window_start + timedelta(minutes=window_length_minutes)
+    mean = windows['temp_sum'] / windows['temp_count']
+    avg_temp = mean.round(2)
+    
+    # A mean within float error of a half-cent can round the other way than
+    # the per-window mean would; recompute those few windows from their events
+    scaled = mean * 100
+    tolerance = TIE_TOLERANCE * (windows['temp_abs_sum'] / windows['temp_count'] * 100 + 1)
+    near_tie = ((scaled - scaled // 1 - 0.5).abs() <= tolerance).tolist()
+    if any(near_tie):
+        by_device = dict(list(events.groupby('device_id', sort=False)))
+        for row, is_near_tie in enumerate(near_tie):
+            if is_near_tie:
+                group = by_device[windows['device_id'].iat[row]]
+                in_window = (group['ts'] >= window_start.iat[row]) & (group['ts'] < window_end.iat[row])
+                avg_temp.iat[row] = round(group.loc[in_window, 'temperature'].mean(), 2)
+    
+    output = pd.DataFrame({
+        'device_id': windows['device_id'],
+        'window_start': window_start,
+        'window_end': window_end,
+        'avg_temp': avg_temp,
+        'event_count': windows['event_count'],
+        'min_temp': windows['min_temp'],
+        'max_temp': windows['max_temp'],
+    })
+    
+    return output.sort_values(['window_start', 'device_id']).reset_index(drop=True)
+
+
+def keep_latest_events(event_ids: pd.Series, timestamps: pd.Series) -> np.ndarray:
+    """Mask of the latest copy of each event_id (the last one among ties), rows unsorted."""
+    codes, uniques = pd.factorize(event_ids, use_na_sentinel=False)
+    times = timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    latest = np.full(len(uniques), np.iinfo(np.int64).min)
+    np.maximum.at(latest, codes, times)
+    # Row of the last copy at the latest time, per id
+    candidates = np.nonzero(times == latest[codes])[0]
+    winner = np.full(len(uniques), -1)
+    np.maximum.at(winner, codes[candidates], candidates)
+    keep = np.zeros(len(times), dtype=bool)
+    keep[winner] = True
+    return keep
+
+
+def _stats_by_device_partition(events: pd.DataFrame, processes: int, **kwargs) -> pd.DataFrame:
+    """compute_sliding_window_stats on device_id hash partitions in a process pool."""
+    partition = pd.util.hash_array(events['device_id'].astype(str).to_numpy(dtype=object)) % np.uint64(processes)
+    parts = [events[partition == i] for i in range(processes)]
+    parts = [part for part in parts if not part.empty] or [events]
+    with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+        partials = list(executor.map(partial(compute_sliding_window_stats, **kwargs), parts))
+    output = pd.concat(partials, ignore_index=True)
+    return output.sort_values(['window_start', 'device_id'], kind='stable').reset_index(drop=True)
+
+
 def process_device_stats_batch_simulation(
     events_path: str,
     watermark_minutes: int = 10,
     window_length_minutes: int = 5,
-    slide_minutes: int = 1
+    slide_minutes: int = 1,
+    processes: int = 1
 ) -> pd.DataFrame:
     """
     Simulate streaming processing of device stats using batch logic.
@@ -58,9 +217,12 @@ def process_device_stats_batch_simulation(
     
     Args:
         events_path: Path to event stream data
-        watermark_minutes: How late events can arrive
+        watermark_minutes: How late events can arrive (unused here: the
+            batch sees the whole file; see process_device_stats_streaming)
         window_length_minutes: Window size
         slide_minutes: Window slide interval
+        processes: Worker processes; above 1, device_id hash partitions
+            are aggregated in parallel
     
     Returns:
         DataFrame with device statistics per window
@@ -69,8 +231,8 @@ def process_device_stats_batch_simulation(
     stream = pd.read_csv(events_path)
     stream['ts'] = pd.to_datetime(stream['ts'])
     
-    # Step 2: Deduplicate by event_id (keep latest by timestamp)
-    clean = stream.sort_values('ts').drop_duplicates(subset=['event_id'], keep='last')
+    # Step 2: Deduplicate by event_id (keep latest by timestamp, no sort)
+    clean = stream[keep_latest_events(stream['event_id'], stream['ts'])]
     
     print(f"Total events: {len(stream)}")
     print(f"After deduplication: {len(clean)}")
@@ -82,42 +244,525 @@ def process_device_stats_batch_simulation(
     
     print(f"Event time range: {min_time} to {max_time}\n")
     
-    # Step 4: Generate sliding windows and compute aggregates
-    results = []
+    # Step 4: Compute sliding window aggregates from pane partials
+    if processes > 1:
+        output = _stats_by_device_partition(
+            clean[['device_id', 'ts', 'temperature']],
+            processes,
+            window_length_minutes=window_length_minutes,
+            slide_minutes=slide_minutes,
+            origin=min_time
+        )
+    else:
+        output = compute_sliding_window_stats(clean, window_length_minutes, slide_minutes)
     
-    for window_start, window_end in create_sliding_windows(
-        min_time, 
-        max_time, 
-        window_length_minutes, 
-        slide_minutes
+    return output
+
+
+class StreamingDeviceStats:
+    """
+    Event-at-a-time sliding window device stats with watermark-driven state.
+    
+    Windows are aligned to multiples of the slide (e.g. [10:01, 10:06)), and
+    time is cut into panes of gcd(window_length, slide) minutes. Per device
+    only the open panes are kept as [count, temp_sum, temp_count, min, max],
+    so state is bounded by the watermark plus one window, not by the stream.
+    
+    A trigger fires whenever the latest event time crosses into a new slide
+    interval. At each trigger the watermark moves to the latest event time
+    minus watermark_minutes, and then:
+    - UPDATE mode emits the current aggregates of every window that changed
+      since the previous trigger
+    - APPEND mode emits every window that ended at or before the watermark,
+      exactly once
+    Afterwards panes whose last window is closed and dedup keys older than
+    the watermark are evicted. Events older than the watermark are dropped
+    and counted. Pending windows and panes are also kept in min-heaps, so a
+    trigger only touches what closes or expires.
+    
+    Event ids are remembered until the watermark passes them (also in a
+    min-heap). The first copy of an event is counted; a later copy is a
+    duplicate even if its ts is newer, because windows it was counted in
+    may already have been emitted.
+    """
+    
+    def __init__(
+        self,
+        watermark_minutes: int = 10,
+        window_length_minutes: int = 5,
+        slide_minutes: int = 1,
+        output_mode: str = 'update'
     ):
-        # Filter events in this window
-        in_window = clean[
-            (clean['ts'] >= window_start) & 
-            (clean['ts'] < window_end)
-        ]
-        
-        if len(in_window) == 0:
-            continue
-        
-        # Aggregate per device
-        for device_id, group in in_window.groupby('device_id'):
-            results.append({
-                'device_id': device_id,
-                'window_start': window_start,
-                'window_end': window_end,
-                'avg_temp': round(group['temperature'].mean(), 2),
-                'event_count': len(group),
-                'min_temp': group['temperature'].min(),
-                'max_temp': group['temperature'].max()
-            })
-    
-    output = pd.DataFrame(results)
-    
-    # Step 5: Sort by window and device
-    output = output.sort_values(['window_start', 'device_id']).reset_index(drop=True)
+        """
+        Initialize the processor.
+        
+        Args:
+            watermark_minutes: How late events can arrive
+            window_length_minutes: Window size
+            slide_minutes: Window slide interval
+            output_mode: 'update' or 'append'
+        """
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode} (expected one of {OUTPUT_MODES})")
+        
+        self.config = {
+            'watermark_minutes': watermark_minutes,
+            'window_length_minutes': window_length_minutes,
+            'slide_minutes': slide_minutes,
+            'output_mode': output_mode,
+        }
+        self.output_mode = output_mode
+        self.watermark_delay = watermark_minutes * NANOS_PER_MINUTE
+        self.window_length = window_length_minutes * NANOS_PER_MINUTE
+        self.slide = slide_minutes * NANOS_PER_MINUTE
+        self.pane_length = math.gcd(window_length_minutes, slide_minutes) * NANOS_PER_MINUTE
+        
+        # device_id -> pane index -> [count, temp_sum, temp_count, min_temp, max_temp]
+        self.panes: Dict[str, Dict[int, List[float]]] = {}
+        # event_id -> event time (ns) of the copy that was kept
+        self.seen: Dict[str, int] = {}
+        # (window index, device_id) changed since the last trigger (update mode)
+        self.dirty = set()
+        # (window index, device_id) not emitted yet (append mode)
+        self.pending = set()
+        
+        # Min-heaps ordering state by when it closes or expires
+        self.pending_heap: List[Tuple[int, str]] = []
+        self.pane_heap: List[Tuple[int, str]] = []
+        self.seen_heap: List[Tuple[int, str]] = []
+        
+        self.max_event_time: Optional[int] = None
+        self.watermark: Optional[float] = None
+        self.tz = None
+        self.offset = 0
+        self.source_offset = None
+        self.checkpointed_offset = 0
+        self.counters = {
+            'events': 0,
+            'duplicates': 0,
+            'late_dropped': 0,
+            'rows_emitted': 0,
+            'panes_evicted': 0,
+        }
     
-    return output
+    def _windows_for_pane(self, pane: int) -> range:
+        """Indexes of the windows that contain a pane."""
+        pane_start = pane * self.pane_length
+        return range((pane_start - self.window_length) // self.slide + 1, pane_start // self.slide + 1)
+    
+    def _last_closed_window(self) -> float:
+        """Index of the last window that ends at or before the watermark."""
+        if self.watermark == math.inf:
+            return math.inf
+        return (int(self.watermark) - self.window_length) // self.slide
+    
+    def process(self, event: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Add one event and return the rows emitted by the trigger it fires, if any.
+        
+        Args:
+            event: Mapping with device_id, ts, temperature and event_id
+        
+        Returns:
+            Emitted window rows (empty unless a trigger fired)
+        """
+        self.offset += 1
+        self.counters['events'] += 1
+        
+        ts = pd.Timestamp(event['ts'])
+        if self.tz is None and self.max_event_time is None:
+            self.tz = ts.tz
+        event_time = ts.value
+        
+        # Late beyond the watermark: every window it belongs to may be closed
+        if self.watermark is not None and event_time < self.watermark:
+            self.counters['late_dropped'] += 1
+            return []
+        
+        event_id = event.get('event_id')
+        if event_id is not None:
+            if event_id in self.seen:
+                self.counters['duplicates'] += 1
+                return []
+            self.seen[event_id] = event_time
+            heapq.heappush(self.seen_heap, (event_time, event_id))
+        
+        device_id = event['device_id']
+        pane = event_time // self.pane_length
+        temperature = event.get('temperature')
+        has_temperature = temperature is not None and not pd.isna(temperature)
+        
+        device_panes = self.panes.setdefault(device_id, {})
+        state = device_panes.get(pane)
+        if state is None:
+            state = device_panes[pane] = [0, 0.0, 0, math.nan, math.nan]
+            heapq.heappush(self.pane_heap, (pane, device_id))
+            if self.output_mode == 'append':
+                for window in self._windows_for_pane(pane):
+                    if (window, device_id) not in self.pending:
+                        self.pending.add((window, device_id))
+                        heapq.heappush(self.pending_heap, (window, device_id))
+        state[0] += 1
+        if has_temperature:
+            state[1] += temperature
+            state[2] += 1
+            state[3] = temperature if state[2] == 1 else min(state[3], temperature)
+            state[4] = temperature if state[2] == 1 else max(state[4], temperature)
+        
+        if self.output_mode == 'update':
+            for window in self._windows_for_pane(pane):
+                self.dirty.add((window, device_id))
+        
+        previous = self.max_event_time
+        if previous is None or event_time > previous:
+            self.max_event_time = event_time
+            if previous is None or event_time // self.slide > previous // self.slide:
+                return self._trigger(event_time - self.watermark_delay)
+        return []
+    
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        End of stream: advance the watermark past every window and flush.
+        
+        A closed processor accepts no more events and cannot be checkpointed.
+        
+        Returns:
+            The remaining window rows
+        """
+        return self._trigger(math.inf)
+    
+    def run(
+        self,
+        source: Iterable[Mapping[str, Any]],
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_every: int = 10_000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a (possibly unbounded) iterator of events.
+        
+        With checkpoint_dir, state is checkpointed every checkpoint_every
+        events, after the rows emitted so far have been consumed, and once
+        more when the source is exhausted, before the final flush. A
+        restarted processor re-emits the rows produced between its last
+        checkpoint and the crash (or the flush, when resuming a source that
+        has grown), so sinks should upsert on (device_id, window_start).
+        
+        Args:
+            source: Events in arrival order; if it has an ``offset``
+                attribute (like SensorFileSource) that is checkpointed too
+            checkpoint_dir: Directory for checkpoints (None disables them)
+            checkpoint_every: Events between checkpoints
+        
+        Yields:
+            Window rows as their triggers fire, then the final flush
+        """
+        for event in source:
+            yield from self.process(event)
+            if checkpoint_dir and self.offset - self.checkpointed_offset >= checkpoint_every:
+                self.checkpoint(checkpoint_dir, getattr(source, 'offset', None))
+        # Checkpoint the open windows, not the flush below: a run resumed
+        # after more events arrive must still accept them
+        if checkpoint_dir:
+            self.checkpoint(checkpoint_dir, getattr(source, 'offset', None))
+        yield from self.close()
+    
+    async def arun(self, source: AsyncIterable[Mapping[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process an async source of events (e.g. a message queue consumer).
+        
+        Args:
+            source: Async iterable of events in arrival order
+        
+        Yields:
+            Window rows as their triggers fire, then the final flush
+        """
+        async for event in source:
+            for row in self.process(event):
+                yield row
+        for row in self.close():
+            yield row
+    
+    def _trigger(self, watermark: float) -> List[Dict[str, Any]]:
+        """Advance the watermark, emit rows for the output mode and evict state."""
+        if self.watermark is None or watermark > self.watermark:
+            self.watermark = watermark
+        
+        if self.output_mode == 'update':
+            keys = sorted(self.dirty)
+            self.dirty.clear()
+        else:
+            keys = self._closed_windows()
+        
+        bounds = {}
+        rows = []
+        for window, device_id in keys:
+            if window not in bounds:
+                window_start = pd.Timestamp(window * self.slide, tz=self.tz)
+                bounds[window] = (window_start, window_start + pd.Timedelta(self.window_length, unit='ns'))
+            rows.append(self._window_row(window, device_id, *bounds[window]))
+        self.counters['rows_emitted'] += len(rows)
+        self._evict()
+        return rows
+    
+    def _closed_windows(self) -> List[Tuple[int, str]]:
+        """Pop the pending windows that ended at or before the watermark."""
+        last_closed = self._last_closed_window()
+        keys = []
+        while self.pending_heap and self.pending_heap[0][0] <= last_closed:
+            key = heapq.heappop(self.pending_heap)
+            self.pending.discard(key)
+            keys.append(key)
+        return keys
+    
+    def _window_row(
+        self,
+        window: int,
+        device_id: str,
+        window_start: pd.Timestamp,
+        window_end: pd.Timestamp
+    ) -> Dict[str, Any]:
+        """Combine the panes of one window into an output row."""
+        first_pane = window * self.slide // self.pane_length
+        device_panes = self.panes.get(device_id, {})
+        count, temp_sum, temp_count = 0, 0.0, 0
+        min_temp, max_temp = math.nan, math.nan
+        for pane in range(first_pane, first_pane + self.window_length // self.pane_length):
+            state = device_panes.get(pane)
+            if state is None:
+                continue
+            count += state[0]
+            if state[2]:
+                temp_sum += state[1]
+                min_temp = state[3] if temp_count == 0 else min(min_temp, state[3])
+                max_temp = state[4] if temp_count == 0 else max(max_temp, state[4])
+                temp_count += state[2]
+        
+        return {
+            'device_id': device_id,
+            'window_start': window_start,
+            'window_end': window_end,
+            # Half-cents round like Series.round (to even after scaling), as in the batch
+            'avg_temp': round(temp_sum / temp_count * 100) / 100 if temp_count else math.nan,
+            'event_count': count,
+            'min_temp': min_temp,
+            'max_temp': max_temp,
+        }
+    
+    def _evict(self) -> None:
+        """Drop panes whose windows are all closed and dedup keys behind the watermark."""
+        # The last window of pane p closes once p * pane_length is past the last closed window
+        last_closed = self._last_closed_window()
+        while self.pane_heap and (
+            last_closed == math.inf
+            or self.pane_heap[0][0] * self.pane_length < (last_closed + 1) * self.slide
+        ):
+            pane, device_id = heapq.heappop(self.pane_heap)
+            device_panes = self.panes[device_id]
+            del device_panes[pane]
+            if not device_panes:
+                del self.panes[device_id]
+            self.counters['panes_evicted'] += 1
+        
+        # A later copy of these ids would be dropped as late anyway
+        while self.seen_heap and self.seen_heap[0][0] < self.watermark:
+            _, event_id = heapq.heappop(self.seen_heap)
+            del self.seen[event_id]
+    
+    def checkpoint(self, checkpoint_dir: str, source_offset: Optional[int] = None) -> None:
+        """
+        Persist operator state so a restarted processor resumes from here.
+        
+        The open panes, dedup keys, heaps, watermark, counters and source
+        offset are all bounded by the watermark, so they go to one
+        checkpoint.json, replaced atomically.
+        
+        Args:
+            checkpoint_dir: Checkpoint directory
+            source_offset: Position in the source after the last processed event
+        
+        Raises:
+            ValueError: If the processor was closed (its watermark is past
+                every window, so a resumed run would drop every event)
+        """
+        if self.watermark == math.inf:
+            raise ValueError("A closed processor cannot be checkpointed")
+        
+        directory = Path(checkpoint_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        if source_offset is not None:
+            self.source_offset = source_offset
+        
+        state = {
+            'config': self.config,
+            'offset': self.offset,
+            'source_offset': self.source_offset,
+            'max_event_time': self.max_event_time,
+            'watermark': self.watermark,
+            'tz': str(self.tz) if self.tz is not None else None,
+            'counters': self.counters,
+            # NaN min/max (no temperature yet) stored as null
+            'panes': {
+                device_id: [
+                    [pane] + [None if isinstance(v, float) and math.isnan(v) else v for v in pane_state]
+                    for pane, pane_state in device_panes.items()
+                ]
+                for device_id, device_panes in self.panes.items()
+            },
+            'dirty': sorted(self.dirty),
+            'pending_heap': self.pending_heap,
+            'pane_heap': self.pane_heap,
+            # The keys of seen, with their times, in heap order
+            'seen_heap': self.seen_heap,
+        }
+        
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, directory / CHECKPOINT_FILE)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        
+        self.checkpointed_offset = self.offset
+    
+    @classmethod
+    def restore(cls, checkpoint_dir: str) -> Optional['StreamingDeviceStats']:
+        """
+        Rebuild a processor from its last checkpoint.
+        
+        Args:
+            checkpoint_dir: Checkpoint directory
+        
+        Returns:
+            The restored processor, or None if there is no checkpoint
+        """
+        path = Path(checkpoint_dir) / CHECKPOINT_FILE
+        if not path.exists():
+            return None
+        with open(path) as f:
+            state = json.load(f)
+        
+        processor = cls(**state['config'])
+        processor.offset = processor.checkpointed_offset = state['offset']
+        processor.source_offset = state['source_offset']
+        processor.max_event_time = state['max_event_time']
+        processor.watermark = state['watermark']
+        processor.tz = pd.Timestamp(0, tz=state['tz']).tz if state['tz'] else None
+        processor.counters = state['counters']
+        processor.panes = {
+            device_id: {
+                pane: [math.nan if v is None else v for v in pane_state]
+                for pane, *pane_state in device_panes
+            }
+            for device_id, device_panes in state['panes'].items()
+        }
+        processor.dirty = {tuple(key) for key in state['dirty']}
+        # Lists saved from valid heaps are still valid heaps
+        processor.pending_heap = [tuple(key) for key in state['pending_heap']]
+        processor.pending = set(processor.pending_heap)
+        processor.pane_heap = [tuple(key) for key in state['pane_heap']]
+        processor.seen_heap = [tuple(key) for key in state['seen_heap']]
+        processor.seen = {event_id: event_time for event_time, event_id in processor.seen_heap}
+        return processor
+    
+    def state_size(self) -> Dict[str, int]:
+        """Number of open panes and dedup keys currently held."""
+        return {
+            'panes': sum(len(device_panes) for device_panes in self.panes.values()),
+            'dedup_keys': len(self.seen),
+        }
+
+
+class SensorFileSource:
+    """
+    Sensor CSV read line by line, remembering its byte offset.
+    
+    The offset after each yielded event can be checkpointed and passed back
+    as start_offset, so a restart seeks straight to the first unprocessed
+    line instead of re-reading the file.
+    """
+    
+    def __init__(self, events_path: str, start_offset: Optional[int] = None):
+        """
+        Initialize the source.
+        
+        Args:
+            events_path: Path to event stream data
+            start_offset: Byte offset to resume from (None: first data line)
+        """
+        self.events_path = events_path
+        self.offset = start_offset
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield event dicts with ts parsed and temperature as float (None if empty)."""
+        with open(self.events_path, 'rb') as f:
+            columns = next(csv.reader([f.readline().decode('utf-8')]))
+            if self.offset is None or self.offset < f.tell():
+                self.offset = f.tell()
+            f.seek(self.offset)
+            
+            for line in iter(f.readline, b''):
+                self.offset += len(line)
+                values = next(csv.reader([line.decode('utf-8')]), None)
+                if not values:
+                    continue
+                event = dict(zip(columns, values))
+                event['ts'] = pd.Timestamp(event['ts'])
+                event['temperature'] = float(event['temperature']) if event.get('temperature') else None
+                yield event
+
+
+def process_device_stats_streaming(
+    events_path: str,
+    watermark_minutes: int = 10,
+    window_length_minutes: int = 5,
+    slide_minutes: int = 1,
+    output_mode: str = 'append',
+    checkpoint_dir: Optional[str] = None,
+    checkpoint_every: int = 10_000
+) -> pd.DataFrame:
+    """
+    Process device stats event by event with watermarking.
+    
+    Unlike process_device_stats_batch_simulation, the file is read lazily
+    and rows are emitted as the watermark advances; here they are collected
+    into a DataFrame for display.
+    
+    With checkpoint_dir, a previous run's checkpoint is resumed (its window
+    settings win) and only the rest of the file is read.
+    
+    Args:
+        events_path: Path to event stream data
+        watermark_minutes: How late events can arrive
+        window_length_minutes: Window size
+        slide_minutes: Window slide interval
+        output_mode: 'update' or 'append'
+        checkpoint_dir: Directory for checkpoints (None disables them)
+        checkpoint_every: Events between checkpoints
+    
+    Returns:
+        DataFrame with every row emitted by this run, in emission order
+    """
+    processor = StreamingDeviceStats.restore(checkpoint_dir) if checkpoint_dir else None
+    if processor is None:
+        processor = StreamingDeviceStats(watermark_minutes, window_length_minutes, slide_minutes, output_mode)
+    else:
+        print(f"Resuming from checkpoint after {processor.offset} events (byte {processor.source_offset})")
+    
+    source = SensorFileSource(events_path, start_offset=processor.source_offset)
+    rows = list(processor.run(source, checkpoint_dir, checkpoint_every))
+    
+    counters = processor.counters
+    print(f"Total events: {counters['events']}")
+    print(f"Duplicate events removed: {counters['duplicates']}")
+    print(f"Late events dropped: {counters['late_dropped']}")
+    print(f"Rows emitted ({output_mode} mode): {counters['rows_emitted']}\n")
+    
+    return pd.DataFrame(rows, columns=[
+        'device_id', 'window_start', 'window_end', 'avg_temp',
+        'event_count', 'min_temp', 'max_temp'
+    ])
 
 
 def explain_streaming_concepts():
@@ -162,6 +807,9 @@ def explain_streaming_concepts():
 
 
 if __name__ == '__main__':
+    # Sample data sits next to this file
+    DATA_DIR = Path(__file__).parent
+    
     # Print concept explanations
     explain_streaming_concepts()
     
@@ -171,7 +819,7 @@ if __name__ == '__main__':
     print("=" * 70 + "\n")
     
     result = process_device_stats_batch_simulation(
-        events_path='sensor_stream_sample.csv',
+        events_path=str(DATA_DIR / 'sensor_stream_sample.csv'),
         watermark_minutes=10,
         window_length_minutes=5,
         slide_minutes=1
@@ -195,3 +843,19 @@ if __name__ == '__main__':
     print("=" * 70)
     device_001_windows = result[result['device_id'] == 'device_001']
     print(device_001_windows[['window_start', 'window_end', 'avg_temp', 'event_count']].to_string(index=False))
+    
+    # Same stats, event at a time with a watermark
+    print("\n" + "=" * 70)
+    print("STREAMING MODE (append, 10-minute watermark)")
+    print("=" * 70 + "\n")
+    
+    streamed = process_device_stats_streaming(
+        events_path=str(DATA_DIR / 'sensor_stream_sample.csv'),
+        watermark_minutes=10,
+        window_length_minutes=5,
+        slide_minutes=1,
+        output_mode='append'
+    )
+    print(streamed[streamed['device_id'] == 'device_001'][
+        ['window_start', 'window_end', 'avg_temp', 'event_count']
+    ].to_string(index=False))
@@ -1,6 +1,13 @@
 -- Example production transformation: Create aggregated metrics
 -- This transforms data from staging dataset to production dataset
 -- Filename pattern: prod_*.sql
+--
+-- Incremental model: each run only recomputes the last lookback_days
+-- partitions; the PARTITION_START/PARTITION_END placeholders bound the
+-- source scan to that window.
+-- materialized: incremental
+-- partition_by: date
+-- lookback_days: 3
 
 -- Replace with your actual business logic
 SELECT
@@ -11,6 +18,8 @@ SELECT
     CURRENT_TIMESTAMP() AS processed_at
 FROM 
     `${GCP_PROJECT_ID}.staging.sample_table`
+WHERE
+    DATE(created_at) BETWEEN ${PARTITION_START} AND ${PARTITION_END}
 GROUP BY 
     DATE(created_at)
 ORDER BY 
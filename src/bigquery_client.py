@@ -1,10 +1,22 @@
 """BigQuery client wrapper for pipeline operations."""
 
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 from google.oauth2 import service_account
-from typing import Optional, List, Dict, Any
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Union
+import datetime
+import itertools
 import logging
+import os
+import tempfile
+import time
 from .config import Config
+from .query_cache import QueryResultCache, is_cacheable, make_cache_key, table_references
+from .templates import template_cache, default_params
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,6 +31,7 @@ class BigQueryClient:
         Args:
             credentials_path: Path to service account JSON file
         """
+        credentials = None
         if credentials_path or Config.GCP_CREDENTIALS_PATH:
             creds_path = credentials_path or Config.GCP_CREDENTIALS_PATH
             credentials = service_account.Credentials.from_service_account_file(creds_path)
@@ -30,6 +43,11 @@ class BigQueryClient:
             # Use application default credentials
             self.client = bigquery.Client(project=Config.GCP_PROJECT_ID)
         
+        self.query_cache = QueryResultCache()
+        self.templates = template_cache
+        self._credentials = credentials
+        self._read_client = None
+        
         logger.info(f"BigQuery client initialized for project: {Config.GCP_PROJECT_ID}")
     
     def create_dataset(self, dataset_id: str, location: str = None) -> bigquery.Dataset:
@@ -60,54 +78,111 @@ class BigQueryClient:
         dataset_id: str,
         table_id: str,
         schema: Optional[List[bigquery.SchemaField]] = None,
-        write_disposition: str = "WRITE_TRUNCATE"
+        write_disposition: str = "WRITE_TRUNCATE",
+        job_id: Optional[str] = None
     ) -> bigquery.LoadJob:
         """Load data from a file into BigQuery.
         
         Args:
-            source_file: Path to source file (CSV, JSON, etc.)
+            source_file: Path to source file (CSV, JSON, Parquet)
             dataset_id: Target dataset ID
             table_id: Target table ID
             schema: Table schema (optional, can be auto-detected)
             write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            job_id: Optional job ID (see ``submit_load_from_file``)
             
         Returns:
             Load job object
         """
+        job = self.submit_load_from_file(
+            source_file, dataset_id, table_id, schema, write_disposition, job_id
+        )
+        job.result()  # Wait for job to complete
+        logger.info(f"Loaded {job.output_rows} rows into {job.destination}")
+        return job
+    
+    def submit_load_from_file(
+        self,
+        source_file: str,
+        dataset_id: str,
+        table_id: str,
+        schema: Optional[List[bigquery.SchemaField]] = None,
+        write_disposition: str = "WRITE_TRUNCATE",
+        job_id: Optional[str] = None
+    ) -> bigquery.LoadJob:
+        """Upload a file and start a load job without waiting for it.
+        
+        The file bytes are uploaded before this returns; only the server-side
+        load is left running. Use ``wait_all`` or ``as_completed`` to wait.
+        
+        Args:
+            source_file: Path to source file (CSV, JSON, Parquet)
+            dataset_id: Target dataset ID
+            table_id: Target table ID
+            schema: Table schema (optional, can be auto-detected)
+            write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            job_id: Optional job ID. BigQuery refuses a second job with the
+                same ID, so a retried append cannot load the data twice
+                (look the job up with ``get_job`` before resubmitting).
+            
+        Returns:
+            Running load job
+        """
         table_ref = f"{Config.GCP_PROJECT_ID}.{dataset_id}.{table_id}"
         
         job_config = bigquery.LoadJobConfig()
         job_config.write_disposition = write_disposition
         
-        # Auto-detect schema if not provided
-        if schema:
-            job_config.schema = schema
-        else:
-            job_config.autodetect = True
-        
         # Determine source format from file extension
         if source_file.endswith('.csv'):
             job_config.source_format = bigquery.SourceFormat.CSV
             job_config.skip_leading_rows = 1
         elif source_file.endswith('.json'):
             job_config.source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+        elif source_file.endswith('.parquet'):
+            job_config.source_format = bigquery.SourceFormat.PARQUET
+        
+        # Auto-detect schema if not provided (Parquet carries its own schema)
+        if schema:
+            job_config.schema = schema
+        elif job_config.source_format != bigquery.SourceFormat.PARQUET:
+            job_config.autodetect = True
         
         with open(source_file, "rb") as source:
             job = self.client.load_table_from_file(
                 source,
                 table_ref,
+                job_id=job_id,
                 job_config=job_config
             )
         
-        job.result()  # Wait for job to complete
-        logger.info(f"Loaded {job.output_rows} rows into {table_ref}")
+        logger.info(f"Submitted load job {job.job_id} for {table_ref}")
         return job
     
+    def get_job(
+        self,
+        job_id: str
+    ) -> Optional[Union[bigquery.LoadJob, bigquery.QueryJob, bigquery.CopyJob]]:
+        """Look up a job by ID.
+        
+        Args:
+            job_id: Job ID
+            
+        Returns:
+            The job, or None if no job with that ID exists
+        """
+        try:
+            return self.client.get_job(job_id, location=Config.BQ_LOCATION)
+        except NotFound:
+            return None
+    
     def execute_query(
         self,
         query: str,
         destination_table: Optional[str] = None,
-        write_disposition: str = "WRITE_TRUNCATE"
+        write_disposition: str = "WRITE_TRUNCATE",
+        time_partitioning_field: Optional[str] = None,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
     ) -> bigquery.QueryJob:
         """Execute a SQL query.
         
@@ -115,25 +190,85 @@ class BigQueryClient:
             query: SQL query string
             destination_table: Optional destination table (format: dataset.table)
             write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            time_partitioning_field: Optional DATE/TIMESTAMP column used to
+                day-partition the destination table
+            query_parameters: Values for ``@name`` parameters in the query
             
         Returns:
             Query job object
         """
+        query_job = self.submit_query(
+            query, destination_table, write_disposition, time_partitioning_field,
+            query_parameters
+        )
+        query_job.result()  # Wait for completion
+        
+        logger.info(f"Query executed successfully")
+        if destination_table:
+            logger.info(f"Results written to {destination_table}")
+        
+        return query_job
+    
+    def submit_query(
+        self,
+        query: str,
+        destination_table: Optional[str] = None,
+        write_disposition: str = "WRITE_TRUNCATE",
+        time_partitioning_field: Optional[str] = None,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
+    ) -> bigquery.QueryJob:
+        """Start a SQL query without waiting for it to finish.
+        
+        Args:
+            query: SQL query string
+            destination_table: Optional destination table (format: dataset.table)
+            write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            time_partitioning_field: Optional DATE/TIMESTAMP column used to
+                day-partition the destination table
+            query_parameters: Values for ``@name`` parameters in the query
+            
+        Returns:
+            Running query job
+        """
         job_config = bigquery.QueryJobConfig()
         
         if destination_table:
             table_ref = f"{Config.GCP_PROJECT_ID}.{destination_table}"
             job_config.destination = table_ref
             job_config.write_disposition = write_disposition
+            if time_partitioning_field:
+                job_config.time_partitioning = bigquery.TimePartitioning(
+                    type_=bigquery.TimePartitioningType.DAY,
+                    field=time_partitioning_field
+                )
+        if query_parameters:
+            job_config.query_parameters = query_parameters
         
         query_job = self.client.query(query, job_config=job_config)
-        query_job.result()  # Wait for completion
+        logger.info(f"Submitted query job {query_job.job_id}")
+        return query_job
+    
+    def dry_run_query(
+        self,
+        query: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
+    ) -> int:
+        """Estimate the bytes a query would scan without running it.
         
-        logger.info(f"Query executed successfully")
-        if destination_table:
-            logger.info(f"Results written to {destination_table}")
+        Args:
+            query: SQL query string
+            query_parameters: Values for ``@name`` parameters in the query
         
-        return query_job
+        Returns:
+            Bytes the query would process
+        """
+        job_config = bigquery.QueryJobConfig(
+            dry_run=True,
+            use_query_cache=False,
+            query_parameters=query_parameters or []
+        )
+        query_job = self.client.query(query, job_config=job_config)
+        return query_job.total_bytes_processed or 0
     
     def execute_query_from_file(
         self,
@@ -151,15 +286,533 @@ class BigQueryClient:
         Returns:
             Query job object
         """
-        with open(sql_file, 'r') as f:
-            query = f.read()
+        query, query_parameters = self.compile_sql_file(sql_file, params)
+        return self.execute_query(query, destination_table, query_parameters=query_parameters)
+    
+    def submit_query_from_file(
+        self,
+        sql_file: str,
+        destination_table: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> bigquery.QueryJob:
+        """Start a SQL query from a file without waiting for it to finish.
+        
+        Args:
+            sql_file: Path to SQL file
+            destination_table: Optional destination table
+            params: Optional parameters to substitute in query
+            
+        Returns:
+            Running query job
+        """
+        query, query_parameters = self.compile_sql_file(sql_file, params)
+        return self.submit_query(query, destination_table, query_parameters=query_parameters)
+    
+    def query_to_arrow(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> pa.Table:
+        """Run a read query and return the result, serving repeats from cache.
+        
+        Results are cached by normalized query text, parameters and the
+        last-modified time of every referenced table, so a cached result is
+        reused only while its inputs are unchanged (and within the TTL).
+        Queries using non-deterministic functions are never cached.
+        
+        Args:
+            query: SQL query string
+            params: Parameters already substituted into the query (part of
+                the cache key)
+            use_cache: Set to False to bypass the cache
+            
+        Returns:
+            Query result as an Arrow table
+        """
+        key = self._result_cache_key(query, params) if use_cache else None
+        if key:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                logger.info(f"Query result served from cache ({cached.num_rows} rows)")
+                return cached
+        
+        result = self.execute_query(query).result().to_arrow()
+        
+        if key:
+            self.query_cache.put(key, result)
+        return result
+    
+    def query_file_to_arrow(
+        self,
+        sql_file: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> pa.Table:
+        """Run a read query from a SQL file, serving repeats from cache.
+        
+        Args:
+            sql_file: Path to SQL file
+            params: Optional parameters to substitute in query
+            use_cache: Set to False to bypass the cache
+            
+        Returns:
+            Query result as an Arrow table
+        """
+        query = self.render_sql_file(sql_file, params)
+        return self.query_to_arrow(query, params, use_cache)
+    
+    def query_to_record_batches(
+        self,
+        query: str,
+        page_size: Optional[int] = None,
+        max_stream_count: Optional[int] = None
+    ) -> pa.RecordBatchReader:
+        """Run a query and stream its result as Arrow record batches.
+        
+        With google-cloud-bigquery-storage installed the result is read over
+        the BigQuery Storage API, in up to ``max_stream_count`` streams
+        downloaded in parallel; otherwise it is paged over REST,
+        ``page_size`` rows at a time. Only a few batches are held in memory
+        at once, whatever the size of the result.
+        
+        Args:
+            query: SQL query string
+            page_size: Rows per REST page (default from config)
+            max_stream_count: Parallel Storage API streams (default from
+                config; 0 lets BigQuery choose)
+            
+        Returns:
+            Reader yielding the result batches, with the result schema
+        """
+        query_job = self.execute_query(query)
+        rows = query_job.result(page_size=page_size or Config.RESULT_PAGE_SIZE)
+        # max_stream_count is only understood by newer google-cloud-bigquery
+        # releases; leave it out unless a limit is set
+        stream_options = {}
+        max_stream_count = max_stream_count or Config.RESULT_MAX_STREAMS
+        if max_stream_count:
+            stream_options['max_stream_count'] = max_stream_count
+        batches = iter(rows.to_arrow_iterable(
+            bqstorage_client=self._storage_read_client(),
+            **stream_options
+        ))
+        
+        first = next(batches, None)
+        if first is None:
+            # Nothing to stream; an empty result still carries the schema
+            return pa.RecordBatchReader.from_batches(query_job.result().to_arrow().schema, [])
+        return pa.RecordBatchReader.from_batches(first.schema, itertools.chain([first], batches))
+    
+    def query_to_dataframes(
+        self,
+        query: str,
+        page_size: Optional[int] = None,
+        max_stream_count: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Run a query and yield its result as one DataFrame per record batch.
+        
+        Args:
+            query: SQL query string
+            page_size: Rows per REST page (default from config)
+            max_stream_count: Parallel Storage API streams (default from config)
+            
+        Yields:
+            pandas DataFrames in result order
+        """
+        for batch in self.query_to_record_batches(query, page_size, max_stream_count):
+            yield batch.to_pandas()
+    
+    def query_to_parquet(
+        self,
+        query: str,
+        path: str,
+        page_size: Optional[int] = None,
+        max_stream_count: Optional[int] = None
+    ) -> int:
+        """Run a query and write its result to a local Parquet file.
+        
+        Record batches go straight from the download to the Parquet writer,
+        so memory stays flat and no Python row objects are built. The file
+        is replaced atomically once complete.
+        
+        Args:
+            query: SQL query string
+            path: Output Parquet file
+            page_size: Rows per REST page (default from config)
+            max_stream_count: Parallel Storage API streams (default from config)
+            
+        Returns:
+            Number of rows written
+        """
+        reader = self.query_to_record_batches(query, page_size, max_stream_count)
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        rows = 0
+        try:
+            with pq.ParquetWriter(tmp_path, reader.schema, compression=Config.PARQUET_COMPRESSION) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        
+        logger.info(f"Wrote {rows} result rows to {path}")
+        return rows
+    
+    def _storage_read_client(self):
+        """BigQuery Storage read client, or None when the library is missing."""
+        if self._read_client is None:
+            try:
+                from google.cloud import bigquery_storage
+            except ImportError:
+                logger.info(
+                    "google-cloud-bigquery-storage not installed; "
+                    "reading query results page by page over REST"
+                )
+                self._read_client = False
+            else:
+                self._read_client = bigquery_storage.BigQueryReadClient(credentials=self._credentials)
+        return self._read_client or None
+    
+    def _result_cache_key(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Cache key for a query, or None if its result must not be cached.
+        
+        Every table the query reads must resolve to a real table whose
+        last-modified time goes into the key. Queries reading views (whose
+        underlying tables can change without the view changing), missing
+        tables or references that cannot be named are not cached.
+        """
+        if not is_cacheable(query):
+            return None
+        references = table_references(query)
+        if references is None:
+            return None
+        
+        table_versions = {}
+        for ref in references:
+            table_ref = ref if ref.count(".") >= 2 else f"{Config.GCP_PROJECT_ID}.{ref}"
+            try:
+                version = self._table_modified(table_ref)
+            except NotFound:
+                return None
+            if version is None:
+                return None
+            table_versions[table_ref] = version
+        
+        return make_cache_key(query, params, table_versions)
+    
+    def _table_modified(self, table_ref: str) -> Any:
+        """Last-modified time of a table, or None if it is a view or other non-table.
+        
+        Raises NotFound if the table does not exist.
+        """
+        table = self.client.get_table(table_ref)
+        if table.table_type != "TABLE":
+            return None
+        return table.modified
+    
+    def render_sql_file(
+        self,
+        sql_file: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Substitute every ``${name}`` placeholder of a SQL file as text.
+        
+        The file is parsed once and cached until it changes on disk (see
+        ``templates.TemplateCache``). ``GCP_PROJECT_ID`` defaults to the
+        configured project.
+        
+        Args:
+            sql_file: Path to SQL file
+            params: Optional parameters to substitute in query
+            
+        Returns:
+            Rendered SQL text
+            
+        Raises:
+            ValueError: If a placeholder has no value
+        """
+        return self.templates.get(sql_file).render(default_params(params))
+    
+    def compile_sql_file(
+        self,
+        sql_file: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, List[bigquery.ScalarQueryParameter]]:
+        """Render a SQL file with typed values passed as query parameters.
+        
+        Date, datetime, numeric and boolean values of standalone
+        placeholders become ``@name`` parameters, so the query text (and
+        BigQuery's result cache key) does not change with them. Table
+        references and string values are substituted as text.
+        
+        Args:
+            sql_file: Path to SQL file
+            params: Optional parameters for the query
+            
+        Returns:
+            Tuple of the SQL text and its query parameters
+            
+        Raises:
+            ValueError: If a placeholder has no value
+        """
+        return self.templates.get(sql_file).compile(default_params(params))
+    
+    def replace_partitions(
+        self,
+        query: str,
+        destination_table: str,
+        partition_column: str,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
+    ) -> bigquery.QueryJob:
+        """Recompute a range of date partitions in place.
+        
+        Rows of the destination whose ``partition_column`` falls within
+        [start_date, end_date] are replaced by the rows the query returns for
+        that range, in a single atomic MERGE. Partitions outside the range are
+        not read or rewritten.
+        
+        Args:
+            query: SQL query producing the destination rows
+            destination_table: Destination table (format: dataset.table)
+            partition_column: DATE column the destination is partitioned on
+            start_date: First partition to replace (inclusive)
+            end_date: Last partition to replace (inclusive)
+            query_parameters: Values for ``@name`` parameters in the query
+            
+        Returns:
+            Query job object
+        """
+        table_ref = f"{Config.GCP_PROJECT_ID}.{destination_table}"
+        in_range = (
+            f"BETWEEN DATE '{start_date.isoformat()}' AND DATE '{end_date.isoformat()}'"
+        )
+        # Strip the trailing semicolon so the query can be nested
+        source_query = query.strip().rstrip(";")
+        
+        merge = (
+            f"MERGE `{table_ref}` AS target\n"
+            f"USING (\n"
+            f"SELECT * FROM (\n{source_query}\n)\n"
+            f"WHERE {partition_column} {in_range}\n"
+            f") AS source\n"
+            f"ON FALSE\n"
+            f"WHEN NOT MATCHED BY SOURCE AND target.{partition_column} {in_range} THEN DELETE\n"
+            f"WHEN NOT MATCHED THEN INSERT ROW"
+        )
+        
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters or [])
+        query_job = self.client.query(merge, job_config=job_config)
+        query_job.result()  # Wait for completion
+        
+        logger.info(
+            f"Replaced partitions {start_date} to {end_date} of {destination_table} "
+            f"({query_job.num_dml_affected_rows} rows affected)"
+        )
+        return query_job
+    
+    def copy_table(
+        self,
+        dataset_id: str,
+        source_table_id: str,
+        destination_table_id: str,
+        write_disposition: str = "WRITE_TRUNCATE"
+    ) -> bigquery.CopyJob:
+        """Copy one table over another within a dataset.
         
-        # Simple parameter substitution
-        if params:
-            for key, value in params.items():
-                query = query.replace(f"${{{key}}}", str(value))
+        With WRITE_TRUNCATE the destination is replaced atomically.
         
-        return self.execute_query(query, destination_table)
+        Args:
+            dataset_id: Dataset ID
+            source_table_id: Table to copy from
+            destination_table_id: Table to copy to
+            write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            
+        Returns:
+            Copy job object
+        """
+        source_ref = f"{Config.GCP_PROJECT_ID}.{dataset_id}.{source_table_id}"
+        destination_ref = f"{Config.GCP_PROJECT_ID}.{dataset_id}.{destination_table_id}"
+        
+        job_config = bigquery.CopyJobConfig()
+        job_config.write_disposition = write_disposition
+        
+        job = self.client.copy_table(source_ref, destination_ref, job_config=job_config)
+        job.result()  # Wait for job to complete
+        
+        logger.info(f"Copied {source_ref} to {destination_ref}")
+        return job
+    
+    def delete_table(self, dataset_id: str, table_id: str) -> None:
+        """Delete a table if it exists.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+        """
+        table_ref = f"{Config.GCP_PROJECT_ID}.{dataset_id}.{table_id}"
+        self.client.delete_table(table_ref, not_found_ok=True)
+        logger.info(f"Deleted table {table_ref}")
+    
+    def table_exists(self, dataset_id: str, table_id: str) -> bool:
+        """Check whether a table exists.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+            
+        Returns:
+            True if the table exists
+        """
+        table_ref = f"{Config.GCP_PROJECT_ID}.{dataset_id}.{table_id}"
+        try:
+            self.client.get_table(table_ref)
+            return True
+        except NotFound:
+            return False
+    
+    def as_completed(
+        self,
+        jobs: Iterable[Union[bigquery.LoadJob, bigquery.QueryJob]],
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 10.0,
+        cancel_on_timeout: bool = True
+    ) -> Iterator[Union[bigquery.LoadJob, bigquery.QueryJob]]:
+        """Yield jobs as they finish, polling with exponential backoff.
+        
+        The poll interval doubles while nothing completes (up to
+        ``max_poll_interval``) and resets whenever a job finishes. Failed jobs
+        are yielded like successful ones; call ``job.result()`` or
+        ``job.exception()`` to inspect them.
+        
+        Args:
+            jobs: Jobs returned by the ``submit_*`` methods
+            timeout: Overall timeout in seconds (None waits forever)
+            poll_interval: Initial seconds between polls
+            max_poll_interval: Upper bound for the backoff
+            cancel_on_timeout: Cancel unfinished jobs when the timeout expires
+            
+        Yields:
+            Finished jobs in completion order
+            
+        Raises:
+            TimeoutError: If jobs are still running after ``timeout`` seconds
+        """
+        pending = list(jobs)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = poll_interval
+        
+        while pending:
+            finished = [job for job in pending if job.done()]
+            for job in finished:
+                pending.remove(job)
+                yield job
+            
+            if not pending:
+                break
+            
+            if finished:
+                interval = poll_interval
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if cancel_on_timeout:
+                        self.cancel_jobs(pending)
+                    raise TimeoutError(
+                        f"{len(pending)} job(s) still running after {timeout}s: "
+                        + ", ".join(job.job_id for job in pending)
+                    )
+                time.sleep(min(interval, remaining))
+            else:
+                time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+    
+    def wait_all(
+        self,
+        jobs: Iterable[Union[bigquery.LoadJob, bigquery.QueryJob]],
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 10.0,
+        cancel_on_error: bool = True
+    ) -> List[Union[bigquery.LoadJob, bigquery.QueryJob]]:
+        """Wait for a batch of jobs and raise on the first failure.
+        
+        Args:
+            jobs: Jobs returned by the ``submit_*`` methods
+            timeout: Overall timeout in seconds (None waits forever)
+            poll_interval: Initial seconds between polls
+            max_poll_interval: Upper bound for the backoff
+            cancel_on_error: Cancel the remaining jobs when one fails or the
+                timeout expires
+            
+        Returns:
+            The jobs, in the order they were given
+        """
+        jobs = list(jobs)
+        pending = set(id(job) for job in jobs)
+        
+        try:
+            for job in self.as_completed(
+                jobs, timeout, poll_interval, max_poll_interval,
+                cancel_on_timeout=False
+            ):
+                pending.discard(id(job))
+                job.result()  # Raises if the job failed
+        except Exception:
+            if cancel_on_error:
+                self.cancel_jobs(job for job in jobs if id(job) in pending)
+            raise
+        
+        return jobs
+    
+    def cancel_jobs(
+        self,
+        jobs: Iterable[Union[bigquery.LoadJob, bigquery.QueryJob]]
+    ) -> None:
+        """Request cancellation of running jobs (best effort).
+        
+        Args:
+            jobs: Jobs to cancel
+        """
+        for job in jobs:
+            try:
+                job.cancel()
+                logger.warning(f"Cancelled job {job.job_id}")
+            except Exception as e:
+                logger.error(f"Error cancelling job {job.job_id}: {e}")
+    
+    def is_partitioned_by(self, dataset_id: str, table_id: str, column: str) -> bool:
+        """Check whether a table is day-partitioned by a column.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+            column: DATE/TIMESTAMP partitioning column
+            
+        Returns:
+            True if the table is partitioned by day on ``column``
+        """
+        table_ref = f"{Config.GCP_PROJECT_ID}.{dataset_id}.{table_id}"
+        partitioning = self.client.get_table(table_ref).time_partitioning
+        return (
+            partitioning is not None
+            and partitioning.field == column
+            and partitioning.type_ == bigquery.TimePartitioningType.DAY
+        )
     
     def get_table_info(self, dataset_id: str, table_id: str) -> bigquery.Table:
         """Get table metadata.
@@ -0,0 +1,190 @@
+"""Split large CSV/NDJSON files into row-aligned chunks for parallel loads."""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional, List
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def split_file(source_file: str, output_dir: str, chunk_bytes: int) -> List[str]:
+    """Stream a CSV or NDJSON file into chunk files of about ``chunk_bytes``.
+    
+    Chunks always end on a row boundary and every CSV chunk starts with the
+    header row, so each chunk is a valid file on its own. Quoted CSV fields
+    containing newlines are kept within one chunk.
+    
+    Args:
+        source_file: Path to CSV or JSON file
+        output_dir: Directory for the chunk files
+        chunk_bytes: Target chunk size in bytes
+    
+    Returns:
+        Chunk file paths in source order
+    """
+    source = Path(source_file)
+    is_csv = source.suffix == '.csv'
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    chunks = []
+    out = None
+    written = 0
+    in_quotes = False
+    
+    def open_chunk():
+        path = Path(output_dir) / f"{source.stem}.part{len(chunks):05d}{source.suffix}"
+        chunks.append(str(path))
+        return open(path, "wb")
+    
+    with open(source, "rb") as f:
+        header = f.readline() if is_csv else b""
+        for line in f:
+            if out is None:
+                out = open_chunk()
+                out.write(header)
+                written = len(header)
+            
+            out.write(line)
+            written += len(line)
+            
+            if is_csv and line.count(b'"') % 2:
+                # An odd number of quotes opens or closes a multi-line field
+                in_quotes = not in_quotes
+            
+            if written >= chunk_bytes and not in_quotes:
+                out.close()
+                out = None
+    
+    if out is not None:
+        out.close()
+    
+    logger.info(f"Split {source_file} into {len(chunks)} chunks")
+    return chunks
+
+
+class ChunkedLoadState:
+    """Progress of a chunked load, persisted so an interrupted load can resume.
+    
+    The state is tied to the source file's size and mtime and to the chunk
+    size; if any of them change the previous progress is discarded and its
+    temporary table is reported in ``abandoned_temp_table`` for cleanup.
+    
+    Every chunk is loaded under a job ID derived from the persisted state,
+    so a retry or a resumed run can look up a job that may already have
+    been submitted instead of appending the chunk a second time.
+    """
+    
+    def __init__(
+        self,
+        source_file: str,
+        table: str,
+        chunk_bytes: int,
+        state_dir: Optional[str] = None
+    ):
+        """Load existing progress for the file or start a new load.
+        
+        Args:
+            source_file: Path to the source file
+            table: Target table (format: dataset.table)
+            chunk_bytes: Chunk size the file is split with
+            state_dir: Directory for state files (default from config)
+        """
+        self.path = Path(state_dir or Config.CHUNK_STATE_DIR) / f"{table}.json"
+        self._lock = threading.Lock()
+        # Temp table of a previous load of a file that has since changed
+        self.abandoned_temp_table: Optional[str] = None
+        
+        stat = os.stat(source_file)
+        fingerprint = {
+            "source": str(Path(source_file).resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "chunk_bytes": chunk_bytes,
+        }
+        
+        state = None
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            if state.get("fingerprint") != fingerprint:
+                logger.info(f"Source changed since last attempt, restarting {table}")
+                self.abandoned_temp_table = state.get("temp_table")
+                state = None
+        
+        if state is None:
+            table_name = table.split(".")[-1]
+            state = {
+                "fingerprint": fingerprint,
+                "temp_table": f"{table_name}__chunks_{uuid.uuid4().hex[:8]}",
+                "completed": {},
+                "attempts": {},
+            }
+        else:
+            logger.info(
+                f"Resuming {table}: {len(state['completed'])} chunks already loaded"
+            )
+        
+        self.state = state
+    
+    @property
+    def temp_table(self) -> str:
+        """Table ID the chunks are appended to before the swap."""
+        return self.state["temp_table"]
+    
+    def job_id(self, index: int) -> str:
+        """Job ID for the current load attempt of a chunk.
+        
+        The ID only changes through ``next_job_id``, so it is the same across
+        retries and process restarts until a job under it has failed.
+        """
+        attempt = self.state.setdefault("attempts", {}).get(str(index), 0)
+        load_id = re.sub(r"[^A-Za-z0-9_-]", "_", self.temp_table)
+        return f"load_{load_id}_part{index:05d}_{attempt}"
+    
+    def next_job_id(self, index: int) -> str:
+        """Move a chunk to a new job ID (after its job failed) and persist it."""
+        with self._lock:
+            attempts = self.state.setdefault("attempts", {})
+            attempts[str(index)] = attempts.get(str(index), 0) + 1
+            self.save()
+        return self.job_id(index)
+    
+    def is_completed(self, index: int) -> bool:
+        """Check whether a chunk has already been loaded."""
+        return str(index) in self.state["completed"]
+    
+    def mark_completed(self, index: int, job_id: str, rows: int) -> None:
+        """Record a loaded chunk and persist the state."""
+        with self._lock:
+            self.state["completed"][str(index)] = {"job_id": job_id, "rows": rows}
+            self.save()
+    
+    @property
+    def total_rows(self) -> int:
+        """Rows loaded across all completed chunks."""
+        return sum(chunk["rows"] or 0 for chunk in self.state["completed"].values())
+    
+    def save(self) -> None:
+        """Write the state atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    
+    def clear(self) -> None:
+        """Remove the state once the load has been committed."""
+        if self.path.exists():
+            self.path.unlink()
@@ -20,16 +20,62 @@ class Config:
     BQ_DATASET_PROD = os.getenv("BQ_DATASET_PROD", "production")
     BQ_LOCATION = os.getenv("BQ_LOCATION", "US")
     
+    # Backend: "bigquery", or "local" to run against DuckDB/Parquet files
+    PIPELINE_BACKEND = os.getenv("PIPELINE_BACKEND", "bigquery").lower()
+    
+    # Ingestion Settings
+    INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", "8"))
+    INGEST_CONVERT_TO_PARQUET = os.getenv("INGEST_CONVERT_TO_PARQUET", "false").lower() == "true"
+    PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+    INGEST_CHUNK_THRESHOLD_BYTES = int(os.getenv("INGEST_CHUNK_THRESHOLD_BYTES", str(1024 ** 3)))
+    INGEST_CHUNK_BYTES = int(os.getenv("INGEST_CHUNK_BYTES", str(256 * 1024 ** 2)))
+    INGEST_CHUNK_RETRIES = int(os.getenv("INGEST_CHUNK_RETRIES", "3"))
+    
+    # Transformation Settings
+    TRANSFORM_MAX_WORKERS = int(os.getenv("TRANSFORM_MAX_WORKERS", "4"))
+    INCREMENTAL_LOOKBACK_DAYS = int(os.getenv("INCREMENTAL_LOOKBACK_DAYS", "3"))
+    
+    # Parallel Aggregation Settings
+    PARALLEL_MAX_WORKERS = int(os.getenv("PARALLEL_MAX_WORKERS", "0"))  # 0 uses every core
+    PARALLEL_START_METHOD = os.getenv("PARALLEL_START_METHOD")  # Platform default when unset
+    
+    # Cost Estimation Settings
+    BQ_PRICE_PER_TIB = float(os.getenv("BQ_PRICE_PER_TIB", "6.25"))  # On-demand USD
+    COST_REGRESSION_RATIO = float(os.getenv("COST_REGRESSION_RATIO", "0.5"))
+    COST_REGRESSION_MIN_BYTES = int(os.getenv("COST_REGRESSION_MIN_BYTES", str(1024 ** 3)))
+    
+    # Query Result Cache Settings
+    QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+    QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+    QUERY_CACHE_DIR = os.getenv("QUERY_CACHE_DIR")  # Disk tier disabled when unset
+    QUERY_CACHE_DISK_MAX_BYTES = int(os.getenv("QUERY_CACHE_DISK_MAX_BYTES", str(2 * 1024 ** 3)))
+    
+    # Query Result Download Settings
+    RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", "100000"))
+    RESULT_MAX_STREAMS = int(os.getenv("RESULT_MAX_STREAMS", "0"))  # 0 lets BigQuery choose
+    
     # Project Paths
     PROJECT_ROOT = Path(__file__).parent.parent
     SQL_DIR = PROJECT_ROOT / "sql"
     DATA_DIR = PROJECT_ROOT / "data"
     CONFIG_DIR = PROJECT_ROOT / "config"
+    INGEST_MANIFEST_PATH = Path(
+        os.getenv("INGEST_MANIFEST_PATH", CONFIG_DIR / "ingestion_manifest.json")
+    )
+    SCHEMA_DIR = Path(os.getenv("SCHEMA_DIR", CONFIG_DIR / "schemas"))
+    CHUNK_STATE_DIR = Path(os.getenv("CHUNK_STATE_DIR", CONFIG_DIR / "chunk_state"))
+    COST_BASELINE_PATH = Path(
+        os.getenv("COST_BASELINE_PATH", CONFIG_DIR / "cost_baseline.json")
+    )
+    METRICS_DIR = os.getenv("METRICS_DIR")  # Metrics files are only written when set
+    LOCAL_WAREHOUSE_DIR = Path(os.getenv("LOCAL_WAREHOUSE_DIR", PROJECT_ROOT / "warehouse"))
     
     @classmethod
     def validate(cls):
         """Validate required configuration."""
-        if not cls.GCP_PROJECT_ID:
+        if cls.PIPELINE_BACKEND not in ("bigquery", "local"):
+            raise ValueError(f"Unknown PIPELINE_BACKEND: {cls.PIPELINE_BACKEND}")
+        if cls.PIPELINE_BACKEND == "bigquery" and not cls.GCP_PROJECT_ID:
             raise ValueError("GCP_PROJECT_ID must be set in environment variables")
         
         return True
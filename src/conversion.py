@@ -0,0 +1,107 @@
+"""Client-side conversion of CSV/JSON source files to Parquet."""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bytes of source text parsed per record batch
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def _open_reader(
+    source_file: str,
+    schema: Optional[pa.Schema],
+    block_size: int
+):
+    """Open a streaming record batch reader for a CSV or NDJSON file."""
+    if source_file.endswith('.csv'):
+        return pa_csv.open_csv(
+            source_file,
+            read_options=pa_csv.ReadOptions(block_size=block_size),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=schema,
+                strings_can_be_null=True
+            )
+        )
+    
+    if source_file.endswith('.json'):
+        read_options = pa_json.ReadOptions(block_size=block_size)
+        parse_options = pa_json.ParseOptions(explicit_schema=schema)
+        if hasattr(pa_json, "open_json"):
+            return pa_json.open_json(
+                source_file, read_options=read_options, parse_options=parse_options
+            )
+        # Older pyarrow has no streaming JSON reader
+        table = pa_json.read_json(
+            source_file, read_options=read_options, parse_options=parse_options
+        )
+        return pa.RecordBatchReader.from_batches(table.schema, table.to_batches())
+    
+    raise ValueError(f"Unsupported file type for Parquet conversion: {source_file}")
+
+
+def convert_to_parquet(
+    source_file: str,
+    output_dir: str,
+    schema: Optional[pa.Schema] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    compression: Optional[str] = None
+) -> str:
+    """Stream a CSV or newline-delimited JSON file into a compressed Parquet file.
+    
+    The file is parsed one block at a time, so memory stays bounded by
+    ``block_size`` regardless of file size. Column types are inferred from
+    the first block unless ``schema`` is given, and every later block is
+    converted to the same types. The Parquet file is written under a
+    temporary name and renamed once complete, so a block that does not fit
+    those types fails the conversion without leaving a partial file.
+    
+    Args:
+        source_file: Path to CSV or JSON file
+        output_dir: Directory for the Parquet file
+        schema: Optional Arrow schema to parse the columns as
+        block_size: Bytes of source text per record batch
+        compression: Parquet codec (default from config)
+    
+    Returns:
+        Path to the Parquet file (``<source name>.parquet``)
+    
+    Raises:
+        pyarrow.ArrowInvalid: If a value does not fit its column's type
+    """
+    compression = compression or Config.PARQUET_COMPRESSION
+    # Keep the source extension so x.csv and x.json can share a staging directory
+    output_path = Path(output_dir) / f"{Path(source_file).name}.parquet"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+    os.close(fd)
+    rows = 0
+    try:
+        reader = _open_reader(source_file, schema, block_size)
+        with pq.ParquetWriter(tmp_path, reader.schema, compression=compression) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        os.replace(tmp_path, output_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    
+    source_bytes = os.path.getsize(source_file)
+    output_bytes = os.path.getsize(output_path)
+    logger.info(
+        f"Converted {source_file} to Parquet: {rows} rows, "
+        f"{source_bytes} -> {output_bytes} bytes"
+    )
+    return str(output_path)
@@ -0,0 +1,119 @@
+"""Stored dry-run byte estimates, used to catch queries that scan more than before."""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def bytes_to_cost(bytes_processed: int, price_per_tib: Optional[float] = None) -> float:
+    """Estimate the on-demand price of scanning a number of bytes.
+    
+    Args:
+        bytes_processed: Bytes a query would scan
+        price_per_tib: USD per TiB scanned (default from config)
+    
+    Returns:
+        Estimated cost in USD
+    """
+    price_per_tib = price_per_tib if price_per_tib is not None else Config.BQ_PRICE_PER_TIB
+    return bytes_processed / 1024 ** 4 * price_per_tib
+
+
+def find_regressions(
+    estimates: Dict[str, Optional[int]],
+    baseline: Dict[str, int],
+    ratio: Optional[float] = None,
+    min_bytes: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Compare estimated bytes per model against the baseline.
+    
+    A model regresses when it scans more than ``(1 + ratio)`` times its
+    baseline and the increase is at least ``min_bytes``, so growth on small
+    tables does not trip the gate. Models without an estimate or baseline
+    are not compared.
+    
+    Args:
+        estimates: Estimated bytes per model (None when the dry run failed)
+        baseline: Baseline bytes per model
+        ratio: Allowed relative growth (default from config)
+        min_bytes: Smallest absolute growth reported (default from config)
+    
+    Returns:
+        One dict per regressed model with model, baseline_bytes,
+        estimated_bytes and ratio
+    """
+    ratio = ratio if ratio is not None else Config.COST_REGRESSION_RATIO
+    min_bytes = min_bytes if min_bytes is not None else Config.COST_REGRESSION_MIN_BYTES
+    
+    regressions = []
+    for model, estimated in sorted(estimates.items()):
+        previous = baseline.get(model)
+        if estimated is None or previous is None:
+            continue
+        if estimated - previous < min_bytes:
+            continue
+        if estimated > previous * (1 + ratio):
+            regressions.append({
+                "model": model,
+                "baseline_bytes": previous,
+                "estimated_bytes": estimated,
+                "ratio": estimated / previous if previous else float("inf"),
+            })
+    return regressions
+
+
+class CostBaseline:
+    """Bytes processed per model, as recorded by a reviewed dry run."""
+    
+    def __init__(self, path: Optional[str] = None):
+        """Load the baseline from disk (an empty one if it does not exist).
+        
+        Args:
+            path: Baseline JSON path (default from config)
+        """
+        self.path = Path(path or Config.COST_BASELINE_PATH)
+        self.models: Dict[str, int] = {}
+        
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.models = json.load(f).get("models", {})
+    
+    def update(self, estimates: Dict[str, Optional[int]]) -> None:
+        """Replace the baseline with new estimates and save it.
+        
+        Models whose dry run failed keep their previous baseline.
+        
+        Args:
+            estimates: Estimated bytes per model
+        """
+        for model, estimated in estimates.items():
+            if estimated is not None:
+                self.models[model] = estimated
+        self.save()
+        logger.info(f"Updated cost baseline for {len(self.models)} models")
+    
+    def save(self) -> None:
+        """Write the baseline atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                        "models": self.models,
+                    },
+                    f, indent=2, sort_keys=True
+                )
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,249 @@
+"""Dependency graph and scheduler for SQL transformations."""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backtick-quoted table references, e.g. `${GCP_PROJECT_ID}.staging.sample_table`
+TABLE_REF_PATTERN = re.compile(r"`([^`]+)`")
+
+# Model settings declared in SQL header comments, e.g. "-- partition_by: date"
+MODEL_CONFIG_PATTERN = re.compile(r"^--\s*(materialized|partition_by|lookback_days)\s*:\s*(\S+)\s*$")
+
+
+def parse_table_references(sql: str) -> Set[str]:
+    """Extract the tables a query reads from.
+    
+    Only backtick-quoted references are recognised. The project part is
+    dropped so references compare equal to ``dataset.table`` destinations.
+    
+    Args:
+        sql: SQL query text
+    
+    Returns:
+        Set of referenced tables in ``dataset.table`` form
+    """
+    # Ignore commented-out references
+    sql = re.sub(r"--[^\n]*", "", sql)
+    
+    references = set()
+    for match in TABLE_REF_PATTERN.finditer(sql):
+        parts = match.group(1).split(".")
+        if len(parts) >= 2:
+            references.add(".".join(parts[-2:]))
+    return references
+
+
+def parse_model_config(sql: str) -> Dict[str, str]:
+    """Read model settings from the comment header of a SQL file.
+    
+    Supported keys are ``materialized`` (``table`` or ``incremental``),
+    ``partition_by`` (DATE column of the output) and ``lookback_days``.
+    Only the leading comment block is inspected.
+    
+    Args:
+        sql: SQL query text
+        
+    Returns:
+        Mapping of setting name to value
+    """
+    config = {}
+    for line in sql.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("--"):
+            break
+        match = MODEL_CONFIG_PATTERN.match(line)
+        if match:
+            config[match.group(1)] = match.group(2)
+    
+    if config.get("materialized") == "incremental" and "partition_by" not in config:
+        raise ValueError("Incremental models must declare partition_by")
+    return config
+
+
+class TransformationNode:
+    """A SQL file and the table it materializes."""
+    
+    def __init__(self, sql_path: Path, destination: str):
+        """Initialize a node.
+        
+        Args:
+            sql_path: Path to the SQL file
+            destination: Destination table (format: dataset.table)
+        """
+        self.sql_path = Path(sql_path)
+        self.destination = destination
+        sql = self.sql_path.read_text()
+        self.references = parse_table_references(sql)
+        self.config = parse_model_config(sql)
+    
+    @property
+    def name(self) -> str:
+        """SQL filename, used to identify the node."""
+        return self.sql_path.name
+    
+    def __repr__(self) -> str:
+        return f"TransformationNode({self.name} -> {self.destination})"
+
+
+class TransformationDAG:
+    """Dependency graph of SQL transformations built from table references."""
+    
+    def __init__(self, nodes: Iterable[TransformationNode]):
+        """Build the graph and check it for cycles.
+        
+        A node depends on another node when it reads the table the other
+        node writes. References to tables no node produces (e.g. raw data)
+        are treated as external inputs.
+        
+        Args:
+            nodes: Transformation nodes
+        """
+        self.nodes: Dict[str, TransformationNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate transformation: {node.name}")
+            self.nodes[node.name] = node
+        
+        producers = {}
+        for node in self.nodes.values():
+            if node.destination in producers:
+                raise ValueError(
+                    f"{node.name} and {producers[node.destination]} both write "
+                    f"{node.destination}"
+                )
+            producers[node.destination] = node.name
+        
+        self.upstreams: Dict[str, Set[str]] = {}
+        self.downstreams: Dict[str, Set[str]] = {name: set() for name in self.nodes}
+        for node in self.nodes.values():
+            upstreams = {
+                producers[ref] for ref in node.references
+                if ref in producers and producers[ref] != node.name
+            }
+            self.upstreams[node.name] = upstreams
+            for upstream in upstreams:
+                self.downstreams[upstream].add(node.name)
+        
+        self.topological_order()
+    
+    @classmethod
+    def from_sql_dir(
+        cls,
+        sql_dir: Optional[Path] = None,
+        tiers: Optional[List[Tuple[str, str]]] = None
+    ) -> "TransformationDAG":
+        """Build a graph from the SQL files in a directory.
+        
+        Args:
+            sql_dir: Directory with SQL files (default from config)
+            tiers: (filename prefix, destination dataset) pairs
+                (default: staging_ and prod_ tiers from config)
+        
+        Returns:
+            TransformationDAG
+        """
+        sql_dir = Path(sql_dir or Config.SQL_DIR)
+        tiers = tiers or [
+            ("staging_", Config.BQ_DATASET_STAGING),
+            ("prod_", Config.BQ_DATASET_PROD),
+        ]
+        
+        nodes = []
+        for prefix, dataset in tiers:
+            for sql_file in sorted(sql_dir.glob(f"{prefix}*.sql")):
+                # Extract table name from filename (e.g., staging_orders.sql -> orders)
+                table_name = sql_file.stem.replace(prefix, "", 1)
+                nodes.append(TransformationNode(sql_file, f"{dataset}.{table_name}"))
+        
+        return cls(nodes)
+    
+    def topological_order(self) -> List[str]:
+        """Return node names so that every node follows its upstreams.
+        
+        Raises:
+            ValueError: If the graph has a cycle
+        """
+        remaining = {name: len(upstreams) for name, upstreams in self.upstreams.items()}
+        ready = sorted(name for name, count in remaining.items() if count == 0)
+        order = []
+        
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for downstream in sorted(self.downstreams[name]):
+                remaining[downstream] -= 1
+                if remaining[downstream] == 0:
+                    ready.append(downstream)
+        
+        if len(order) != len(self.nodes):
+            cyclic = sorted(set(self.nodes) - set(order))
+            raise ValueError(f"Dependency cycle between transformations: {cyclic}")
+        
+        return order
+    
+    def run(
+        self,
+        run_node: Callable[[TransformationNode], None],
+        max_workers: Optional[int] = None
+    ) -> List[str]:
+        """Run every node, starting each one as soon as its upstreams finish.
+        
+        Independent nodes run in parallel, up to ``max_workers`` at a time.
+        If a node fails no new nodes are started; nodes already running are
+        allowed to finish and the first error is raised.
+        
+        Args:
+            run_node: Callable that runs one node and blocks until it is done
+            max_workers: Maximum nodes running at once (default from config)
+        
+        Returns:
+            Node names in the order they completed
+        """
+        max_workers = max_workers or Config.TRANSFORM_MAX_WORKERS
+        remaining = {name: len(upstreams) for name, upstreams in self.upstreams.items()}
+        ready = [name for name in self.topological_order() if remaining[name] == 0]
+        completed = []
+        error = None
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while ready or running:
+                while ready and len(running) < max_workers and error is None:
+                    name = ready.pop(0)
+                    logger.info(f"Starting {name}")
+                    running[executor.submit(run_node, self.nodes[name])] = name
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Transformation {name} failed: {e}")
+                        error = error or e
+                        continue
+                    
+                    completed.append(name)
+                    for downstream in sorted(self.downstreams[name]):
+                        remaining[downstream] -= 1
+                        if remaining[downstream] == 0:
+                            ready.append(downstream)
+        
+        if error is not None:
+            skipped = sorted(set(self.nodes) - set(completed))
+            logger.error(f"Transformations not completed: {skipped}")
+            raise error
+        
+        return completed
@@ -0,0 +1,535 @@
+"""Bounded-memory deduplication of events by event_id with an event-time TTL."""
+
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 64-bit FNV-1a over the UTF-8 bytes of the id, then a splitmix64 finalizer
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+MASK_32 = 0xFFFFFFFF
+
+# Event time stored for keys seen without one (NaT)
+MISSING_TIME = np.iinfo(np.int64).min
+
+# Bloom prefilter per sealed segment: bits per key and probes (~3% false positives)
+BLOOM_BITS_PER_KEY = 8
+BLOOM_PROBES = 3
+
+# Arrays of a sealed segment, as spilled and checkpointed
+SEGMENT_ARRAYS = ("hashes", "times", "id_offsets", "id_data")
+
+
+def _mix(h: int) -> int:
+    """splitmix64 finalizer on a Python int."""
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return h ^ (h >> 31)
+
+
+def _mix_array(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer on a uint64 array (wraps like the int version)."""
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def hash_event_id(event_id: Any) -> int:
+    """Hash one event id to 64 bits.
+    
+    Stable across processes (unlike ``hash()``), so hashes can be spilled
+    to disk and checkpointed. Matches ``hash_event_ids``.
+    
+    Args:
+        event_id: Event id (converted with ``str``)
+    
+    Returns:
+        Unsigned 64-bit hash
+    """
+    data = str(event_id).encode("utf-8")
+    h = FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & MASK_64
+    return _mix(h ^ len(data))
+
+
+def hash_event_ids(event_ids) -> np.ndarray:
+    """Hash many event ids at once (vectorized ``hash_event_id``).
+    
+    Args:
+        event_ids: Array-like of event ids (converted with ``str``)
+    
+    Returns:
+        uint64 array of hashes
+    """
+    return _hash_strings(_to_strings(event_ids))
+
+
+def _as_text(event_ids) -> pd.Series:
+    """Event ids converted with ``str``, missing ones included (``astype(str)`` keeps them missing)."""
+    values = pd.Series(event_ids, copy=False)
+    text = values.astype(str)
+    missing = text.isna()
+    if missing.any():
+        text = text.astype(object)
+        text[missing] = values[missing].astype(object).map(str)
+    return text
+
+
+def _to_strings(event_ids) -> pa.LargeStringArray:
+    """Event ids converted with ``str`` as one Arrow large_string array."""
+    strings = pa.array(_as_text(event_ids), type=pa.large_string())
+    if isinstance(strings, pa.ChunkedArray):
+        strings = strings.combine_chunks()
+    return strings
+
+
+def _string_buffers(strings: pa.LargeStringArray):
+    """Offsets (int64, one more than the strings) and UTF-8 bytes of a string array."""
+    _, offsets_buffer, data_buffer = strings.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int64)[strings.offset:strings.offset + len(strings) + 1]
+    data = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None else np.zeros(0, np.uint8)
+    return offsets, data
+
+
+def _hash_strings(strings: pa.LargeStringArray) -> np.ndarray:
+    """uint64 hashes of a string array (see ``hash_event_id``)."""
+    offsets, data = _string_buffers(strings)
+    starts = offsets[:-1]
+    lengths = np.diff(offsets)
+    
+    h = np.full(len(strings), FNV_OFFSET, dtype=np.uint64)
+    prime = np.uint64(FNV_PRIME)
+    for position in range(int(lengths.max()) if len(lengths) else 0):
+        rows = np.nonzero(lengths > position)[0]
+        if len(rows) == len(h):
+            h = (h ^ data[starts + position]) * prime
+        else:
+            h[rows] = (h[rows] ^ data[starts[rows] + position]) * prime
+    return _mix_array(h ^ lengths.astype(np.uint64))
+
+
+def _to_nanos(event_times) -> np.ndarray:
+    """Event times (datetimes or ns integers) as int64 ns, NaT as MISSING_TIME."""
+    values = pd.Series(event_times, copy=False)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return values.to_numpy(dtype=np.int64)
+
+
+class _Segment:
+    """Sorted key hashes, their ids and latest event times, in memory or memory-mapped.
+    
+    Ids are kept as UTF-8 bytes plus offsets, so they spill and checkpoint
+    like the other arrays. A hash match only counts once the id matches
+    too, so colliding ids stay distinct. A Bloom filter over the hashes
+    stays in memory, so probing for an unknown key (the common case)
+    rarely touches the arrays.
+    """
+    
+    def __init__(self, hashes: np.ndarray, times: np.ndarray, ids: pa.LargeStringArray):
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.times = times[order]
+        self.id_offsets, self.id_data = _string_buffers(ids.take(pa.array(order)))
+        self.max_time = int(times.max()) if len(times) else MISSING_TIME
+        self.paths: List[Path] = []
+        # File name of this segment in the checkpoint directory, once written
+        self.checkpoint_file: Optional[str] = None
+        
+        self.bloom_bits = max(64, BLOOM_BITS_PER_KEY * len(hashes))
+        bits = np.zeros((self.bloom_bits + 7) // 8, dtype=np.uint8)
+        low = self.hashes & np.uint64(MASK_32)
+        high = self.hashes >> np.uint64(32)
+        for probe in range(BLOOM_PROBES):
+            positions = (low + np.uint64(probe) * high) % np.uint64(self.bloom_bits)
+            np.bitwise_or.at(bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.bloom = bits.tobytes()
+    
+    def might_contain(self, key: int) -> bool:
+        """Bloom filter check for one hash (no false negatives)."""
+        low, high = key & MASK_32, key >> 32
+        for probe in range(BLOOM_PROBES):
+            position = ((low + probe * high) & MASK_64) % self.bloom_bits
+            if not self.bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+    
+    def ids(self) -> pa.LargeStringArray:
+        """Stored ids in hash order (zero-copy over the id arrays)."""
+        return pa.LargeStringArray.from_buffers(
+            len(self.hashes), pa.py_buffer(self.id_offsets), pa.py_buffer(self.id_data)
+        )
+    
+    def get(self, key: int, event_id: str) -> Optional[int]:
+        """Stored time of one id with hash ``key``, or None."""
+        if not self.might_contain(key):
+            return None
+        index = int(np.searchsorted(self.hashes, np.uint64(key)))
+        while index < len(self.hashes) and int(self.hashes[index]) == key:
+            start, end = self.id_offsets[index], self.id_offsets[index + 1]
+            if self.id_data[start:end].tobytes().decode("utf-8") == event_id:
+                return int(self.times[index])
+            index += 1
+        return None
+    
+    def lookup(self, hashes: np.ndarray, ids: pa.LargeStringArray) -> np.ndarray:
+        """Stored time per (hash, id), MISSING_TIME where absent."""
+        result = np.full(len(hashes), MISSING_TIME, dtype=np.int64)
+        if not len(self.hashes):
+            return result
+        index = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        found = np.nonzero(self.hashes[index] == hashes)[0]
+        if not len(found):
+            return result
+        
+        same_id = pc.equal(
+            self.ids().take(pa.array(index[found])), ids.take(pa.array(found))
+        ).to_numpy(zero_copy_only=False)
+        result[found[same_id]] = self.times[index[found[same_id]]]
+        # The first entry with the hash belongs to another id: a collision
+        for row in found[~same_id]:
+            stored = self.get(int(hashes[row]), ids[row].as_py())
+            if stored is not None:
+                result[row] = stored
+        return result
+    
+    def spill(self, directory: Path) -> None:
+        """Move the arrays to .npy files and memory-map them."""
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        for name in SEGMENT_ARRAYS:
+            fd, path = tempfile.mkstemp(dir=directory, prefix=f"dedup_{name}_", suffix=".npy")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, getattr(self, name))
+            arrays[name] = np.load(path, mmap_mode="r")
+            self.paths.append(Path(path))
+        for name, array in arrays.items():
+            setattr(self, name, array)
+    
+    def drop(self) -> None:
+        """Delete spilled files, if any."""
+        self.hashes = self.times = self.id_offsets = self.id_data = None
+        for path in self.paths:
+            path.unlink(missing_ok=True)
+        self.paths = []
+
+
+class EventDeduplicator:
+    """Remembers event ids for an event-time TTL, keeping the latest copy.
+    
+    New ids go into a small dict; once it holds ``segment_keys`` keys or
+    spans ``segment_seconds`` of event time it is sealed into numpy arrays
+    sorted by a 64-bit hash of the id and searched with ``searchsorted``
+    (about 24 bytes plus the id's length per key, against ~150 for a dict
+    of strings). The hash is only a prefilter: every hash match is
+    confirmed against the stored id, so deduplication is exact.
+    ``expire(reference)`` drops every segment whose newest key is older
+    than ``reference - ttl``, so memory follows the TTL, not the history.
+    With ``spill_dir`` and ``max_memory_keys``, the oldest sealed segments
+    beyond that budget are written to .npy files and memory-mapped.
+    
+    A newer copy of a known id (later event time) replaces the stored one;
+    an older or equally old copy is a duplicate.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        segment_keys: int = 100_000,
+        segment_seconds: Optional[float] = None,
+        max_memory_keys: Optional[int] = None,
+        spill_dir: Optional[str] = None
+    ):
+        """Initialize an empty store.
+        
+        Args:
+            ttl_seconds: How long (in event time) a key is remembered after
+                its latest copy; None keeps keys until ``clear``
+            segment_keys: Keys per sealed segment
+            segment_seconds: Event-time span after which the open segment
+                is sealed (None: seal by size only)
+            max_memory_keys: Sealed keys kept in memory before spilling
+                (requires spill_dir)
+            spill_dir: Directory for spilled segments
+        """
+        if max_memory_keys is not None and spill_dir is None:
+            raise ValueError("max_memory_keys requires spill_dir")
+        
+        self.ttl = None if ttl_seconds is None else int(ttl_seconds * 1e9)
+        self.segment_keys = segment_keys
+        self.segment_span = None if segment_seconds is None else int(segment_seconds * 1e9)
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        
+        # Open (unsealed) keys: id -> latest event time
+        self._open: Dict[str, int] = {}
+        self._open_min_time: Optional[int] = None
+        self._open_max_time = MISSING_TIME
+        self._segments: List[_Segment] = []
+        self._next_segment_id = 0
+    
+    def __len__(self) -> int:
+        """Stored keys (a key re-seen with a newer time may count twice)."""
+        return len(self._open) + sum(len(segment.hashes) for segment in self._segments)
+    
+    def stats(self) -> Dict[str, int]:
+        """Key counts in the open dict, sealed in memory and spilled to disk."""
+        on_disk = sum(len(segment.hashes) for segment in self._segments if segment.paths)
+        return {
+            "open_keys": len(self._open),
+            "memory_keys": len(self) - len(self._open) - on_disk,
+            "disk_keys": on_disk,
+            "segments": len(self._segments),
+        }
+    
+    def _lookup(self, event_id: str) -> Optional[int]:
+        """Latest stored event time of one id."""
+        latest = self._open.get(event_id)
+        key = hash_event_id(event_id) if self._segments else None
+        for segment in self._segments:
+            stored = segment.get(key, event_id)
+            if stored is not None and (latest is None or stored > latest):
+                latest = stored
+        return latest
+    
+    def observe(self, event_id: Any, event_time: Optional[int]) -> Optional[int]:
+        """Record one event and return the latest time already stored for its id.
+        
+        The caller treats the event as a duplicate when the returned time is
+        at least its own, and as a newer copy when it is earlier.
+        
+        Args:
+            event_id: Event id
+            event_time: Event time in ns since the epoch (None if unknown)
+        
+        Returns:
+            Previously stored event time, or None if the id is new
+        """
+        event_id = str(event_id)
+        event_time = MISSING_TIME if event_time is None else event_time
+        previous = self._lookup(event_id)
+        if previous is None or event_time > previous:
+            self._open[event_id] = event_time
+            if self._open_min_time is None or event_time < self._open_min_time:
+                self._open_min_time = event_time
+            self._open_max_time = max(self._open_max_time, event_time)
+            if len(self._open) >= self.segment_keys or (
+                self.segment_span is not None
+                and self._open_max_time - self._open_min_time >= self.segment_span
+            ):
+                self._seal()
+        return previous
+    
+    def keep_latest(self, event_ids, event_times) -> np.ndarray:
+        """Deduplicate a batch against itself and the store, without sorting rows.
+        
+        Keeps, per id, the copy with the latest event time (the last one in
+        input order among ties), and only if it is newer than the stored copy.
+        Kept copies are recorded.
+        
+        Args:
+            event_ids: Array-like of event ids
+            event_times: Array-like of datetimes (or ns integers)
+        
+        Returns:
+            Boolean mask of the rows to keep
+        """
+        times = _to_nanos(event_times)
+        keep = np.zeros(len(times), dtype=bool)
+        if not len(times):
+            return keep
+        
+        codes, unique_ids = pd.factorize(_as_text(event_ids))
+        unique_strings = _to_strings(unique_ids)
+        unique_hashes = _hash_strings(unique_strings)
+        latest = np.full(len(unique_ids), MISSING_TIME, dtype=np.int64)
+        np.maximum.at(latest, codes, times)
+        candidates = np.nonzero(times == latest[codes])[0]
+        winner = np.full(len(unique_ids), -1, dtype=np.int64)
+        np.maximum.at(winner, codes[candidates], candidates)
+        
+        self._seal()
+        stored = np.full(len(unique_ids), MISSING_TIME, dtype=np.int64)
+        known = np.zeros(len(unique_ids), dtype=bool)
+        for segment in self._segments:
+            segment_times = segment.lookup(unique_hashes, unique_strings)
+            known |= segment_times != MISSING_TIME
+            np.maximum(stored, segment_times, out=stored)
+        
+        newer = ~known | (latest > stored)
+        keep[winner[newer]] = True
+        if newer.any():
+            self._add_segment(_Segment(
+                unique_hashes[newer], latest[newer], unique_strings.filter(pa.array(newer))
+            ))
+        return keep
+    
+    def _seal(self) -> None:
+        """Turn the open dict into a sorted segment."""
+        if not self._open:
+            return
+        ids = _to_strings(list(self._open.keys()))
+        times = np.fromiter(self._open.values(), dtype=np.int64, count=len(self._open))
+        self._open = {}
+        self._open_min_time = None
+        self._open_max_time = MISSING_TIME
+        self._add_segment(_Segment(_hash_strings(ids), times, ids))
+    
+    def _add_segment(self, segment: _Segment) -> None:
+        self._segments.append(segment)
+        if self.max_memory_keys is None:
+            return
+        in_memory = [s for s in self._segments if not s.paths]
+        excess = sum(len(s.hashes) for s in in_memory) - self.max_memory_keys
+        for oldest in in_memory:
+            if excess <= 0:
+                break
+            oldest.spill(self.spill_dir)
+            excess -= len(oldest.hashes)
+    
+    def expire(self, reference_time: float) -> int:
+        """Forget keys whose latest copy is older than ``reference_time - ttl``.
+        
+        Whole segments are dropped once their newest key has expired, so a
+        key may outlive its TTL by up to one segment.
+        
+        Args:
+            reference_time: Watermark or run end, in ns since the epoch
+                (``math.inf`` forgets everything)
+        
+        Returns:
+            Number of keys dropped
+        """
+        if self.ttl is None and reference_time != math.inf:
+            return 0
+        cutoff = reference_time - (self.ttl or 0)
+        
+        dropped = 0
+        if self._open and self._open_max_time < cutoff:
+            dropped += len(self._open)
+            self._open = {}
+            self._open_min_time = None
+            self._open_max_time = MISSING_TIME
+        
+        kept = []
+        for segment in self._segments:
+            if segment.max_time < cutoff:
+                dropped += len(segment.hashes)
+                segment.drop()
+            else:
+                kept.append(segment)
+        self._segments = kept
+        return dropped
+    
+    def clear(self) -> None:
+        """Forget every key and delete spilled files."""
+        self.expire(math.inf)
+    
+    def checkpoint(self, directory: str) -> Dict[str, Any]:
+        """Write sealed segments not yet in the checkpoint directory.
+        
+        Sealed segments never change, so each is written once (as
+        ``dedup-<n>.npz``, atomically); later checkpoints only add new ones.
+        The returned state (open keys and the segment list) is small and
+        is meant to be stored by the caller in its own checkpoint file,
+        after which ``prune_checkpoint`` removes unreferenced segments.
+        
+        Args:
+            directory: Checkpoint directory
+        
+        Returns:
+            JSON-serializable state for ``restore``
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for segment in self._segments:
+            if segment.checkpoint_file is None:
+                name = f"dedup-{self._next_segment_id:08d}.npz"
+                self._next_segment_id += 1
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.savez(f, **{name: np.asarray(getattr(segment, name)) for name in SEGMENT_ARRAYS})
+                    os.replace(tmp_path, directory / name)
+                except Exception:
+                    os.unlink(tmp_path)
+                    raise
+                segment.checkpoint_file = name
+        
+        return {
+            "ttl": self.ttl,
+            "segment_keys": self.segment_keys,
+            "segment_span": self.segment_span,
+            "next_segment_id": self._next_segment_id,
+            "open": [[event_id, event_time] for event_id, event_time in self._open.items()],
+            "segments": [segment.checkpoint_file for segment in self._segments],
+        }
+    
+    @staticmethod
+    def prune_checkpoint(directory: str, state: Dict[str, Any]) -> None:
+        """Delete segment files of a checkpoint directory that a state no longer uses.
+        
+        Args:
+            directory: Checkpoint directory
+            state: State returned by ``checkpoint`` and already committed
+        """
+        referenced = set(state["segments"])
+        for path in Path(directory).glob("dedup-*.npz"):
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
+    
+    @classmethod
+    def restore(
+        cls,
+        directory: str,
+        state: Dict[str, Any],
+        max_memory_keys: Optional[int] = None,
+        spill_dir: Optional[str] = None
+    ) -> "EventDeduplicator":
+        """Rebuild a store from a checkpoint.
+        
+        Args:
+            directory: Checkpoint directory
+            state: State returned by ``checkpoint``
+            max_memory_keys: Sealed keys kept in memory before spilling
+            spill_dir: Directory for spilled segments
+        
+        Returns:
+            The restored store
+        """
+        store = cls(
+            segment_keys=state["segment_keys"],
+            max_memory_keys=max_memory_keys,
+            spill_dir=spill_dir
+        )
+        store.ttl = state["ttl"]
+        store.segment_span = state["segment_span"]
+        store._next_segment_id = state["next_segment_id"]
+        
+        for event_id, event_time in state["open"]:
+            store._open[event_id] = event_time
+            if store._open_min_time is None or event_time < store._open_min_time:
+                store._open_min_time = event_time
+            store._open_max_time = max(store._open_max_time, event_time)
+        
+        for name in state["segments"]:
+            with np.load(Path(directory) / name) as arrays:
+                ids = pa.LargeStringArray.from_buffers(
+                    len(arrays["hashes"]), pa.py_buffer(arrays["id_offsets"]), pa.py_buffer(arrays["id_data"])
+                )
+                segment = _Segment(arrays["hashes"], arrays["times"], ids)
+            segment.checkpoint_file = name
+            store._add_segment(segment)
+        return store
@@ -1,10 +1,22 @@
 """Data ingestion module for loading data into BigQuery."""
 
 import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Dict, Any
+import pyarrow as pa
 from .bigquery_client import BigQueryClient
+from google.cloud import bigquery
+from .chunking import ChunkedLoadState, split_file
 from .config import Config
+from .conversion import convert_to_parquet
+from .local_backend import LocalClient
+from .manifest import IngestionManifest
+from .metrics import metrics
+from .schema_registry import SchemaRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,13 +25,32 @@ logger = logging.getLogger(__name__)
 class DataIngestion:
     """Handle data ingestion into BigQuery."""
     
-    def __init__(self, credentials_path: Optional[str] = None):
+    SUPPORTED_SUFFIXES = ('.csv', '.json')
+    
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        convert_to_parquet: Optional[bool] = None
+    ):
         """Initialize ingestion pipeline.
         
         Args:
             credentials_path: Optional path to GCP credentials
+            manifest_path: Optional path to the ingestion manifest
+            convert_to_parquet: Convert CSV/JSON to Parquet before loading
+                (default from config)
         """
-        self.bq_client = BigQueryClient(credentials_path)
+        if Config.PIPELINE_BACKEND == "local":
+            self.bq_client = LocalClient()
+        else:
+            self.bq_client = BigQueryClient(credentials_path)
+        self.manifest = IngestionManifest(manifest_path)
+        self.schema_registry = SchemaRegistry()
+        self.convert_to_parquet = (
+            Config.INGEST_CONVERT_TO_PARQUET if convert_to_parquet is None
+            else convert_to_parquet
+        )
         self._setup_datasets()
     
     def _setup_datasets(self):
@@ -46,15 +77,18 @@ class DataIngestion:
         
         logger.info(f"Ingesting {file_path} into {dataset}.{table_name}")
         
-        self.bq_client.load_data_from_file(
-            source_file=file_path,
-            dataset_id=dataset,
-            table_id=table_name,
-            write_disposition="WRITE_TRUNCATE"
-        )
-        
-        # Get table info
-        table = self.bq_client.get_table_info(dataset, table_name)
+        with metrics.span(f"ingest:{Path(file_path).name}", table=f"{dataset}.{table_name}") as span:
+            job = self.bq_client.load_data_from_file(
+                source_file=file_path,
+                dataset_id=dataset,
+                table_id=table_name,
+                write_disposition="WRITE_TRUNCATE"
+            )
+            span.record_job(job)
+            
+            # Get table info
+            table = self.bq_client.get_table_info(dataset, table_name)
+            span.set(rows_out=table.num_rows)
         logger.info(f"Ingestion complete: {table.num_rows} rows loaded")
     
     def ingest_json(
@@ -74,45 +108,415 @@ class DataIngestion:
         
         logger.info(f"Ingesting {file_path} into {dataset}.{table_name}")
         
-        self.bq_client.load_data_from_file(
-            source_file=file_path,
-            dataset_id=dataset,
-            table_id=table_name,
-            write_disposition="WRITE_TRUNCATE"
-        )
-        
-        table = self.bq_client.get_table_info(dataset, table_name)
+        with metrics.span(f"ingest:{Path(file_path).name}", table=f"{dataset}.{table_name}") as span:
+            job = self.bq_client.load_data_from_file(
+                source_file=file_path,
+                dataset_id=dataset,
+                table_id=table_name,
+                write_disposition="WRITE_TRUNCATE"
+            )
+            span.record_job(job)
+            
+            table = self.bq_client.get_table_info(dataset, table_name)
+            span.set(rows_out=table.num_rows)
         logger.info(f"Ingestion complete: {table.num_rows} rows loaded")
     
     def ingest_directory(
         self,
         directory: str,
         file_pattern: str = "*.csv",
-        dataset: str = None
-    ) -> None:
+        dataset: str = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        force: bool = False
+    ) -> List[Dict[str, Any]]:
         """Ingest all files matching pattern from a directory.
         
+        Files are uploaded concurrently (bounded by ``max_workers``) and the
+        resulting load jobs are waited on together, so wall time tracks the
+        slowest job rather than the sum of all jobs. Files the manifest shows
+        were already loaded unchanged into the same table are skipped.
+        
         Args:
             directory: Directory path
             file_pattern: File pattern to match (default: *.csv)
             dataset: Target dataset (default: raw_data)
+            max_workers: Maximum concurrent uploads (default from config)
+            timeout: Seconds to wait for all load jobs (default: no limit)
+            force: Reload files even if the manifest shows them unchanged
+            
+        Returns:
+            One summary dict per file with keys: file, table, job_id, rows,
+            bytes, duration_seconds, skipped, error
         """
         dataset = dataset or Config.BQ_DATASET_RAW
+        max_workers = max_workers or Config.INGEST_MAX_WORKERS
         dir_path = Path(directory)
         
-        files = list(dir_path.glob(file_pattern))
+        files = sorted(dir_path.glob(file_pattern))
         logger.info(f"Found {len(files)} files matching {file_pattern}")
         
         for file_path in files:
-            # Use filename (without extension) as table name
-            table_name = file_path.stem
-            
-            if file_path.suffix == '.csv':
-                self.ingest_csv(str(file_path), table_name, dataset)
-            elif file_path.suffix == '.json':
-                self.ingest_json(str(file_path), table_name, dataset)
-            else:
+            if file_path.suffix not in self.SUPPORTED_SUFFIXES:
                 logger.warning(f"Unsupported file type: {file_path}")
+        files = [f for f in files if f.suffix in self.SUPPORTED_SUFFIXES]
+        
+        if not files:
+            return []
+        
+        start = time.monotonic()
+        # Use filename (without extension) as table name
+        summaries = {
+            file_path: {
+                "file": str(file_path),
+                "table": file_path.stem,
+                "job_id": None,
+                "rows": None,
+                "bytes": None,
+                "duration_seconds": 0.0,
+                "skipped": False,
+                "error": None,
+            }
+            for file_path in files
+        }
+        
+        to_load = []
+        large_files = []
+        for file_path in files:
+            if not force and self.manifest.is_unchanged(
+                str(file_path), f"{dataset}.{file_path.stem}"
+            ):
+                logger.info(f"Skipping unchanged file: {file_path}")
+                summaries[file_path]["skipped"] = True
+            elif file_path.stat().st_size > Config.INGEST_CHUNK_THRESHOLD_BYTES:
+                large_files.append(file_path)
+            else:
+                to_load.append(file_path)
+        
+        # Large files are split and loaded chunk by chunk, one file at a time
+        for file_path in large_files:
+            file_start = time.monotonic()
+            try:
+                snapshot = self.manifest.snapshot(str(file_path))
+                summary = self.ingest_large_file(
+                    str(file_path), file_path.stem, dataset, max_workers=max_workers
+                )
+                summaries[file_path].update(summary)
+                self.manifest.record(
+                    str(file_path), f"{dataset}.{file_path.stem}", summary["job_id"], snapshot
+                )
+            except Exception as e:
+                summaries[file_path]["error"] = str(e)
+            summaries[file_path]["duration_seconds"] = time.monotonic() - file_start
+        
+        if to_load:
+            # Uploads happen inside submit, so fan them out over a thread pool
+            jobs = {}
+            with tempfile.TemporaryDirectory(prefix="ingest_") as staging_dir, \
+                    ThreadPoolExecutor(max_workers=min(max_workers, len(to_load))) as executor:
+                futures = {
+                    executor.submit(self._submit_file, file_path, dataset, staging_dir): file_path
+                    for file_path in to_load
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        job, schema, snapshot = future.result()
+                        jobs[job.job_id] = (file_path, job, schema, snapshot)
+                        summaries[file_path]["job_id"] = job.job_id
+                    except Exception as e:
+                        summaries[file_path]["error"] = str(e)
+            
+            try:
+                for job in self.bq_client.as_completed(
+                    [job for _, job, _, _ in jobs.values()], timeout=timeout
+                ):
+                    file_path, _, schema, snapshot = jobs[job.job_id]
+                    self._summarize_job(summaries[file_path], job, start)
+                    if not summaries[file_path]["error"]:
+                        self.manifest.record(
+                            str(file_path), f"{dataset}.{file_path.stem}", job.job_id, snapshot
+                        )
+                        self._register_schema(dataset, file_path.stem, schema)
+            except TimeoutError as e:
+                for summary in summaries.values():
+                    if summary["job_id"] and summary["rows"] is None and not summary["error"]:
+                        summary["error"] = str(e)
+        
+        self.manifest.save()
+        
+        results = [summaries[file_path] for file_path in files]
+        for summary in results:
+            if summary["error"]:
+                logger.error(f"Failed to ingest {summary['file']}: {summary['error']}")
+            if not summary["skipped"]:
+                self._record_metrics(summary, dataset)
+        
+        loaded = [summary for summary in results if not summary["skipped"]]
+        ingested = sum(1 for summary in loaded if not summary["error"])
+        logger.info(
+            f"Ingested {ingested}/{len(loaded)} files, "
+            f"skipped {len(results) - len(loaded)} unchanged, "
+            f"in {time.monotonic() - start:.2f}s ({max_workers} workers)"
+        )
+        return results
+    
+    def ingest_large_file(
+        self,
+        file_path: str,
+        table_name: str,
+        dataset: str = None,
+        chunk_bytes: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_retries: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Ingest a large CSV/JSON file as concurrently loaded chunks.
+        
+        The file is streamed into row-aligned chunks that are appended in
+        parallel to a temporary table. Once every chunk is in, the temporary
+        table is copied over the target in one atomic job. Each chunk is
+        retried on its own, and finished chunks are recorded so that a rerun
+        after a failure only sends the chunks that are missing.
+        
+        Args:
+            file_path: Path to CSV or JSON file
+            table_name: Target table name
+            dataset: Target dataset (default: raw_data)
+            chunk_bytes: Approximate chunk size (default from config)
+            max_workers: Maximum concurrent chunk uploads (default from config)
+            max_retries: Attempts per chunk (default from config)
+            
+        Returns:
+            Summary dict with keys: file, table, job_id (of the copy job),
+            rows, chunks
+        """
+        dataset = dataset or Config.BQ_DATASET_RAW
+        chunk_bytes = chunk_bytes or Config.INGEST_CHUNK_BYTES
+        max_workers = max_workers or Config.INGEST_MAX_WORKERS
+        max_retries = max_retries or Config.INGEST_CHUNK_RETRIES
+        table = f"{dataset}.{table_name}"
+        
+        state = ChunkedLoadState(file_path, table, chunk_bytes)
+        if state.abandoned_temp_table:
+            # Chunks of an older version of the file; they will never be swapped in
+            self.bq_client.delete_table(dataset, state.abandoned_temp_table)
+        if "schema" not in state.state:
+            schema = self.schema_registry.resolve(table, file_path)
+            state.state["schema"] = [field.to_api_repr() for field in schema or []]
+        # Persist the temp table name before anything is uploaded to it
+        state.save()
+        schema = [bigquery.SchemaField.from_api_repr(f) for f in state.state["schema"]]
+        
+        with tempfile.TemporaryDirectory(prefix="chunks_") as chunk_dir:
+            chunks = split_file(file_path, chunk_dir, chunk_bytes)
+            pending = [i for i in range(len(chunks)) if not state.is_completed(i)]
+            logger.info(
+                f"Loading {len(pending)} of {len(chunks)} chunks of {file_path} "
+                f"into {dataset}.{state.temp_table}"
+            )
+            
+            if pending and not schema:
+                # Let the first chunk define the schema so parallel appends agree
+                self._load_chunk(chunks, pending.pop(0), dataset, state, None, max_retries)
+                schema = self.bq_client.get_table_info(dataset, state.temp_table).schema
+            
+            errors = []
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                    futures = [
+                        executor.submit(
+                            self._load_chunk, chunks, index, dataset, state, schema, max_retries
+                        )
+                        for index in pending
+                    ]
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            errors.append(e)
+            
+            if errors:
+                raise RuntimeError(
+                    f"{len(errors)} chunk(s) of {file_path} failed; rerun to resume: {errors[0]}"
+                )
+        
+        copy_job = self.bq_client.copy_table(dataset, state.temp_table, table_name)
+        self.bq_client.delete_table(dataset, state.temp_table)
+        rows = state.total_rows
+        state.clear()
+        
+        if schema:
+            self._register_schema(dataset, table_name, schema)
+        logger.info(f"Ingestion complete: {rows} rows loaded into {table} from {len(chunks)} chunks")
+        return {
+            "file": str(file_path),
+            "table": table_name,
+            "job_id": copy_job.job_id,
+            "rows": rows,
+            "chunks": len(chunks),
+        }
+    
+    def _load_chunk(
+        self,
+        chunks: List[str],
+        index: int,
+        dataset: str,
+        state: ChunkedLoadState,
+        schema: Optional[List[bigquery.SchemaField]],
+        max_retries: int
+    ) -> None:
+        """Append one chunk to the temporary table, retrying with backoff.
+        
+        The chunk's job ID comes from the load state. Before each attempt the
+        job is looked up: a job that was submitted before a client-side error
+        (timeout, dropped connection) is waited on instead of being submitted
+        again, and only a job that failed on the server moves the chunk to a
+        new ID. The chunk is therefore appended at most once.
+        
+        Args:
+            chunks: Chunk file paths
+            index: Index of the chunk to load
+            dataset: Target dataset
+            state: Load progress to record the chunk in
+            schema: Schema for the temporary table (None to autodetect)
+            max_retries: Attempts before giving up
+        """
+        for attempt in range(1, max_retries + 1):
+            try:
+                job_id = state.job_id(index)
+                job = self.bq_client.get_job(job_id)
+                if job is not None and job.done() and job.exception() is not None:
+                    logger.warning(f"Chunk {index} job {job_id} failed: {job.exception()}")
+                    job_id = state.next_job_id(index)
+                    job = None
+                
+                if job is None:
+                    job = self.bq_client.load_data_from_file(
+                        source_file=chunks[index],
+                        dataset_id=dataset,
+                        table_id=state.temp_table,
+                        schema=schema or None,
+                        write_disposition="WRITE_APPEND",
+                        job_id=job_id
+                    )
+                else:
+                    logger.info(f"Chunk {index} was already submitted as {job_id}, waiting for it")
+                    job.result()
+                state.mark_completed(index, job.job_id, job.output_rows)
+                return
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(
+                    f"Chunk {index} failed (attempt {attempt}/{max_retries}), "
+                    f"retrying in {delay}s: {e}"
+                )
+                time.sleep(delay)
+    
+    def _submit_file(self, file_path: Path, dataset: str, staging_dir: str):
+        """Upload one file (converted to Parquet if enabled) and start its load job.
+        
+        The load uses the table's registered schema (see ``SchemaRegistry``)
+        instead of autodetect whenever one can be resolved.
+        
+        Args:
+            file_path: Path to the source file
+            dataset: Target dataset
+            staging_dir: Scratch directory for converted files
+            
+        Returns:
+            Tuple of (running load job, schema used or None for autodetect,
+            manifest snapshot of the file taken before the upload)
+        """
+        source_file = str(file_path)
+        snapshot = self.manifest.snapshot(source_file)
+        schema = self.schema_registry.resolve(f"{dataset}.{file_path.stem}", source_file)
+        load_schema = schema
+        
+        if self.convert_to_parquet:
+            arrow_schema = SchemaRegistry.to_arrow_schema(schema) if schema else None
+            try:
+                source_file = convert_to_parquet(source_file, staging_dir, schema=arrow_schema)
+                # Parquet is self-describing; its column types are pinned above
+                load_schema = None
+            except pa.ArrowInvalid as e:
+                # Types taken from a sample can miss later rows; BigQuery
+                # checks the whole file when loading it directly
+                logger.warning(f"Could not convert {file_path} to Parquet, loading it as is: {e}")
+        
+        try:
+            job = self.bq_client.submit_load_from_file(
+                source_file=source_file,
+                dataset_id=dataset,
+                table_id=file_path.stem,
+                schema=load_schema,
+                write_disposition="WRITE_TRUNCATE"
+            )
+        finally:
+            # The upload has finished once submit returns
+            if source_file != str(file_path):
+                os.remove(source_file)
+        
+        return job, schema, snapshot
+    
+    def _register_schema(self, dataset: str, table_name: str, schema) -> None:
+        """Store the schema of a successful load in the registry.
+        
+        Args:
+            dataset: Target dataset
+            table_name: Target table name
+            schema: Schema used for the load, or None if it was autodetected
+        """
+        table = f"{dataset}.{table_name}"
+        if schema is None:
+            schema = self.bq_client.get_table_info(dataset, table_name).schema
+        if schema != self.schema_registry.get(table):
+            self.schema_registry.put(table, schema)
+            logger.info(f"Registered schema for {table}")
+    
+    @staticmethod
+    def _record_metrics(summary: Dict[str, Any], dataset: str) -> None:
+        """Record a span for one file of a directory ingestion."""
+        attributes = {
+            "table": f"{dataset}.{summary['table']}",
+            "job_id": summary["job_id"],
+            "rows_out": summary["rows"],
+            "bytes_written": summary["bytes"],
+        }
+        if summary["error"]:
+            attributes["error"] = summary["error"]
+        metrics.record(
+            f"ingest:{Path(summary['file']).name}",
+            summary["duration_seconds"] or 0.0,
+            **{key: value for key, value in attributes.items() if value is not None}
+        )
+    
+    @staticmethod
+    def _summarize_job(summary: Dict[str, Any], job, start: float) -> None:
+        """Fill a file summary from a finished load job.
+        
+        Args:
+            summary: Summary dict to update in place
+            job: Finished load job
+            start: Monotonic time the directory ingestion started
+        """
+        if job.created and job.ended:
+            summary["duration_seconds"] = (job.ended - job.created).total_seconds()
+        else:
+            summary["duration_seconds"] = time.monotonic() - start
+        
+        error = job.exception()
+        if error:
+            summary["error"] = str(error)
+            return
+        
+        summary["rows"] = job.output_rows
+        summary["bytes"] = job.output_bytes
+        logger.info(
+            f"Loaded {summary['rows']} rows into {job.destination} "
+            f"in {summary['duration_seconds']:.2f}s"
+        )
 
 
 def main():
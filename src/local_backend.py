@@ -0,0 +1,603 @@
+"""Local DuckDB/Parquet stand-in for BigQuery, for running the pipeline offline."""
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Any, Set, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.api_core.exceptions import Conflict, NotFound
+from google.cloud import bigquery
+from .bigquery_client import BigQueryClient
+from .config import Config
+from .conversion import convert_to_parquet
+from .dag import TABLE_REF_PATTERN
+from .query_cache import QueryResultCache
+from .schema_registry import SchemaRegistry, arrow_to_bq_type
+from .templates import template_cache, inline_parameters
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Argument of a function call, allowing one level of nested parentheses
+_ARG = r"((?:[^()]|\([^()]*\))+?)"
+
+# BigQuery functions and types rewritten to their DuckDB equivalents
+SQL_TRANSLATIONS = [
+    (re.compile(r"\bFLOAT64\b", re.IGNORECASE), "DOUBLE"),
+    (re.compile(r"\bBYTES\b", re.IGNORECASE), "BLOB"),
+    (re.compile(r"\bSAFE_CAST\s*\(", re.IGNORECASE), "TRY_CAST("),
+    (
+        re.compile(r"\bCURRENT_(TIMESTAMP|DATE|TIME)\s*\(\s*\)", re.IGNORECASE),
+        r"CURRENT_\1"
+    ),
+    (
+        re.compile(rf"\bPARSE_(?:TIMESTAMP|DATETIME)\s*\(\s*('[^']*')\s*,\s*{_ARG}\)", re.IGNORECASE),
+        r"strptime(CAST(\2 AS VARCHAR), \1)"
+    ),
+    (
+        re.compile(rf"\bPARSE_DATE\s*\(\s*('[^']*')\s*,\s*{_ARG}\)", re.IGNORECASE),
+        r"CAST(strptime(CAST(\2 AS VARCHAR), \1) AS DATE)"
+    ),
+    (
+        re.compile(rf"\bFORMAT_(?:TIMESTAMP|DATETIME|DATE)\s*\(\s*('[^']*')\s*,\s*{_ARG}\)", re.IGNORECASE),
+        r"strftime(\2, \1)"
+    ),
+]
+
+
+def translate_query(query: str) -> Tuple[str, Set[Tuple[str, str]]]:
+    """Rewrite BigQuery SQL into DuckDB SQL.
+    
+    Backtick table references (``project.dataset.table`` or
+    ``dataset.table``) become ``"dataset"."table"``, other backtick
+    identifiers become double-quoted, and the common BigQuery-only functions
+    and types in ``SQL_TRANSLATIONS`` are rewritten. Anything else is passed
+    through unchanged.
+    
+    Args:
+        query: BigQuery SQL text
+    
+    Returns:
+        Tuple of the DuckDB SQL text and the referenced (dataset, table) pairs
+    """
+    tables = set()
+    
+    def replace_ref(match):
+        parts = match.group(1).split(".")
+        if len(parts) < 2:
+            return f'"{parts[0]}"'
+        dataset, table = parts[-2:]
+        tables.add((dataset, table))
+        return f'"{dataset}"."{table}"'
+    
+    sql = TABLE_REF_PATTERN.sub(replace_ref, query)
+    for pattern, replacement in SQL_TRANSLATIONS:
+        sql = pattern.sub(replacement, sql)
+    
+    # Strip the trailing semicolon so the query can be nested
+    return sql.strip().rstrip(";"), tables
+
+
+class LocalJob:
+    """A finished local job with the parts of the BigQuery job API the pipeline uses.
+    
+    Local work runs synchronously when submitted, so the job is always done.
+    A failure is stored and raised from ``result()``, like a failed BigQuery job.
+    """
+    
+    def __init__(self, destination: Optional[str] = None, job_id: Optional[str] = None):
+        """Start tracking a job.
+        
+        Args:
+            destination: Table the job writes (format: dataset.table)
+            job_id: Job ID (default: a random one)
+        """
+        self.job_id = job_id or f"local_{uuid.uuid4().hex[:12]}"
+        self.destination = destination
+        self.created = datetime.now(timezone.utc)
+        self.ended = None
+        self.output_rows = None
+        self.output_bytes = None
+        self.total_bytes_processed = None
+        self.num_dml_affected_rows = None
+        self._table = None
+        self._error = None
+    
+    def done(self) -> bool:
+        """Local jobs finish before they are returned."""
+        return True
+    
+    def cancel(self) -> bool:
+        """Nothing to cancel; the job has already finished."""
+        return False
+    
+    def exception(self) -> Optional[Exception]:
+        """Return the error the job failed with, if any."""
+        return self._error
+    
+    def result(self, timeout: Optional[float] = None) -> "LocalJob":
+        """Return the job, raising its error if it failed."""
+        if self._error is not None:
+            raise self._error
+        return self
+    
+    def to_arrow(self) -> pa.Table:
+        """Query result as an Arrow table."""
+        return self._table
+    
+    def to_dataframe(self):
+        """Query result as a pandas DataFrame."""
+        return self._table.to_pandas()
+
+
+class LocalClient(BigQueryClient):
+    """Drop-in replacement for ``BigQueryClient`` backed by DuckDB and Parquet.
+    
+    Each table is one Parquet file at ``<warehouse_dir>/<dataset>/<table>.parquet``.
+    Queries run in an in-memory DuckDB connection with a view per referenced
+    table, after ``translate_query``. Job polling, waiting and SQL rendering
+    are inherited unchanged. Tables are not partitioned and dry runs report
+    the size of the referenced tables, since there is no pruning estimate.
+    """
+    
+    def __init__(self, warehouse_dir: Optional[str] = None):
+        """Initialize the local backend.
+        
+        Args:
+            warehouse_dir: Directory holding the tables (default from config)
+        """
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError(
+                "The local backend needs duckdb: pip install duckdb"
+            ) from e
+        
+        self._duckdb = duckdb
+        self.client = None
+        self.warehouse_dir = Path(warehouse_dir or Config.LOCAL_WAREHOUSE_DIR)
+        self.query_cache = QueryResultCache()
+        self.templates = template_cache
+        self._table_locks: Dict[Path, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        # Jobs submitted with an explicit ID, for get_job
+        self._jobs: Dict[str, LocalJob] = {}
+        
+        logger.info(f"Local backend initialized in {self.warehouse_dir}")
+    
+    def _table_path(self, dataset_id: str, table_id: str) -> Path:
+        return self.warehouse_dir / dataset_id / f"{table_id}.parquet"
+    
+    def _table_lock(self, path: Path) -> threading.Lock:
+        """Lock serializing writes to one table (e.g. parallel chunk appends)."""
+        with self._locks_lock:
+            return self._table_locks.setdefault(path, threading.Lock())
+    
+    def _run(self, job: LocalJob, work) -> LocalJob:
+        """Run ``work`` for a job, recording its failure instead of raising."""
+        try:
+            work()
+        except Exception as e:
+            logger.error(f"Local job {job.job_id} failed: {e}")
+            job._error = e
+        job.ended = datetime.now(timezone.utc)
+        return job
+    
+    def _connect(self, query: str, query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None):
+        """Open a DuckDB connection with views for the tables a query reads.
+        
+        ``@name`` query parameters are inlined as SQL literals.
+        
+        Returns:
+            Tuple of the connection, the translated SQL and the bytes of the
+            referenced tables
+        
+        Raises:
+            NotFound: If a referenced table does not exist
+        """
+        sql, tables = translate_query(inline_parameters(query, query_parameters))
+        con = self._duckdb.connect()
+        scanned = 0
+        for dataset_id, table_id in sorted(tables):
+            path = self._table_path(dataset_id, table_id)
+            if not path.exists():
+                con.close()
+                raise NotFound(f"Not found: Table {dataset_id}.{table_id}")
+            scanned += path.stat().st_size
+            escaped = str(path).replace("'", "''")
+            con.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset_id}"')
+            con.execute(
+                f'CREATE VIEW "{dataset_id}"."{table_id}" AS '
+                f"SELECT * FROM read_parquet('{escaped}')"
+            )
+        return con, sql, scanned
+    
+    @staticmethod
+    def _fetch(con, sql: str) -> pa.Table:
+        result = con.execute(sql).arrow()
+        # Newer duckdb returns a stream reader, older versions a table
+        return result.read_all() if isinstance(result, pa.RecordBatchReader) else result
+    
+    def _write(self, path: Path, table: pa.Table, write_disposition: str) -> None:
+        """Write a table atomically, honouring the write disposition.
+        
+        Callers hold the table's lock.
+        """
+        if path.exists():
+            if write_disposition == "WRITE_EMPTY" and pq.read_metadata(path).num_rows:
+                raise ValueError(f"Table {path.parent.name}.{path.stem} is not empty")
+            if write_disposition == "WRITE_APPEND":
+                table = pa.concat_tables(
+                    [pq.read_table(path), table], promote_options="default"
+                )
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path, compression=Config.PARQUET_COMPRESSION)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    
+    def create_dataset(self, dataset_id: str, location: str = None) -> Path:
+        """Create a dataset directory if it doesn't exist.
+        
+        Args:
+            dataset_id: Dataset ID
+            location: Ignored
+        
+        Returns:
+            Dataset directory
+        """
+        path = self.warehouse_dir / dataset_id
+        path.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Dataset {dataset_id} created or already exists")
+        return path
+    
+    def submit_load_from_file(
+        self,
+        source_file: str,
+        dataset_id: str,
+        table_id: str,
+        schema: Optional[List[bigquery.SchemaField]] = None,
+        write_disposition: str = "WRITE_TRUNCATE",
+        job_id: Optional[str] = None
+    ) -> LocalJob:
+        """Load a CSV, NDJSON or Parquet file into a local table.
+        
+        CSV/JSON files are converted to Parquet with the given schema's
+        lossless column types pinned (see ``SchemaRegistry.to_arrow_schema``).
+        
+        Args:
+            source_file: Path to source file (CSV, JSON, Parquet)
+            dataset_id: Target dataset ID
+            table_id: Target table ID
+            schema: Table schema (optional, inferred if not provided)
+            write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            job_id: Optional job ID; like BigQuery, an ID can only be used once
+        
+        Returns:
+            Finished load job
+        
+        Raises:
+            Conflict: If a job with ``job_id`` was already submitted
+        """
+        path = self._table_path(dataset_id, table_id)
+        job = LocalJob(destination=f"{dataset_id}.{table_id}", job_id=job_id)
+        if job_id is not None:
+            with self._locks_lock:
+                if job_id in self._jobs:
+                    raise Conflict(f"Already Exists: Job {job_id}")
+                self._jobs[job_id] = job
+        
+        def load():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=path.parent) as tmp_dir:
+                if source_file.endswith('.parquet'):
+                    parquet_file = source_file
+                else:
+                    arrow_schema = SchemaRegistry.to_arrow_schema(schema) if schema else None
+                    parquet_file = convert_to_parquet(source_file, tmp_dir, schema=arrow_schema)
+                
+                job.output_rows = pq.read_metadata(parquet_file).num_rows
+                job.output_bytes = os.path.getsize(parquet_file)
+                with self._table_lock(path):
+                    if write_disposition == "WRITE_TRUNCATE" and parquet_file != source_file:
+                        # Freshly converted file: move it into place without rewriting
+                        os.replace(parquet_file, path)
+                    else:
+                        self._write(path, pq.read_table(parquet_file), write_disposition)
+        
+        self._run(job, load)
+        logger.info(f"Submitted load job {job.job_id} for {job.destination}")
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[LocalJob]:
+        """Look up a job submitted with an explicit ID.
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            The job, or None if no job with that ID was submitted
+        """
+        with self._locks_lock:
+            return self._jobs.get(job_id)
+    
+    def submit_query(
+        self,
+        query: str,
+        destination_table: Optional[str] = None,
+        write_disposition: str = "WRITE_TRUNCATE",
+        time_partitioning_field: Optional[str] = None,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
+    ) -> LocalJob:
+        """Run a SQL query locally, optionally writing the result to a table.
+        
+        Args:
+            query: BigQuery SQL query string
+            destination_table: Optional destination table (format: dataset.table)
+            write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            time_partitioning_field: Ignored; local tables are not partitioned
+            query_parameters: Values for ``@name`` parameters in the query
+            
+        Returns:
+            Finished query job
+        """
+        job = LocalJob(destination=destination_table)
+        
+        def run():
+            con, sql, scanned = self._connect(query, query_parameters)
+            try:
+                job._table = self._fetch(con, sql)
+            finally:
+                con.close()
+            job.total_bytes_processed = scanned
+            
+            if destination_table:
+                dataset_id, table_id = destination_table.split('.')
+                path = self._table_path(dataset_id, table_id)
+                with self._table_lock(path):
+                    self._write(path, job._table, write_disposition)
+        
+        self._run(job, run)
+        logger.info(f"Submitted query job {job.job_id}")
+        return job
+    
+    def query_to_record_batches(
+        self,
+        query: str,
+        page_size: Optional[int] = None,
+        max_stream_count: Optional[int] = None
+    ) -> pa.RecordBatchReader:
+        """Run a SQL query locally and stream its result as record batches.
+        
+        Args:
+            query: BigQuery SQL query string
+            page_size: Rows per batch (default from config)
+            max_stream_count: Ignored; DuckDB produces a single stream
+            
+        Returns:
+            Reader yielding the result batches, with the result schema
+        """
+        con, sql, _ = self._connect(query)
+        try:
+            result = con.execute(sql)
+            # Newer duckdb renamed fetch_record_batch to to_arrow_reader
+            fetch = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+            reader = fetch(page_size or Config.RESULT_PAGE_SIZE)
+        except Exception:
+            con.close()
+            raise
+        
+        def batches():
+            try:
+                yield from reader
+            finally:
+                con.close()
+        
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+    
+    def dry_run_query(
+        self,
+        query: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
+    ) -> int:
+        """Validate a query and report the size of the tables it reads.
+        
+        Args:
+            query: BigQuery SQL query string
+            query_parameters: Values for ``@name`` parameters in the query
+            
+        Returns:
+            Bytes of the referenced tables
+        """
+        con, sql, scanned = self._connect(query, query_parameters)
+        try:
+            con.execute(f"EXPLAIN {sql}")
+        finally:
+            con.close()
+        return scanned
+    
+    def replace_partitions(
+        self,
+        query: str,
+        destination_table: str,
+        partition_column: str,
+        start_date: date,
+        end_date: date,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None
+    ) -> LocalJob:
+        """Replace the rows of a date range with the rows a query returns for it.
+        
+        Mirrors the BigQuery MERGE: rows outside [start_date, end_date],
+        including those with a NULL ``partition_column``, are kept.
+        
+        Args:
+            query: SQL query producing the destination rows
+            destination_table: Destination table (format: dataset.table)
+            partition_column: DATE column to replace by
+            start_date: First date to replace (inclusive)
+            end_date: Last date to replace (inclusive)
+            query_parameters: Values for ``@name`` parameters in the query
+            
+        Returns:
+            Finished job
+        """
+        dataset_id, table_id = destination_table.split('.')
+        path = self._table_path(dataset_id, table_id)
+        in_range = (
+            f"{partition_column} BETWEEN DATE '{start_date.isoformat()}' "
+            f"AND DATE '{end_date.isoformat()}'"
+        )
+        escaped = str(path).replace("'", "''")
+        
+        con, sql, _ = self._connect(query, query_parameters)
+        try:
+            with self._table_lock(path):
+                kept = self._fetch(
+                    con,
+                    f"SELECT * FROM read_parquet('{escaped}') "
+                    f"WHERE {partition_column} IS NULL OR NOT ({in_range})"
+                )
+                replaced = pq.read_metadata(path).num_rows - kept.num_rows
+                inserted = self._fetch(con, f"SELECT * FROM ({sql}) WHERE {in_range}")
+                self._write(
+                    path,
+                    pa.concat_tables([kept, inserted], promote_options="default"),
+                    "WRITE_TRUNCATE"
+                )
+        finally:
+            con.close()
+        
+        job = LocalJob(destination=destination_table)
+        job.num_dml_affected_rows = replaced + inserted.num_rows
+        job.ended = datetime.now(timezone.utc)
+        logger.info(
+            f"Replaced partitions {start_date} to {end_date} of {destination_table} "
+            f"({job.num_dml_affected_rows} rows affected)"
+        )
+        return job
+    
+    def copy_table(
+        self,
+        dataset_id: str,
+        source_table_id: str,
+        destination_table_id: str,
+        write_disposition: str = "WRITE_TRUNCATE"
+    ) -> LocalJob:
+        """Copy one table over another within a dataset.
+        
+        Args:
+            dataset_id: Dataset ID
+            source_table_id: Table to copy from
+            destination_table_id: Table to copy to
+            write_disposition: WRITE_TRUNCATE, WRITE_APPEND, or WRITE_EMPTY
+            
+        Returns:
+            Finished copy job
+        """
+        source = self._table_path(dataset_id, source_table_id)
+        destination = self._table_path(dataset_id, destination_table_id)
+        if not source.exists():
+            raise NotFound(f"Not found: Table {dataset_id}.{source_table_id}")
+        
+        with self._table_lock(destination):
+            if write_disposition == "WRITE_TRUNCATE":
+                fd, tmp_path = tempfile.mkstemp(dir=destination.parent, suffix=".tmp")
+                os.close(fd)
+                shutil.copyfile(source, tmp_path)
+                os.replace(tmp_path, destination)
+            else:
+                self._write(destination, pq.read_table(source), write_disposition)
+        
+        logger.info(f"Copied {dataset_id}.{source_table_id} to {dataset_id}.{destination_table_id}")
+        job = LocalJob(destination=f"{dataset_id}.{destination_table_id}")
+        job.ended = datetime.now(timezone.utc)
+        return job
+    
+    def delete_table(self, dataset_id: str, table_id: str) -> None:
+        """Delete a table if it exists.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+        """
+        self._table_path(dataset_id, table_id).unlink(missing_ok=True)
+        logger.info(f"Deleted table {dataset_id}.{table_id}")
+    
+    def table_exists(self, dataset_id: str, table_id: str) -> bool:
+        """Check whether a table exists.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+            
+        Returns:
+            True if the table exists
+        """
+        return self._table_path(dataset_id, table_id).exists()
+    
+    def is_partitioned_by(self, dataset_id: str, table_id: str, column: str) -> bool:
+        """Check whether a table can have its partitions replaced by a column.
+        
+        Local tables are not partitioned and ``replace_partitions`` works on
+        any of them, so there is nothing to migrate.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+            column: DATE partitioning column
+            
+        Returns:
+            True if the table exists
+        """
+        return self.table_exists(dataset_id, table_id)
+    
+    def get_table_info(self, dataset_id: str, table_id: str) -> SimpleNamespace:
+        """Get table metadata.
+        
+        Args:
+            dataset_id: Dataset ID
+            table_id: Table ID
+            
+        Returns:
+            Object with num_rows, num_bytes, modified and schema like a
+            BigQuery Table
+        """
+        path = self._table_path(dataset_id, table_id)
+        if not path.exists():
+            raise NotFound(f"Not found: Table {dataset_id}.{table_id}")
+        
+        metadata = pq.read_metadata(path)
+        table = SimpleNamespace(
+            dataset_id=dataset_id,
+            table_id=table_id,
+            num_rows=metadata.num_rows,
+            num_bytes=path.stat().st_size,
+            modified=datetime.fromtimestamp(path.stat().st_mtime, timezone.utc),
+            schema=[
+                bigquery.SchemaField(field.name, arrow_to_bq_type(field.type), mode="NULLABLE")
+                for field in metadata.schema.to_arrow_schema()
+            ],
+        )
+        
+        logger.info(f"Table {dataset_id}.{table_id}: {table.num_rows} rows, {table.num_bytes} bytes")
+        return table
+    
+    def _table_modified(self, table_ref: str) -> Any:
+        dataset_id, table_id = table_ref.split(".")[-2:]
+        path = self._table_path(dataset_id, table_id)
+        if not path.exists():
+            raise NotFound(f"Not found: Table {dataset_id}.{table_id}")
+        return path.stat().st_mtime_ns
@@ -0,0 +1,149 @@
+"""Local manifest of ingested files, used to skip unchanged files."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Compute the SHA-256 of a file, reading it in chunks.
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per chunk
+    
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """Record of the files loaded into each table.
+    
+    Each entry stores the file path, size, mtime, content hash, target table
+    and load job id of the last successful load. A file is unchanged when its
+    size and mtime match; if only the mtime moved, the content hash decides.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """Load the manifest from disk (an empty one if it does not exist).
+        
+        Args:
+            path: Manifest JSON path (default from config)
+        """
+        self.path = Path(path or Config.INGEST_MANIFEST_PATH)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Hashes computed during change checks, reused when recording
+        self._hashes: Dict[str, str] = {}
+        
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.entries = json.load(f).get("files", {})
+            logger.info(f"Loaded ingestion manifest with {len(self.entries)} files")
+    
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return str(Path(file_path).resolve())
+    
+    def is_unchanged(self, file_path: str, table: str) -> bool:
+        """Check whether a file was already loaded into a table as-is.
+        
+        Args:
+            file_path: Path to the source file
+            table: Target table (format: dataset.table)
+        
+        Returns:
+            True if the file can be skipped
+        """
+        key = self._key(file_path)
+        entry = self.entries.get(key)
+        if not entry or entry["table"] != table:
+            return False
+        
+        stat = os.stat(file_path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        
+        # Same size but touched: only the content can tell
+        content_hash = file_hash(file_path)
+        self._hashes[key] = content_hash
+        if content_hash != entry["sha256"]:
+            return False
+        
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+    
+    def snapshot(self, file_path: str) -> Dict[str, Any]:
+        """Capture a file's size, mtime and content hash.
+        
+        Take the snapshot before uploading and pass it to ``record``, so a
+        file modified during its load is not recorded with contents that
+        were never loaded.
+        
+        Args:
+            file_path: Path to the source file
+        
+        Returns:
+            Dict with keys: size, mtime_ns, sha256
+        """
+        key = self._key(file_path)
+        stat = os.stat(file_path)
+        content_hash = self._hashes.pop(key, None) or file_hash(file_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": content_hash}
+    
+    def record(
+        self,
+        file_path: str,
+        table: str,
+        job_id: Optional[str],
+        snapshot: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record a successful load of a file.
+        
+        Args:
+            file_path: Path to the source file
+            table: Target table (format: dataset.table)
+            job_id: Load job ID
+            snapshot: File state taken before the upload (see ``snapshot``);
+                taken now if omitted
+        """
+        key = self._key(file_path)
+        snapshot = snapshot or self.snapshot(file_path)
+        
+        self.entries[key] = {
+            "path": key,
+            **snapshot,
+            "table": table,
+            "job_id": job_id,
+            "loaded_at": datetime.now(timezone.utc).isoformat(),
+        }
+    
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"files": self.entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
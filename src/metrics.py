@@ -0,0 +1,283 @@
+"""Timing and resource spans for pipeline stages, exported as JSON or OpenMetrics."""
+
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Job attributes copied onto a span, as (span attribute, job attribute)
+JOB_ATTRIBUTES = [
+    ("job_id", "job_id"),
+    ("bytes_processed", "total_bytes_processed"),
+    ("bytes_billed", "total_bytes_billed"),
+    ("bytes_written", "output_bytes"),
+    ("slot_ms", "slot_millis"),
+    ("cache_hit", "cache_hit"),
+    ("rows_out", "output_rows"),
+]
+
+# Numeric span attributes exported as OpenMetrics gauges
+EXPORTED_METRICS = [
+    ("duration_seconds", "Wall time of the span"),
+    ("rows_out", "Rows written"),
+    ("bytes_processed", "Bytes processed"),
+    ("bytes_billed", "Bytes billed"),
+    ("bytes_written", "Bytes written by a load"),
+    ("slot_ms", "Slot milliseconds consumed"),
+    ("cache_hit", "1 if the result came from cache"),
+    ("peak_rss_bytes", "Process peak RSS when the span ended"),
+]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of the current process (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Span:
+    """One timed pipeline step and the figures recorded for it."""
+    
+    def __init__(self, name: str, parent: Optional[str] = None, **attributes):
+        """Start a span.
+        
+        Args:
+            name: Span name, e.g. ``transform:staging_orders.sql``
+            parent: Name of the enclosing span, if any
+            **attributes: Initial attributes
+        """
+        self.name = name
+        self.parent = parent
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self._monotonic_start = time.monotonic()
+        self.duration_seconds: Optional[float] = None
+        self.attributes: Dict[str, Any] = dict(attributes)
+    
+    def set(self, **attributes) -> None:
+        """Add or overwrite attributes."""
+        self.attributes.update(attributes)
+    
+    def record_job(self, job) -> None:
+        """Copy the id, bytes, slot time, cache hit and row count of a job.
+        
+        Attributes the job does not have (or has not filled in) are skipped.
+        
+        Args:
+            job: BigQuery (or local) load/query job
+        """
+        for name, job_attribute in JOB_ATTRIBUTES:
+            value = getattr(job, job_attribute, None)
+            if value is not None:
+                self.attributes[name] = value
+    
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Stop the clock and record memory and any error."""
+        self.end = time.time()
+        self.duration_seconds = time.monotonic() - self._monotonic_start
+        self.attributes["peak_rss_bytes"] = peak_rss_bytes()
+        if error is not None:
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Span as a JSON-serializable dict."""
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start": self.start,
+            "end": self.end,
+            "duration_seconds": self.duration_seconds,
+            **self.attributes,
+        }
+
+
+class MetricsRecorder:
+    """Thread-safe collection of spans for one pipeline run.
+    
+    Spans opened with ``span()`` nest within the current thread: a span
+    started inside another gets it as parent. Spans started in worker
+    threads have no parent, but their start times still show the overlap.
+    """
+    
+    def __init__(self):
+        """Initialize an empty recorder."""
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+    
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time a block of code as a span.
+        
+        Args:
+            name: Span name
+            **attributes: Initial attributes
+        
+        Yields:
+            The span, for adding attributes while it runs
+        """
+        stack = self._stack()
+        span = Span(name, parent=stack[-1].name if stack else None, **attributes)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(error=e)
+            raise
+        else:
+            span.finish()
+        finally:
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+    
+    def record(
+        self,
+        name: str,
+        duration_seconds: float,
+        job=None,
+        **attributes
+    ) -> Span:
+        """Record a step that was timed elsewhere (e.g. one of many parallel jobs).
+        
+        Args:
+            name: Span name
+            duration_seconds: Wall time of the step
+            job: Optional job to copy figures from
+            **attributes: Additional attributes
+        
+        Returns:
+            The recorded span
+        """
+        stack = self._stack()
+        span = Span(name, parent=stack[-1].name if stack else None, **attributes)
+        if job is not None:
+            span.record_job(job)
+        span.finish()
+        span.duration_seconds = duration_seconds
+        span.start = span.end - duration_seconds
+        with self._lock:
+            self.spans.append(span)
+        return span
+    
+    def clear(self) -> None:
+        """Drop all recorded spans."""
+        with self._lock:
+            self.spans.clear()
+    
+    def _sorted_spans(self) -> List[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span.start)
+    
+    def to_json(self, path: str) -> None:
+        """Write all spans as a JSON list.
+        
+        Args:
+            path: Output file path
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump([span.to_dict() for span in self._sorted_spans()], f, indent=2, default=str)
+    
+    def to_openmetrics(self, path: str) -> None:
+        """Write numeric span attributes in the OpenMetrics text format.
+        
+        Each attribute becomes a ``pipeline_span_<attribute>`` gauge labelled
+        with the span name.
+        
+        Args:
+            path: Output file path
+        """
+        spans = self._sorted_spans()
+        lines = []
+        for attribute, help_text in EXPORTED_METRICS:
+            metric = f"pipeline_span_{attribute}"
+            samples = []
+            for span in spans:
+                value = span.to_dict().get(attribute)
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    samples.append(f'{metric}{{span="{_escape_label(span.name)}"}} {value}')
+            if samples:
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.extend(samples)
+        lines.append("# EOF")
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text("\n".join(lines) + "\n")
+    
+    def export(self, output_dir: str) -> None:
+        """Write ``metrics.json`` and ``metrics.prom`` into a directory.
+        
+        Args:
+            output_dir: Output directory
+        """
+        self.to_json(str(Path(output_dir) / "metrics.json"))
+        self.to_openmetrics(str(Path(output_dir) / "metrics.prom"))
+        logger.info(f"Wrote pipeline metrics to {output_dir}")
+    
+    def summary_table(self) -> str:
+        """Spans in start order with their offset, duration and main figures.
+        
+        Returns:
+            Fixed-width text table
+        """
+        spans = self._sorted_spans()
+        if not spans:
+            return "No spans recorded"
+        
+        origin = spans[0].start
+        header = (
+            f"{'span':<48} {'start':>8} {'seconds':>9} {'rows':>12} "
+            f"{'bytes':>14} {'slot_ms':>10} {'cache':>5}"
+        )
+        lines = [header, "-" * len(header)]
+        for span in spans:
+            attributes = span.attributes
+            name = ("  " if span.parent else "") + span.name
+            if "error" in attributes:
+                name = f"{name} (failed)"
+            lines.append(
+                f"{name[:48]:<48} {span.start - origin:>8.2f} "
+                f"{span.duration_seconds or 0:>9.2f} "
+                f"{_format(attributes.get('rows_out')):>12} "
+                f"{_format(attributes.get('bytes_processed', attributes.get('bytes_written'))):>14} "
+                f"{_format(attributes.get('slot_ms')):>10} "
+                f"{_format(attributes.get('cache_hit')):>5}"
+            )
+        return "\n".join(lines)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    return str(value)
+
+
+# Recorder shared by the pipeline modules
+metrics = MetricsRecorder()
@@ -0,0 +1,188 @@
+"""Hash-partition DataFrames by key and aggregate the partitions in a process pool."""
+
+import gc
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional, List, Callable, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from .config import Config
+from .dedup import hash_event_ids
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def partition_ids(keys, partitions: int) -> np.ndarray:
+    """Partition number of every key, stable across processes and runs.
+    
+    Args:
+        keys: Key values (strings or anything with a string form)
+        partitions: Number of partitions
+    
+    Returns:
+        int64 array of partition numbers in [0, partitions)
+    """
+    return (hash_event_ids(keys) % np.uint64(partitions)).astype(np.int64)
+
+
+def split_by_key(data: pd.DataFrame, key: str, partitions: int) -> List[pd.DataFrame]:
+    """Split rows into hash partitions of a key column.
+    
+    All rows with the same key land in the same partition, and rows keep
+    their relative order within a partition.
+    
+    Args:
+        data: Input rows
+        key: Column to partition on (e.g. ``user_id``)
+        partitions: Number of partitions
+    
+    Returns:
+        One DataFrame per partition (possibly empty), in partition order
+    """
+    ids = partition_ids(data[key], partitions)
+    order = np.argsort(ids, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(ids, minlength=partitions))])
+    ordered = data.iloc[order]
+    return [ordered.iloc[bounds[i]:bounds[i + 1]] for i in range(partitions)]
+
+
+def _to_ipc(table: pa.Table, sink) -> None:
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _share(frame: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, int]:
+    """Write a DataFrame into a new shared memory block as an Arrow IPC stream."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    counter = pa.MockOutputStream()
+    _to_ipc(table, counter)
+    size = counter.size()
+    
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    buffer = pa.py_buffer(block.buf)
+    _to_ipc(table, pa.FixedSizeBufferWriter(buffer))
+    # The block can only be closed once no buffer points into it
+    del buffer
+    return block, size
+
+
+def _run_partition(func: Callable, name: str, size: int, kwargs: dict) -> bytes:
+    """Worker body: read a partition from shared memory, aggregate it, return IPC bytes."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(block.buf)[:size]).read_all()
+        result = func(table.to_pandas(), **kwargs)
+        sink = pa.BufferOutputStream()
+        _to_ipc(pa.Table.from_pandas(result, preserve_index=False), sink)
+        del table, result
+        return sink.getvalue().to_pybytes()
+    finally:
+        # Drop DataFrames that may still view the block before unmapping it
+        gc.collect()
+        try:
+            block.close()
+        except BufferError:
+            logger.warning(f"Partition {name} still referenced; left mapped until the worker exits")
+
+
+def _from_ipc(payload: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+class PartitionedExecutor:
+    """Run a per-key aggregation on hash partitions of a DataFrame in parallel.
+    
+    The input is split by a key column (``user_id``, ``device_id``...) so
+    every key is aggregated by exactly one worker. Partitions reach the
+    workers as Arrow IPC streams in shared memory and results come back as
+    Arrow IPC bytes, so no DataFrame is ever pickled. Results are
+    concatenated in partition order, then optionally combined and sorted, so
+    the output does not depend on which worker finishes first.
+    
+    ``func`` runs in worker processes: it must be a module-level function
+    the workers can import (with the ``spawn`` start method, from an
+    importable module).
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        partitions: Optional[int] = None,
+        start_method: Optional[str] = None
+    ):
+        """Initialize the executor.
+        
+        Args:
+            max_workers: Worker processes (default: Config.PARALLEL_MAX_WORKERS,
+                or the CPU count when that is 0)
+            partitions: Hash partitions (default: one per worker)
+            start_method: multiprocessing start method (default:
+                Config.PARALLEL_START_METHOD, or the platform default)
+        """
+        self.max_workers = max_workers or Config.PARALLEL_MAX_WORKERS or os.cpu_count() or 1
+        self.partitions = partitions or self.max_workers
+        self.start_method = start_method or Config.PARALLEL_START_METHOD
+    
+    def map_partitions(
+        self,
+        func: Callable[..., pd.DataFrame],
+        data: pd.DataFrame,
+        key: str,
+        combine: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        sort_by: Optional[Sequence[str]] = None,
+        **kwargs
+    ) -> pd.DataFrame:
+        """Apply ``func`` to every key partition and merge the results.
+        
+        Args:
+            func: Aggregation taking a DataFrame (and ``kwargs``) and
+                returning a DataFrame
+            data: Input rows
+            key: Column to partition on
+            combine: Optional function merging the concatenated partial
+                results (e.g. a groupby sum when output groups span keys)
+            sort_by: Optional columns to sort the final result by
+            **kwargs: Extra arguments passed to ``func``
+        
+        Returns:
+            Concatenated (combined, sorted) results with a fresh index
+        """
+        if self.max_workers <= 1 or self.partitions <= 1 or data.empty:
+            results = [func(data, **kwargs)]
+        else:
+            results = self._run(func, data, key, kwargs)
+        
+        non_empty = [result for result in results if not result.empty]
+        output = pd.concat(non_empty, ignore_index=True) if non_empty else results[0]
+        if combine is not None:
+            output = combine(output)
+        if sort_by:
+            output = output.sort_values(list(sort_by), kind="stable")
+        return output.reset_index(drop=True)
+    
+    def _run(self, func: Callable, data: pd.DataFrame, key: str, kwargs: dict) -> List[pd.DataFrame]:
+        parts = [part for part in split_by_key(data, key, self.partitions) if not part.empty]
+        blocks = []
+        try:
+            for part in parts:
+                blocks.append(_share(part))
+            del parts
+            
+            context = multiprocessing.get_context(self.start_method)
+            workers = min(self.max_workers, len(blocks))
+            logger.info(f"Aggregating {len(data)} rows in {len(blocks)} partitions on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [
+                    executor.submit(_run_partition, func, block.name, size, kwargs)
+                    for block, size in blocks
+                ]
+                return [_from_ipc(future.result()) for future in futures]
+        finally:
+            for block, _ in blocks:
+                block.close()
+                block.unlink()
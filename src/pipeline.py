@@ -2,8 +2,12 @@
 
 import argparse
 import logging
+from datetime import date
+from typing import Optional
 from .config import Config
+from .cost_baseline import CostBaseline, bytes_to_cost, find_regressions
 from .ingestion import DataIngestion
+from .metrics import metrics
 from .transformation import DataTransformation
 
 logging.basicConfig(
@@ -13,34 +17,120 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_ingestion():
-    """Run data ingestion process."""
+def run_ingestion(force: bool = False):
+    """Run data ingestion process.
+    
+    Args:
+        force: Reload files even if they are unchanged since the last run
+    """
     logger.info("Starting data ingestion...")
-    ingestion = DataIngestion()
-    ingestion.ingest_directory(str(Config.DATA_DIR))
+    with metrics.span("ingestion") as span:
+        ingestion = DataIngestion()
+        summaries = ingestion.ingest_directory(str(Config.DATA_DIR), force=force)
+        span.set(rows_out=sum(summary["rows"] or 0 for summary in summaries))
+        
+        failed = [summary for summary in summaries if summary["error"]]
+        if failed:
+            raise RuntimeError(
+                f"Ingestion failed for {len(failed)} file(s): "
+                + ", ".join(summary["file"] for summary in failed)
+            )
     logger.info("Data ingestion completed")
 
 
-def run_transformation():
-    """Run data transformation process."""
+def run_cost_estimate(
+    run_date: Optional[date] = None,
+    full_refresh: bool = False,
+    update_baseline: bool = False,
+    fail_on_regression: bool = False
+):
+    """Dry-run every transformation and compare bytes scanned to the baseline.
+    
+    Args:
+        run_date: Date incremental models recompute up to (default: today)
+        full_refresh: Estimate full builds of incremental models
+        update_baseline: Store these estimates as the new baseline
+        fail_on_regression: Raise instead of warning when a model regresses
+            or its dry run failed (its cost is unknown, so it cannot pass)
+    """
+    logger.info("Estimating transformation costs (dry run)...")
+    with metrics.span("cost_estimate") as span:
+        transformation = DataTransformation()
+        estimates = transformation.estimate_costs(run_date=run_date, full_refresh=full_refresh)
+        span.set(bytes_processed=sum(estimated or 0 for estimated in estimates.values()))
+    baseline = CostBaseline()
+    
+    regressions = find_regressions(estimates, baseline.models)
+    for regression in regressions:
+        logger.warning(
+            f"{regression['model']} would scan {regression['estimated_bytes']} bytes "
+            f"(~${bytes_to_cost(regression['estimated_bytes']):.4f}), "
+            f"{regression['ratio']:.1f}x its baseline of {regression['baseline_bytes']}"
+        )
+    
+    failed = [model for model, estimated in estimates.items() if estimated is None]
+    for model in failed:
+        logger.warning(f"{model} could not be estimated (dry run failed)")
+    
+    if update_baseline:
+        baseline.update(estimates)
+    elif fail_on_regression and (regressions or failed):
+        problems = [f"{regression['model']} (regressed)" for regression in regressions]
+        problems += [f"{model} (dry run failed)" for model in failed]
+        raise RuntimeError(
+            f"Cost check failed for {len(problems)} model(s): " + ", ".join(problems)
+        )
+    logger.info("Cost estimate completed")
+
+
+def run_transformation(
+    run_date: Optional[date] = None,
+    full_refresh: bool = False,
+    check_costs: bool = False
+):
+    """Run data transformation process.
+    
+    Args:
+        run_date: Date incremental models recompute up to (default: today)
+        full_refresh: Rebuild incremental models from scratch
+        check_costs: Dry-run first and stop if bytes scanned regressed
+    """
+    if check_costs:
+        run_cost_estimate(run_date, full_refresh, fail_on_regression=True)
+    
     logger.info("Starting data transformation...")
-    transformation = DataTransformation()
-    transformation.run_full_pipeline()
+    with metrics.span("transformation"):
+        transformation = DataTransformation()
+        transformation.run_full_pipeline(run_date=run_date, full_refresh=full_refresh)
     logger.info("Data transformation completed")
 
 
-def run_full_pipeline():
-    """Run complete pipeline: ingestion + transformation."""
+def run_full_pipeline(
+    run_date: Optional[date] = None,
+    full_refresh: bool = False,
+    force: bool = False,
+    check_costs: bool = False
+):
+    """Run complete pipeline: ingestion + transformation.
+    
+    Args:
+        run_date: Date incremental models recompute up to (default: today)
+        full_refresh: Rebuild incremental models from scratch
+        force: Reload files even if they are unchanged since the last run
+        check_costs: Dry-run transformations before running them and stop
+            if bytes scanned regressed
+    """
     logger.info("=" * 70)
     logger.info("STARTING FULL DATA PIPELINE")
     logger.info("=" * 70)
     
     try:
-        # Step 1: Ingest data
-        run_ingestion()
-        
-        # Step 2: Transform data
-        run_transformation()
+        with metrics.span("pipeline"):
+            # Step 1: Ingest data
+            run_ingestion(force)
+            
+            # Step 2: Transform data
+            run_transformation(run_date, full_refresh, check_costs)
         
         logger.info("=" * 70)
         logger.info("PIPELINE COMPLETED SUCCESSFULLY")
@@ -56,9 +146,45 @@ def main():
     parser = argparse.ArgumentParser(description='BigQuery Data Pipeline')
     parser.add_argument(
         'action',
-        choices=['ingest', 'transform', 'full'],
+        choices=['ingest', 'transform', 'full', 'estimate'],
         help='Pipeline action to perform'
     )
+    parser.add_argument(
+        '--run-date',
+        type=date.fromisoformat,
+        help='Last partition incremental models recompute (YYYY-MM-DD, default: today)'
+    )
+    parser.add_argument(
+        '--full-refresh',
+        action='store_true',
+        help='Rebuild incremental models from scratch'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reload data files even if they are unchanged since the last run'
+    )
+    parser.add_argument(
+        '--check-costs',
+        action='store_true',
+        help='Dry-run transformations first and stop if bytes scanned regressed'
+    )
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='Store the estimated bytes as the new cost baseline (estimate only)'
+    )
+    parser.add_argument(
+        '--fail-on-regression',
+        action='store_true',
+        help='Exit with an error when bytes scanned regressed or a dry run failed (estimate only)'
+    )
+    
+    parser.add_argument(
+        '--metrics-dir',
+        default=Config.METRICS_DIR,
+        help='Write metrics.json and metrics.prom (OpenMetrics) for the run here'
+    )
     
     args = parser.parse_args()
     
@@ -66,12 +192,21 @@ def main():
     Config.validate()
     
     # Run requested action
-    if args.action == 'ingest':
-        run_ingestion()
-    elif args.action == 'transform':
-        run_transformation()
-    elif args.action == 'full':
-        run_full_pipeline()
+    try:
+        if args.action == 'ingest':
+            run_ingestion(args.force)
+        elif args.action == 'transform':
+            run_transformation(args.run_date, args.full_refresh, args.check_costs)
+        elif args.action == 'full':
+            run_full_pipeline(args.run_date, args.full_refresh, args.force, args.check_costs)
+        elif args.action == 'estimate':
+            run_cost_estimate(
+                args.run_date, args.full_refresh, args.update_baseline, args.fail_on_regression
+            )
+    finally:
+        logger.info("Stage timings:\n" + metrics.summary_table())
+        if args.metrics_dir:
+            metrics.export(args.metrics_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,287 @@
+"""Client-side cache of query results (in-memory LRU plus optional Parquet on disk)."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Set
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .config import Config
+from .dag import TABLE_REF_PATTERN
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Quoted literals and identifiers, which must survive normalization unchanged
+QUOTED_PATTERN = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""")
+
+# Backtick identifiers, (possibly dotted) names, parentheses and commas
+TOKEN_PATTERN = re.compile(r"`[^`]*`|[A-Za-z_][\w-]*(?:\.[A-Za-z_][\w-]*)*|[(),]")
+
+# Keywords that end a FROM clause at their nesting level
+CLAUSE_KEYWORDS = {
+    "select", "where", "group", "having", "qualify", "window", "order", "limit",
+    "union", "intersect", "except",
+}
+
+# Names defined in a WITH clause ("name AS (")
+CTE_PATTERN = re.compile(r"\b([A-Za-z_]\w*)\s+AS\s*\(", re.IGNORECASE)
+
+# Functions whose result changes between runs; such queries are never cached
+NONDETERMINISTIC_PATTERN = re.compile(
+    r"\b(CURRENT_(DATE|DATETIME|TIME|TIMESTAMP)|RAND|GENERATE_UUID|SESSION_USER|NOW)\b",
+    re.IGNORECASE
+)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize SQL text so formatting-only differences share a cache entry.
+    
+    Comments are dropped and whitespace is collapsed outside of quoted
+    literals and identifiers. A trailing semicolon is ignored.
+    
+    Args:
+        query: SQL query text
+    
+    Returns:
+        Normalized query text
+    """
+    parts = QUOTED_PATTERN.split(query)
+    for i in range(0, len(parts), 2):
+        text = re.sub(r"--[^\n]*", " ", parts[i])
+        parts[i] = re.sub(r"\s+", " ", text)
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def is_cacheable(query: str) -> bool:
+    """Check that a query has no non-deterministic functions.
+    
+    Args:
+        query: SQL query text
+    
+    Returns:
+        True if repeated runs over unchanged tables give the same result
+    """
+    unquoted = QUOTED_PATTERN.sub("", query)
+    return not NONDETERMINISTIC_PATTERN.search(unquoted)
+
+
+def table_references(query: str) -> Optional[Set[str]]:
+    """Tables a query reads, or None if they cannot all be named.
+    
+    Backtick references and unquoted ``dataset.table`` names in FROM and
+    JOIN clauses (including comma joins) are collected; CTE names are
+    skipped. A single unquoted name that
+    is not a CTE (a table in a default dataset, or a column as in
+    ``EXTRACT(YEAR FROM ts)``) cannot be resolved, so the query is reported
+    as unresolvable rather than cached without that input.
+    
+    Args:
+        query: SQL query text
+    
+    Returns:
+        Set of references (``dataset.table`` or ``project.dataset.table``),
+        or None
+    """
+    normalized = normalize_query(query)
+    # Blank out string literals but keep backtick identifiers in place
+    without_strings = QUOTED_PATTERN.sub(
+        lambda match: match.group(0) if match.group(0).startswith("`") else " ", normalized
+    )
+    ctes = {name.lower() for name in CTE_PATTERN.findall(without_strings)}
+    tokens = TOKEN_PATTERN.findall(without_strings)
+    
+    references = set(TABLE_REF_PATTERN.findall(normalized))
+    from_depths = set()  # Parenthesis depths with an open FROM clause
+    depth = 0
+    expecting_item = False
+    for i, token in enumerate(tokens):
+        if expecting_item:
+            expecting_item = False
+            is_call = i + 1 < len(tokens) and tokens[i + 1] == "("
+            if token.startswith("`"):
+                continue
+            if token not in "()," and not is_call:
+                if token.lower() in ctes:
+                    continue
+                if "." not in token:
+                    return None
+                references.add(token)
+                continue
+        
+        keyword = token.lower()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            from_depths.discard(depth)
+            depth -= 1
+        elif token == ",":
+            # Comma joins continue the FROM clause (also after a JOIN ... ON)
+            expecting_item = depth in from_depths
+        elif keyword in ("from", "join"):
+            from_depths.add(depth)
+            expecting_item = True
+        elif keyword in CLAUSE_KEYWORDS:
+            from_depths.discard(depth)
+    return references
+
+
+def make_cache_key(
+    query: str,
+    params: Optional[Dict[str, Any]] = None,
+    table_versions: Optional[Dict[str, Any]] = None
+) -> str:
+    """Build the cache key for a query.
+    
+    Args:
+        query: SQL query text
+        params: Parameters substituted into the query
+        table_versions: Last-modified time of each referenced table
+    
+    Returns:
+        Hex digest identifying the result
+    """
+    payload = json.dumps(
+        {
+            "query": normalize_query(query),
+            "params": params or {},
+            "tables": table_versions or {},
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class QueryResultCache:
+    """Two-tier cache of query results as Arrow tables.
+    
+    The memory tier is an LRU bounded by total Arrow buffer size. The
+    optional disk tier stores Parquet files in ``disk_dir``, bounded by total
+    file size, and is consulted on a memory miss. Entries expire after
+    ``ttl_seconds`` in both tiers.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None
+    ):
+        """Initialize the cache.
+        
+        Args:
+            max_bytes: Memory tier size limit (default from config)
+            ttl_seconds: Entry lifetime (default from config)
+            disk_dir: Directory for the disk tier (default from config;
+                the disk tier is disabled when neither is set)
+            disk_max_bytes: Disk tier size limit (default from config)
+        """
+        self.max_bytes = max_bytes or Config.QUERY_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or Config.QUERY_CACHE_TTL_SECONDS
+        disk_dir = disk_dir or Config.QUERY_CACHE_DIR
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes or Config.QUERY_CACHE_DISK_MAX_BYTES
+        
+        # key -> (table, expiry time)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[pa.Table]:
+        """Return a cached result, or None on a miss or expired entry.
+        
+        Args:
+            key: Cache key from ``make_cache_key``
+        
+        Returns:
+            Cached Arrow table, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                table, expires_at = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    return table
+                self._remove(key)
+        
+        table = self._get_from_disk(key)
+        if table is not None:
+            self._put_in_memory(key, table)
+        return table
+    
+    def put(self, key: str, table: pa.Table) -> None:
+        """Cache a query result.
+        
+        Args:
+            key: Cache key from ``make_cache_key``
+            table: Result as an Arrow table
+        """
+        self._put_in_memory(key, table)
+        self._put_on_disk(key, table)
+    
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.disk_dir and self.disk_dir.exists():
+            for path in self.disk_dir.glob("*.parquet"):
+                path.unlink()
+    
+    def _remove(self, key: str) -> None:
+        table, _ = self._entries.pop(key)
+        self._size -= table.nbytes
+    
+    def _put_in_memory(self, key: str, table: pa.Table) -> None:
+        if table.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (table, time.time() + self.ttl_seconds)
+            self._size += table.nbytes
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+    
+    def _get_from_disk(self, key: str) -> Optional[pa.Table]:
+        if not self.disk_dir:
+            return None
+        path = self.disk_dir / f"{key}.parquet"
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl_seconds:
+                path.unlink()
+                return None
+            table = pq.read_table(path)
+        except FileNotFoundError:
+            return None
+        # Bump access time so eviction removes least recently used files first
+        os.utime(path, (time.time(), path.stat().st_mtime))
+        return table
+    
+    def _put_on_disk(self, key: str, table: pa.Table) -> None:
+        if not self.disk_dir:
+            return
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        path = self.disk_dir / f"{key}.parquet"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        
+        files = sorted(
+            (f.stat().st_atime, f.stat().st_size, f) for f in self.disk_dir.glob("*.parquet")
+        )
+        total = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if total <= self.disk_max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
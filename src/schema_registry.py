@@ -0,0 +1,304 @@
+"""Local cache of table schemas so loads do not rely on autodetect."""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+from google.cloud import bigquery
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bytes read from the head of a file to infer its schema
+DEFAULT_SAMPLE_BYTES = 1024 * 1024
+
+# BigQuery types with a lossless Arrow equivalent, used to pin Parquet
+# conversion to the registered types. Temporal types are left to inference
+# because their text formats vary.
+BQ_TO_ARROW_TYPES = {
+    "INTEGER": pa.int64(),
+    "INT64": pa.int64(),
+    "FLOAT": pa.float64(),
+    "FLOAT64": pa.float64(),
+    "BOOLEAN": pa.bool_(),
+    "BOOL": pa.bool_(),
+    "STRING": pa.string(),
+}
+
+# Type names BigQuery accepts as aliases of each other
+CANONICAL_TYPES = {"INT64": "INTEGER", "FLOAT64": "FLOAT", "BOOL": "BOOLEAN"}
+
+# Numeric types from narrowest to widest; any type widens to STRING
+NUMERIC_WIDENING = ["INTEGER", "NUMERIC", "FLOAT"]
+
+
+def arrow_to_bq_type(arrow_type: pa.DataType) -> str:
+    """Map an Arrow type to the BigQuery type autodetect would choose.
+    
+    Args:
+        arrow_type: Arrow data type
+    
+    Returns:
+        BigQuery standard SQL type name
+    """
+    if pa.types.is_boolean(arrow_type):
+        return "BOOLEAN"
+    if pa.types.is_integer(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT"
+    if pa.types.is_decimal(arrow_type):
+        return "NUMERIC"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    if pa.types.is_time(arrow_type):
+        return "TIME"
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+        return "BYTES"
+    return "STRING"
+
+
+def _sample_arrow_schema(source_file: str, sample_bytes: int) -> pa.Schema:
+    """Arrow schema inferred from the head of a CSV or NDJSON file."""
+    if source_file.endswith('.csv'):
+        reader = pa_csv.open_csv(
+            source_file,
+            read_options=pa_csv.ReadOptions(block_size=sample_bytes)
+        )
+    elif source_file.endswith('.json'):
+        if not hasattr(pa_json, "open_json"):
+            raise ValueError("Schema inference for JSON needs pyarrow.json.open_json")
+        reader = pa_json.open_json(
+            source_file,
+            read_options=pa_json.ReadOptions(block_size=sample_bytes)
+        )
+    else:
+        raise ValueError(f"Unsupported file type for schema inference: {source_file}")
+    
+    nested = [field.name for field in reader.schema if pa.types.is_nested(field.type)]
+    if nested:
+        raise ValueError(f"Nested columns are not inferred locally: {nested}")
+    return reader.schema
+
+
+def infer_schema(
+    source_file: str,
+    sample_bytes: int = DEFAULT_SAMPLE_BYTES
+) -> List[bigquery.SchemaField]:
+    """Infer a BigQuery schema from the head of a CSV or NDJSON file.
+    
+    Args:
+        source_file: Path to CSV or JSON file
+        sample_bytes: Bytes read from the start of the file
+    
+    Returns:
+        Schema fields in file column order
+    """
+    return [
+        bigquery.SchemaField(field.name, arrow_to_bq_type(field.type), mode="NULLABLE")
+        for field in _sample_arrow_schema(source_file, sample_bytes)
+    ]
+
+
+def widen_type(registered_type: str, observed_type: str) -> Optional[str]:
+    """Narrowest type that holds values of both a registered and an observed type.
+    
+    Numbers widen along INTEGER -> NUMERIC -> FLOAT, and every type widens
+    to STRING. Other combinations (a TIMESTAMP column holding integers, for
+    instance) are not compatible.
+    
+    Args:
+        registered_type: Type stored in the registry
+        observed_type: Type inferred from the incoming file
+    
+    Returns:
+        The widened type (the registered one if it already fits), or None if
+        the types are incompatible
+    """
+    registered_type = CANONICAL_TYPES.get(registered_type, registered_type)
+    observed_type = CANONICAL_TYPES.get(observed_type, observed_type)
+    
+    if registered_type == observed_type or registered_type == "STRING":
+        return registered_type
+    if observed_type == "STRING":
+        return "STRING"
+    if registered_type in NUMERIC_WIDENING and observed_type in NUMERIC_WIDENING:
+        return max(registered_type, observed_type, key=NUMERIC_WIDENING.index)
+    return None
+
+
+def detect_drift(
+    registered: List[bigquery.SchemaField],
+    observed: List[bigquery.SchemaField]
+) -> Dict[str, Any]:
+    """Compare an observed schema against the registered one.
+    
+    Args:
+        registered: Schema stored in the registry
+        observed: Schema inferred from the incoming file
+    
+    Returns:
+        Dict with ``added`` and ``removed`` column names and ``changed``
+        mapping column name to (registered type, observed type)
+    """
+    registered_types = {field.name: field.field_type for field in registered}
+    observed_types = {field.name: field.field_type for field in observed}
+    
+    return {
+        "added": [name for name in observed_types if name not in registered_types],
+        "removed": [name for name in registered_types if name not in observed_types],
+        "changed": {
+            name: (registered_types[name], field_type)
+            for name, field_type in observed_types.items()
+            if name in registered_types and registered_types[name] != field_type
+        },
+    }
+
+
+class SchemaRegistry:
+    """Per-table schemas stored as JSON files under the config directory.
+    
+    A table's schema is registered from the first successful load (or a
+    sampled local inference) and reused for every later load, so the same
+    column always gets the same type.
+    """
+    
+    def __init__(self, schema_dir: Optional[str] = None):
+        """Initialize the registry.
+        
+        Args:
+            schema_dir: Directory for schema files (default from config)
+        """
+        self.schema_dir = Path(schema_dir or Config.SCHEMA_DIR)
+        self._cache: Dict[str, List[bigquery.SchemaField]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, table: str) -> Path:
+        return self.schema_dir / f"{table}.json"
+    
+    def get(self, table: str) -> Optional[List[bigquery.SchemaField]]:
+        """Return the registered schema of a table.
+        
+        Args:
+            table: Table (format: dataset.table)
+        
+        Returns:
+            Schema fields, or None if the table is not registered
+        """
+        with self._lock:
+            if table not in self._cache:
+                path = self._path(table)
+                if not path.exists():
+                    return None
+                with open(path, "r") as f:
+                    self._cache[table] = [
+                        bigquery.SchemaField.from_api_repr(field) for field in json.load(f)
+                    ]
+            return self._cache[table]
+    
+    def put(self, table: str, schema: List[bigquery.SchemaField]) -> None:
+        """Register a table schema, writing it atomically.
+        
+        Args:
+            table: Table (format: dataset.table)
+            schema: Schema fields
+        """
+        with self._lock:
+            self.schema_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.schema_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump([field.to_api_repr() for field in schema], f, indent=2)
+                os.replace(tmp_path, self._path(table))
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            self._cache[table] = list(schema)
+    
+    def resolve(self, table: str, source_file: str) -> Optional[List[bigquery.SchemaField]]:
+        """Pick the schema to load a file with.
+        
+        Column names and order come from the file, since CSV columns are
+        matched by position. Types come from the registry for known columns
+        and from sampled inference for new ones. A registered column whose
+        values no longer fit its type is widened (see ``widen_type``); the
+        widened schema is registered once the load succeeds. Drift is logged.
+        
+        Args:
+            table: Table (format: dataset.table)
+            source_file: Path to the file about to be loaded
+        
+        Returns:
+            Schema fields, or None to fall back to autodetect
+        
+        Raises:
+            ValueError: If a column's values are incompatible with its
+                registered type
+        """
+        try:
+            arrow_schema = _sample_arrow_schema(source_file, DEFAULT_SAMPLE_BYTES)
+        except Exception as e:
+            logger.warning(f"Could not infer schema of {source_file}: {e}")
+            return self.get(table)
+        observed = [
+            bigquery.SchemaField(field.name, arrow_to_bq_type(field.type), mode="NULLABLE")
+            for field in arrow_schema
+        ]
+        
+        registered = self.get(table)
+        if registered is None:
+            return observed
+        
+        drift = detect_drift(registered, observed)
+        if drift["added"]:
+            logger.warning(f"Schema drift in {table}: new columns {drift['added']}")
+        if drift["removed"]:
+            logger.warning(f"Schema drift in {table}: missing columns {drift['removed']}")
+        
+        # Columns that are empty in the sample say nothing about their type
+        untyped = {field.name for field in arrow_schema if pa.types.is_null(field.type)}
+        registered_fields = {field.name: field for field in registered}
+        for name, (registered_type, observed_type) in drift["changed"].items():
+            if name in untyped:
+                continue
+            widened = widen_type(registered_type, observed_type)
+            if widened is None:
+                raise ValueError(
+                    f"Schema drift in {table}: column {name} is registered as "
+                    f"{registered_type} but {source_file} has {observed_type} values"
+                )
+            if widened != CANONICAL_TYPES.get(registered_type, registered_type):
+                logger.warning(
+                    f"Schema drift in {table}: column {name} looks like {observed_type}, "
+                    f"widening registered type {registered_type} to {widened}"
+                )
+                registered_fields[name] = bigquery.SchemaField.from_api_repr(
+                    {**registered_fields[name].to_api_repr(), "type": widened}
+                )
+        
+        return [registered_fields.get(field.name, field) for field in observed]
+    
+    @staticmethod
+    def to_arrow_schema(schema: List[bigquery.SchemaField]) -> pa.Schema:
+        """Arrow schema pinning the columns whose types convert losslessly.
+        
+        Args:
+            schema: Schema fields
+        
+        Returns:
+            Arrow schema with the subset of columns that have a fixed mapping
+        """
+        return pa.schema([
+            (field.name, BQ_TO_ARROW_TYPES[field.field_type])
+            for field in schema
+            if field.field_type in BQ_TO_ARROW_TYPES
+        ])
@@ -0,0 +1,257 @@
+"""SQL file templates: parsed once, cached by mtime, rendered with typed query parameters."""
+
+import datetime
+import decimal
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Optional, List, Dict, Any, FrozenSet, Tuple, Union
+from google.cloud import bigquery
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ${name} placeholders
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+# Comments, quoted literals and backtick identifiers, whichever starts first;
+# placeholders inside them are substituted as text, never as values
+NON_VALUE_PATTERN = re.compile(
+    r"""(--[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""", re.DOTALL
+)
+COMMENT_PREFIXES = ("--", "/*")
+
+
+def parameter_type(value: Any) -> Optional[str]:
+    """BigQuery parameter type for a Python value, or None if it is pasted as text.
+    
+    Strings are not parameterized: they may be SQL fragments, as in
+    templates written before typed parameters existed.
+    """
+    if isinstance(value, bool):
+        return "BOOL"
+    if isinstance(value, int):
+        return "INT64"
+    if isinstance(value, float):
+        return "FLOAT64"
+    if isinstance(value, decimal.Decimal):
+        return "NUMERIC"
+    if isinstance(value, datetime.datetime):
+        return "TIMESTAMP" if value.tzinfo else "DATETIME"
+    if isinstance(value, datetime.date):
+        return "DATE"
+    return None
+
+
+def sql_literal(value: Any) -> str:
+    """SQL text for a value (strings are returned as-is).
+    
+    Args:
+        value: Parameter value
+    
+    Returns:
+        Literal such as ``DATE '2025-03-01'``, ``TRUE`` or ``42``
+    """
+    if value is None:
+        return "NULL"
+    value_type = parameter_type(value)
+    if value_type == "BOOL":
+        return "TRUE" if value else "FALSE"
+    if value_type in ("DATE", "DATETIME", "TIMESTAMP"):
+        return f"{value_type} '{value.isoformat()}'"
+    return str(value)
+
+
+def inline_parameters(
+    query: str,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]]
+) -> str:
+    """Replace ``@name`` references with the parameters' SQL literals.
+    
+    For engines without BigQuery named parameters (the local backend).
+    References inside quoted literals, backticks and comments are not
+    parameters and are left alone.
+    
+    Args:
+        query: SQL text with ``@name`` references
+        query_parameters: Parameters to inline
+    
+    Returns:
+        SQL text without the parameter references
+    """
+    parts = NON_VALUE_PATTERN.split(query)
+    for parameter in query_parameters or []:
+        literal = sql_literal(parameter.value)
+        reference = re.compile(rf"@{parameter.name}\b")
+        parts[::2] = [reference.sub(lambda _: literal, part) for part in parts[::2]]
+    return "".join(parts)
+
+
+class SQLTemplate:
+    """A SQL text split once into literal text and ``${name}`` placeholders.
+    
+    A placeholder standing on its own in the SQL is a value: ``compile``
+    turns it into a ``@name`` query parameter when its value is typed (date,
+    datetime, number, bool), so the query text stays the same from run to
+    run. Placeholders inside backticks, quotes or comments (table
+    references, for instance) are always substituted as text. Those in
+    comments are optional: without a value they are left as they are.
+    """
+    
+    def __init__(self, text: str, source: str = "<string>"):
+        """Parse a template.
+        
+        Args:
+            text: SQL text
+            source: Where the text came from, for error messages
+        """
+        self.text = text
+        self.source = source
+        # Literal strings and (name, is_value, required) placeholder tuples, in order
+        self.segments: List[Union[str, Tuple[str, bool, bool]]] = []
+        
+        for i, part in enumerate(NON_VALUE_PATTERN.split(text)):
+            in_comment = i % 2 == 1 and part.startswith(COMMENT_PREFIXES)
+            self._add(part, is_value=i % 2 == 0, required=not in_comment)
+        
+        # Placeholders that need a value (not only in comments)
+        self.placeholders: FrozenSet[str] = frozenset(
+            segment[0] for segment in self.segments if isinstance(segment, tuple) and segment[2]
+        )
+    
+    def _add(self, piece: str, is_value: bool, required: bool) -> None:
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(piece):
+            self.segments.append(piece[pos:match.start()])
+            self.segments.append((match.group(1), is_value, required))
+            pos = match.end()
+        self.segments.append(piece[pos:])
+    
+    @staticmethod
+    def _text(name: str, params: Dict[str, Any]) -> str:
+        """A placeholder substituted as text, kept as ``${name}`` without a value."""
+        return str(params[name]) if name in params else f"${{{name}}}"
+    
+    def _check(self, params: Dict[str, Any]) -> None:
+        missing = sorted(self.placeholders - params.keys())
+        if missing:
+            raise ValueError(f"Unresolved placeholders in {self.source}: {', '.join(missing)}")
+    
+    def render(self, params: Optional[Dict[str, Any]] = None) -> str:
+        """Substitute every placeholder as text.
+        
+        Typed values become SQL literals (``DATE '2025-03-01'``), strings are
+        pasted as they are.
+        
+        Args:
+            params: Placeholder values
+        
+        Returns:
+            SQL text
+        
+        Raises:
+            ValueError: If a placeholder has no value
+        """
+        params = params or {}
+        self._check(params)
+        return "".join(
+            segment if isinstance(segment, str)
+            else sql_literal(params[segment[0]]) if segment[1] else self._text(segment[0], params)
+            for segment in self.segments
+        )
+    
+    def compile(
+        self,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, List[bigquery.ScalarQueryParameter]]:
+        """Substitute text placeholders and turn typed values into query parameters.
+        
+        Args:
+            params: Placeholder values
+        
+        Returns:
+            Tuple of the SQL text and its query parameters
+        
+        Raises:
+            ValueError: If a placeholder has no value
+        """
+        params = params or {}
+        self._check(params)
+        
+        parts = []
+        query_parameters = {}
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            name, is_value, _ = segment
+            if not is_value:
+                parts.append(self._text(name, params))
+                continue
+            value = params[name]
+            value_type = parameter_type(value)
+            if value_type is None:
+                parts.append(sql_literal(value))
+            else:
+                parts.append(f"@{name}")
+                query_parameters[name] = bigquery.ScalarQueryParameter(name, value_type, value)
+        
+        return "".join(parts), list(query_parameters.values())
+
+
+class TemplateCache:
+    """SQL file templates, read and parsed once and reloaded when the file changes.
+    
+    Safe to share between threads (the DAG runs transformations in parallel).
+    """
+    
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._templates: Dict[Path, Tuple[Tuple[int, int], SQLTemplate]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, sql_file: str) -> SQLTemplate:
+        """Template for a SQL file, reparsed only if its mtime or size changed.
+        
+        Args:
+            sql_file: Path to SQL file
+        
+        Returns:
+            Parsed template
+        """
+        path = Path(sql_file)
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        
+        with self._lock:
+            cached = self._templates.get(path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        
+        template = SQLTemplate(path.read_text(), str(path))
+        with self._lock:
+            self._templates[path] = (version, template)
+        return template
+    
+    def clear(self) -> None:
+        """Drop every cached template."""
+        with self._lock:
+            self._templates.clear()
+
+
+def default_params(params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Placeholder values every template can use, overridden by ``params``.
+    
+    Args:
+        params: Caller's placeholder values
+    
+    Returns:
+        Values including ``GCP_PROJECT_ID`` from config
+    """
+    return {"GCP_PROJECT_ID": Config.GCP_PROJECT_ID, **(params or {})}
+
+
+# Template cache shared by the pipeline modules
+template_cache = TemplateCache()
@@ -1,10 +1,18 @@
 """Data transformation module using SQL and Python."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Tuple, Dict, Any
+from google.cloud import bigquery
 from .bigquery_client import BigQueryClient
 from .config import Config
+from .cost_baseline import bytes_to_cost
+from .dag import TransformationDAG, parse_model_config
+from .local_backend import LocalClient
+from .metrics import metrics
+from .templates import template_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,20 +27,30 @@ class DataTransformation:
         Args:
             credentials_path: Optional path to GCP credentials
         """
-        self.bq_client = BigQueryClient(credentials_path)
+        if Config.PIPELINE_BACKEND == "local":
+            self.bq_client = LocalClient()
+        else:
+            self.bq_client = BigQueryClient(credentials_path)
     
     def run_transformation(
         self,
         sql_file: str,
         destination_table: str,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
     ) -> None:
         """Run a transformation from a SQL file.
         
+        Files declaring ``-- materialized: incremental`` only recompute the
+        partitions in their lookback window (see ``_run_incremental``).
+        
         Args:
             sql_file: Path to SQL transformation file
             destination_table: Destination table (format: dataset.table)
             params: Optional parameters for the query
+            run_date: Date the lookback window ends on (default: today)
+            full_refresh: Rebuild incremental models from scratch
         """
         sql_path = Config.SQL_DIR / sql_file
         
@@ -42,66 +60,316 @@ class DataTransformation:
         logger.info(f"Running transformation: {sql_file}")
         logger.info(f"Destination: {destination_table}")
         
-        self.bq_client.execute_query_from_file(
-            sql_file=str(sql_path),
-            destination_table=destination_table,
-            params=params
-        )
+        params = {"GCP_PROJECT_ID": Config.GCP_PROJECT_ID, **(params or {})}
+        model_config = parse_model_config(template_cache.get(str(sql_path)).text)
         
-        # Get result table info
-        dataset, table = destination_table.split('.')
-        result_table = self.bq_client.get_table_info(dataset, table)
+        with metrics.span(f"transform:{sql_file}", table=destination_table) as span:
+            if model_config.get("materialized") == "incremental":
+                job = self._run_incremental(
+                    sql_path, destination_table, model_config, params,
+                    run_date or date.today(), full_refresh
+                )
+            else:
+                job = self.bq_client.execute_query_from_file(
+                    sql_file=str(sql_path),
+                    destination_table=destination_table,
+                    params=params
+                )
+            span.record_job(job)
+            
+            # Get result table info
+            dataset, table = destination_table.split('.')
+            result_table = self.bq_client.get_table_info(dataset, table)
+            span.set(rows_out=result_table.num_rows)
         logger.info(f"Transformation complete: {result_table.num_rows} rows in output")
     
-    def run_staging_transformations(self) -> None:
-        """Run all staging transformations (raw -> staging)."""
-        logger.info("Running staging transformations...")
+    def _run_incremental(
+        self,
+        sql_path: Path,
+        destination_table: str,
+        model_config: Dict[str, str],
+        params: Dict[str, Any],
+        run_date: date,
+        full_refresh: bool
+    ) -> bigquery.QueryJob:
+        """Rebuild only the partitions inside an incremental model's lookback window.
+        
+        The SQL can use ``${PARTITION_START}`` and ``${PARTITION_END}`` (DATE
+        query parameters) to prune its source tables, so the query text is
+        the same on every run. On the first run, or with
+        ``full_refresh``, the whole table is built and partitioned instead.
+        An existing table that is not day-partitioned by the model's
+        ``partition_by`` column is dropped and rebuilt this way, since
+        BigQuery will not change a table's partitioning on a truncating
+        write.
+        
+        Args:
+            sql_path: Path to SQL transformation file
+            destination_table: Destination table (format: dataset.table)
+            model_config: Settings parsed from the SQL header
+            params: Parameters for the query
+            run_date: Last partition to recompute
+            full_refresh: Rebuild the whole table
+            
+        Returns:
+            The query or MERGE job
+        """
+        partition_column = model_config["partition_by"]
+        dataset, table = destination_table.split('.')
+        if (self.bq_client.table_exists(dataset, table)
+                and not self.bq_client.is_partitioned_by(dataset, table, partition_column)):
+            logger.warning(
+                f"{destination_table} is not partitioned by {partition_column}; "
+                f"dropping it for a full partitioned build"
+            )
+            self.bq_client.delete_table(dataset, table)
+        
+        window = self._partition_window(destination_table, model_config, run_date, full_refresh)
+        params = {**params, **self._partition_params(window)}
+        query, query_parameters = self.bq_client.compile_sql_file(str(sql_path), params)
+        
+        if window is None:
+            logger.info(f"Full build of incremental model {destination_table}")
+            return self.bq_client.execute_query(
+                query,
+                destination_table,
+                time_partitioning_field=partition_column,
+                query_parameters=query_parameters
+            )
+        
+        start_date, end_date = window
+        logger.info(f"Recomputing partitions {start_date} to {end_date}")
+        return self.bq_client.replace_partitions(
+            query,
+            destination_table,
+            partition_column,
+            start_date,
+            end_date,
+            query_parameters=query_parameters
+        )
+    
+    def _partition_window(
+        self,
+        destination_table: str,
+        model_config: Dict[str, str],
+        run_date: date,
+        full_refresh: bool
+    ) -> Optional[Tuple[date, date]]:
+        """Partition range an incremental run recomputes, or None for a full build."""
+        dataset, table = destination_table.split('.')
+        if full_refresh or not self.bq_client.table_exists(dataset, table):
+            return None
         
-        staging_sqls = list(Config.SQL_DIR.glob("staging_*.sql"))
+        lookback_days = int(model_config.get("lookback_days", Config.INCREMENTAL_LOOKBACK_DAYS))
+        return run_date - timedelta(days=lookback_days), run_date
+    
+    @staticmethod
+    def _partition_params(window: Optional[Tuple[date, date]]) -> Dict[str, date]:
+        """``PARTITION_START``/``PARTITION_END`` dates for a partition window."""
+        start_date, end_date = window or (date.min, date.max)
+        return {"PARTITION_START": start_date, "PARTITION_END": end_date}
+    
+    def render_transformation(
+        self,
+        sql_file: str,
+        destination_table: str,
+        params: Optional[Dict[str, Any]] = None,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
+    ) -> str:
+        """Render a SQL file exactly as ``run_transformation`` would run it.
         
-        for sql_file in staging_sqls:
-            # Extract table name from filename (e.g., staging_orders.sql -> orders)
-            table_name = sql_file.stem.replace("staging_", "")
-            destination = f"{Config.BQ_DATASET_STAGING}.{table_name}"
+        Args:
+            sql_file: Path to SQL transformation file (relative to SQL_DIR)
+            destination_table: Destination table (format: dataset.table)
+            params: Optional parameters for the query
+            run_date: Date the lookback window ends on (default: today)
+            full_refresh: Render incremental models for a full build
+            
+        Returns:
+            Rendered SQL text
+        """
+        sql_path = Config.SQL_DIR / sql_file
+        params = {"GCP_PROJECT_ID": Config.GCP_PROJECT_ID, **(params or {})}
+        model_config = parse_model_config(template_cache.get(str(sql_path)).text)
+        
+        if model_config.get("materialized") == "incremental":
+            window = self._partition_window(
+                destination_table, model_config, run_date or date.today(), full_refresh
+            )
+            params.update(self._partition_params(window))
+        
+        return self.bq_client.render_sql_file(str(sql_path), params)
+    
+    def estimate_costs(
+        self,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
+    ) -> Dict[str, Optional[int]]:
+        """Dry-run every transformation and estimate the bytes each would scan.
+        
+        Queries are rendered with the same parameters a real run would use,
+        so incremental models are estimated for their lookback window. A
+        model whose dry run fails (e.g. an upstream table that does not exist
+        yet) is logged and reported as None.
+        
+        Args:
+            run_date: Date incremental models recompute up to (default: today)
+            full_refresh: Estimate full builds of incremental models
             
+        Returns:
+            Estimated bytes processed per SQL file, in dependency order
+        """
+        dag = TransformationDAG.from_sql_dir()
+        estimates = {}
+        
+        for name in dag.topological_order():
+            node = dag.nodes[name]
             try:
-                self.run_transformation(
-                    sql_file=sql_file.name,
-                    destination_table=destination
+                query = self.render_transformation(
+                    name, node.destination, run_date=run_date, full_refresh=full_refresh
                 )
+                estimates[name] = self.bq_client.dry_run_query(query)
             except Exception as e:
-                logger.error(f"Error in staging transformation {sql_file.name}: {e}")
-                raise
+                logger.warning(f"Dry run of {name} failed: {e}")
+                estimates[name] = None
+                continue
+            
+            logger.info(
+                f"{name}: {estimates[name]} bytes "
+                f"(~${bytes_to_cost(estimates[name]):.4f})"
+            )
+        
+        total = sum(bytes_processed or 0 for bytes_processed in estimates.values())
+        logger.info(f"Total estimated: {total} bytes (~${bytes_to_cost(total):.4f})")
+        return estimates
     
-    def run_production_transformations(self) -> None:
-        """Run all production transformations (staging -> production)."""
+    def run_staging_transformations(
+        self,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
+    ) -> None:
+        """Run all staging transformations (raw -> staging).
+        
+        Args:
+            run_date: Date incremental models recompute up to (default: today)
+            full_refresh: Rebuild incremental models from scratch
+        """
+        logger.info("Running staging transformations...")
+        
+        self._run_tier("staging_", Config.BQ_DATASET_STAGING, "staging", run_date, full_refresh)
+    
+    def run_production_transformations(
+        self,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
+    ) -> None:
+        """Run all production transformations (staging -> production).
+        
+        Args:
+            run_date: Date incremental models recompute up to (default: today)
+            full_refresh: Rebuild incremental models from scratch
+        """
         logger.info("Running production transformations...")
         
-        prod_sqls = list(Config.SQL_DIR.glob("prod_*.sql"))
+        self._run_tier("prod_", Config.BQ_DATASET_PROD, "production", run_date, full_refresh)
+    
+    def _run_tier(
+        self,
+        prefix: str,
+        dataset: str,
+        label: str,
+        run_date: Optional[date],
+        full_refresh: bool,
+        max_workers: Optional[int] = None
+    ) -> None:
+        """Run every SQL file of a tier concurrently and wait for all of them.
+        
+        Transformations within a tier do not depend on each other, so they
+        are started together instead of one after another. Each file goes
+        through ``run_transformation``, so incremental models get their
+        partition window and MERGE like in a DAG run.
         
-        for sql_file in prod_sqls:
-            # Extract table name from filename
-            table_name = sql_file.stem.replace("prod_", "")
-            destination = f"{Config.BQ_DATASET_PROD}.{table_name}"
+        Args:
+            prefix: SQL filename prefix (e.g., staging_)
+            dataset: Destination dataset for the tier
+            label: Tier name used in log messages
+            run_date: Date incremental models recompute up to (default: today)
+            full_refresh: Rebuild incremental models from scratch
+            max_workers: Maximum concurrent transformations (default from config)
+        """
+        sql_files = sorted(Config.SQL_DIR.glob(f"{prefix}*.sql"))
+        if not sql_files:
+            return
+        max_workers = max_workers or Config.TRANSFORM_MAX_WORKERS
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sql_files))) as executor:
+            futures = {}
+            for sql_file in sql_files:
+                # Extract table name from filename (e.g., staging_orders.sql -> orders)
+                table_name = sql_file.stem.replace(prefix, "", 1)
+                futures[executor.submit(
+                    self.run_transformation,
+                    sql_file.name,
+                    f"{dataset}.{table_name}",
+                    run_date=run_date,
+                    full_refresh=full_refresh
+                )] = sql_file
             
-            try:
-                self.run_transformation(
-                    sql_file=sql_file.name,
-                    destination_table=destination
-                )
-            except Exception as e:
-                logger.error(f"Error in production transformation {sql_file.name}: {e}")
-                raise
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error in {label} transformation {futures[future].name}: {e}")
+                    # Files that have not started yet are skipped
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+    
+    def run_dag(
+        self,
+        max_workers: Optional[int] = None,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
+    ) -> None:
+        """Run staging and production transformations as a dependency graph.
+        
+        Each SQL file starts as soon as the tables it reads have been built,
+        rather than waiting for the whole staging tier to finish.
+        
+        Args:
+            max_workers: Maximum concurrent transformations (default from config)
+            run_date: Date incremental models recompute up to (default: today)
+            full_refresh: Rebuild incremental models from scratch
+        """
+        dag = TransformationDAG.from_sql_dir()
+        logger.info(f"Running {len(dag.nodes)} transformations as a DAG")
+        
+        dag.run(
+            lambda node: self.run_transformation(
+                node.name, node.destination,
+                run_date=run_date, full_refresh=full_refresh
+            ),
+            max_workers=max_workers
+        )
     
-    def run_full_pipeline(self) -> None:
-        """Run the complete transformation pipeline (staging -> production)."""
+    def run_full_pipeline(
+        self,
+        run_date: Optional[date] = None,
+        full_refresh: bool = False
+    ) -> None:
+        """Run the complete transformation pipeline (staging -> production).
+        
+        Args:
+            run_date: Date incremental models recompute up to (default: today)
+            full_refresh: Rebuild incremental models from scratch
+        """
         logger.info("=" * 60)
         logger.info("Starting full transformation pipeline")
         logger.info("=" * 60)
         
         try:
-            self.run_staging_transformations()
-            self.run_production_transformations()
+            self.run_dag(run_date=run_date, full_refresh=full_refresh)
             
             logger.info("=" * 60)
             logger.info("Pipeline completed successfully!")
@@ -0,0 +1,113 @@
+"""Unit tests for the batch level 1 reference solution."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from exercises.batch_level_1.reference_solution import (
+    DISTINCT_MODES,
+    GroupedHyperLogLog,
+    backfill_daily_country_signup_reports,
+    build_daily_country_signup_report,
+    build_daily_country_signup_report_chunked,
+)
+
+
+def _write_numeric_id_files(tmp_path):
+    """Users and payments with numeric user ids, some payments without one."""
+    users = tmp_path / "users.csv"
+    users.write_text("user_id,country,signup_date\n1,SE,2025-01-10\n2,ES,2025-02-05\n3,SE,2025-01-20\n")
+    payments = tmp_path / "payments.csv"
+    payments.write_text(
+        "user_id,amount,ts\n"
+        "1,100,2025-03-01T10:00:00Z\n"
+        "2,50,2025-03-01T11:00:00Z\n"
+        "1,75,2025-03-02T10:00:00Z\n"
+        ",20,2025-03-02T11:00:00Z\n"
+        "3,10,2025-03-02T12:00:00Z\n"
+        "9,30,2025-03-02T13:00:00Z\n"
+        "9,5,2025-03-03T09:00:00Z\n"
+        "2,25,2025-03-03T10:00:00Z\n"
+    )
+    return str(users), str(payments)
+
+
+class TestGroupedHyperLogLog:
+    """Test GroupedHyperLogLog class."""
+    
+    def test_ranks_are_exact_at_low_precision(self):
+        """Test suffixes wider than a float64 mantissa get their exact leading-zero rank."""
+        precision = 4
+        suffix_bits = 64 - precision
+        # One value per register: suffixes of k ones, which float64 rounds
+        # up to 2^k once k > 53, and random suffixes
+        rng = np.random.default_rng(3)
+        suffixes = [2 ** k - 1 for k in range(50, 61)]
+        suffixes += rng.integers(1, 2 ** suffix_bits, size=5).tolist()
+        hashes = np.array(
+            [(index << suffix_bits) | suffix for index, suffix in enumerate(suffixes)], dtype=np.uint64
+        )
+        
+        sketch = GroupedHyperLogLog(precision)
+        sketch.add(np.zeros(len(hashes), dtype=np.int64), hashes)
+        
+        expected = [suffix_bits - suffix.bit_length() + 1 for suffix in suffixes]
+        assert sketch.registers[0].tolist() == expected
+
+
+class TestBuildDailyCountrySignupReportChunked:
+    """Test build_daily_country_signup_report_chunked function."""
+    
+    def test_numeric_ids_count_once_across_chunks(self, tmp_path):
+        """Test a chunk with a missing user_id does not turn 1 into 1.0 in either mode."""
+        users_path, payments_path = _write_numeric_id_files(tmp_path)
+        expected = build_daily_country_signup_report('2025-03-10', users_path, payments_path)
+        expected = expected.sort_values(['country', 'signup_month']).reset_index(drop=True)
+        
+        for distinct in DISTINCT_MODES:
+            report = build_daily_country_signup_report_chunked(
+                '2025-03-10', users_path, payments_path, chunksize=3, distinct=distinct
+            )
+            assert report.to_dict('records') == expected.to_dict('records'), distinct
+
+
+class TestBackfillDailyCountrySignupReports:
+    """Test backfill_daily_country_signup_reports function."""
+    
+    def test_streamed_days_match_daily_reports_on_local_dates(self, tmp_path):
+        """Test each day matches that day's report, dated in the payments' own offset."""
+        users_path, _ = _write_numeric_id_files(tmp_path)
+        rows = [
+            "1,100,2025-03-01T10:00:00-05:00",
+            "2,50,2025-03-01T23:30:00-05:00",
+            "1,75,2025-03-02T10:00:00-05:00",
+            ",20,2025-03-02T11:00:00-05:00",
+            "9,30,2025-03-02T23:45:00-05:00",
+            "2,25,2025-03-03T10:00:00-05:00",
+        ]
+        payments = tmp_path / "payments.csv"
+        payments.write_text("user_id,amount,ts\n" + "\n".join(rows) + "\n")
+        
+        written = backfill_daily_country_signup_reports(
+            '2025-03-01', '2025-03-04', users_path, str(payments), str(tmp_path / "out"), chunksize=2
+        )
+        
+        assert list(written) == ['2025-03-01', '2025-03-02', '2025-03-03', '2025-03-04']
+        # 23:30 at -05:00 is 04:30 UTC the next day, but belongs to the source's date
+        for day, day_rows in [('2025-03-01', rows[:2]), ('2025-03-02', rows[2:5]), ('2025-03-03', rows[5:])]:
+            day_payments = tmp_path / f"payments_{day}.csv"
+            day_payments.write_text("user_id,amount,ts\n" + "\n".join(day_rows) + "\n")
+            expected = build_daily_country_signup_report(day, users_path, str(day_payments))
+            expected = expected.sort_values(['country', 'signup_month']).reset_index(drop=True)
+            report = pd.read_csv(written[day], dtype={'signup_month': str})
+            assert report.to_dict('records') == expected.to_dict('records'), day
+        assert pd.read_csv(written['2025-03-04']).empty
+    
+    def test_reversed_range_raises(self, tmp_path):
+        """Test a start date after the end date is rejected before any file is written."""
+        users_path, payments_path = _write_numeric_id_files(tmp_path)
+        
+        with pytest.raises(ValueError, match="after end_date"):
+            backfill_daily_country_signup_reports(
+                '2025-03-03', '2025-03-01', users_path, payments_path, str(tmp_path / "out")
+            )
+        assert not (tmp_path / "out").exists()
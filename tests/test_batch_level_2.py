@@ -0,0 +1,109 @@
+"""Unit tests for the batch level 2 reference solution."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from exercises.batch_level_2.reference_solution import (
+    aggregate_new_events,
+    build_user_daily,
+    calculate_active_minutes,
+    compute_user_day_metrics,
+    load_events,
+)
+
+
+def _per_group_metrics(events):
+    """Per-(user_id, dt) metrics computed with the original groupby.apply loop."""
+    def aggregate_user_day(group):
+        return pd.Series({
+            'pageviews': (group['event_type'] == 'page_view').sum(),
+            'active_minutes': calculate_active_minutes(group['ts'])
+        })
+    
+    return events.groupby(['user_id', 'dt']).apply(aggregate_user_day).reset_index()
+
+
+class TestComputeUserDayMetrics:
+    """Test compute_user_day_metrics function."""
+    
+    def test_matches_per_group_loop_on_sub_second_gaps(self):
+        """Test half-cent minute totals round like calculate_active_minutes."""
+        rng = np.random.default_rng(7)
+        start = pd.Timestamp('2025-03-01 23:50:00')
+        offsets = np.cumsum(rng.integers(1, 400_000, size=2000))
+        events = pd.DataFrame({
+            'user_id': rng.choice(['u1', 'u2', 'u3', 'u4'], size=2000),
+            'ts': start + pd.to_timedelta(offsets, unit='ms'),
+            'event_type': rng.choice(['page_view', 'click'], size=2000),
+        })
+        # A lone 300 ms gap: 0.005 minutes, which round() takes to 0.01
+        events = pd.concat([events, pd.DataFrame({
+            'user_id': ['u5', 'u5'],
+            'ts': [start, start + pd.Timedelta(milliseconds=300)],
+            'event_type': ['page_view', 'page_view'],
+        })], ignore_index=True)
+        events['dt'] = events['ts'].dt.date
+        
+        expected = _per_group_metrics(events)
+        result = compute_user_day_metrics(events)
+        result = result.sort_values(['user_id', 'dt']).reset_index(drop=True)
+        
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        assert result['pageviews'].dtype == np.float64
+        assert result.loc[result['user_id'] == 'u5', 'active_minutes'].item() == 0.01
+
+
+def _write_events(path, timestamps):
+    """Write page views for user U1 at the given ts strings."""
+    rows = [f"U1,{ts},page_view,{path.stem}_{i}" for i, ts in enumerate(timestamps)]
+    path.write_text("user_id,ts,event_type,event_id\n" + "\n".join(rows) + "\n")
+    return str(path)
+
+
+class TestLoadEvents:
+    """Test load_events function."""
+    
+    def test_timestamps_parse_like_read_csv(self, tmp_path):
+        """Test naive and offset timestamps keep pd.to_datetime's meaning and local dates."""
+        naive = _write_events(tmp_path / "naive.csv", ["2025-03-01 10:00:00", "2025-03-01 10:03:00"])
+        offset = _write_events(tmp_path / "offset.csv", ["2025-03-01T23:30:00-05:00", "2025-03-01T23:32:00-05:00"])
+        offset_next = _write_events(tmp_path / "offset_next.csv", ["2025-03-02T08:00:00-05:00"])
+        
+        for files in ([naive], [offset, offset_next]):
+            expected = pd.to_datetime(pd.concat([pd.read_csv(path) for path in files], ignore_index=True)["ts"])
+            pd.testing.assert_series_equal(load_events(files)["ts"], expected, check_dtype=False)
+        
+        # 23:30 at -05:00 is 04:30 UTC on 2025-03-02, but belongs to the source's 2025-03-01
+        result = aggregate_new_events("2025-03-02", [offset, offset_next])
+        assert result["dt"].astype(str).tolist() == ["2025-03-01", "2025-03-02"]
+        assert result["active_minutes"].tolist() == [2.0, 0.0]
+    
+    def test_mixed_naive_and_offset_files_raise_like_read_csv(self, tmp_path):
+        """Test naive and offset files together fail as pd.to_datetime does."""
+        naive = _write_events(tmp_path / "naive.csv", ["2025-03-01 10:00:00"])
+        offset = _write_events(tmp_path / "offset.csv", ["2025-03-01T23:30:00-05:00"])
+        
+        with pytest.raises(ValueError):
+            load_events([naive, offset])
+
+
+class TestBuildUserDaily:
+    """Test build_user_daily function."""
+    
+    def test_numeric_user_ids_replace_existing_rows(self, tmp_path):
+        """Test numeric ids in the existing file match the new events' ids."""
+        existing = tmp_path / "user_daily.csv"
+        existing.write_text("user_id,dt,pageviews,active_minutes\n1,2025-03-01,1.0,0.0\n2,2025-02-28,4.0,6.0\n")
+        events = tmp_path / "events.csv"
+        events.write_text(
+            "user_id,ts,event_type,event_id\n"
+            "1,2025-03-01 10:00:00,page_view,evt_1\n"
+            "1,2025-03-01 10:03:00,page_view,evt_2\n"
+        )
+        
+        result = build_user_daily('2025-03-01', [str(events)], str(existing), update_window_days=0)
+        
+        assert result[['user_id', 'pageviews', 'active_minutes']].values.tolist() == [
+            ['2', 4.0, 6.0],
+            ['1', 2.0, 3.0],
+        ]
@@ -0,0 +1,72 @@
+"""Unit tests for the benchmark generators and harness."""
+
+import os
+import pandas as pd
+from src.config import Config
+from benchmarks import generators, run
+from benchmarks.run import run_benchmarks
+
+EXERCISES = Config.PROJECT_ROOT / "exercises"
+
+
+def _header(path):
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+class TestGenerators:
+    """Test synthetic data generators."""
+    
+    def test_schemas_match_sample_files(self, tmp_path, monkeypatch):
+        """Test generated files have the columns of the files they imitate."""
+        monkeypatch.setattr(generators, "CHUNK_ROWS", 40)
+        
+        sample = generators.generate_sample_data(tmp_path / "sample.csv", 100)
+        users = generators.generate_users(tmp_path / "users.csv", 10)
+        payments = generators.generate_payments(tmp_path / "payments.csv", 100, users=10)
+        events = generators.generate_events(tmp_path / "events", 100, days=3, users=10)
+        sensors = generators.generate_sensor_stream(tmp_path / "sensors.csv", 100)
+        
+        assert _header(sample) == _header(Config.DATA_DIR / "sample_data.csv")
+        assert _header(users) == _header(EXERCISES / "batch_level_1" / "users.csv")
+        assert _header(payments) == _header(EXERCISES / "batch_level_1" / "payments.csv")
+        assert _header(events[0]) == _header(EXERCISES / "batch_level_2" / "events_2025-03-01.csv")
+        assert _header(sensors) == _header(
+            EXERCISES / "streaming_level_1" / "sensor_stream_sample.csv"
+        )
+        assert len(pd.read_csv(sample)) == 100
+        assert pd.read_csv(sample)["id"].is_unique
+    
+    def test_events_resend_duplicates(self, tmp_path):
+        """Test later event files repeat some earlier event ids."""
+        files = generators.generate_events(tmp_path, 3000, days=3, duplicate_rate=0.1)
+        events = pd.concat(pd.read_csv(f) for f in files)
+        
+        assert events["event_id"].nunique() == 3000
+        assert len(events) > 3000
+
+
+class TestRunBenchmarks:
+    """Test the benchmark harness."""
+    
+    def test_run_benchmarks_reports_each_stage(self, tmp_path):
+        """Test a small run reports timing and memory per stage."""
+        report = run_benchmarks(200, stages=["batch_level_1"], workdir=str(tmp_path))
+    
+        [stage] = report["stages"]
+        assert stage["stage"] == "batch_level_1"
+        assert stage["error"] is None
+        assert stage["rows_per_sec"] > 0
+        assert report["datasets"]["payments"]["rows"] == 200
+        # Only the inputs of the selected stages are generated
+        assert sorted(report["datasets"]) == ["payments", "users"]
+    
+    def test_run_stage_reports_a_dead_process(self, tmp_path, monkeypatch):
+        """Test a stage process that dies without reporting is recorded, not waited on forever."""
+        monkeypatch.setattr(run, "START_METHOD", "fork")
+        monkeypatch.setattr(run, "POLL_SECONDS", 0.1)
+        monkeypatch.setitem(run.STAGE_FUNCTIONS, "crash", lambda workdir: os._exit(3))
+    
+        result = run.run_stage("crash", tmp_path, rows=1)
+    
+        assert result["error"] == "Stage process exited with code 3 without reporting"
+        assert result["seconds"] is None
@@ -1,6 +1,9 @@
 """Unit tests for BigQuery client."""
 
 import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import date
 from unittest.mock import Mock, patch
 from src.bigquery_client import BigQueryClient
 
@@ -21,6 +24,203 @@ class TestBigQueryClient:
         mock_creds.from_service_account_file.return_value = Mock()
         client = BigQueryClient(credentials_path="test.json")
         assert client.client is not None
+    
+    @patch('src.bigquery_client.time.sleep')
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_as_completed_yields_in_completion_order(self, mock_client, mock_sleep):
+        """Test jobs are yielded as they finish with backoff between polls."""
+        slow = _job("slow", done_after=3)
+        fast = _job("fast", done_after=1)
+        
+        client = BigQueryClient()
+        finished = list(client.as_completed([slow, fast], poll_interval=0.1))
+        
+        assert [job.job_id for job in finished] == ["fast", "slow"]
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.1, 0.2]
+    
+    @patch('src.bigquery_client.time.sleep')
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_wait_all_cancels_pending_on_failure(self, mock_client, mock_sleep):
+        """Test a failing job cancels the jobs that are still running."""
+        failing = _job("failing", done_after=1)
+        failing.result.side_effect = RuntimeError("query failed")
+        running = _job("running", done_after=100)
+        
+        client = BigQueryClient()
+        with pytest.raises(RuntimeError, match="query failed"):
+            client.wait_all([failing, running])
+        
+        running.cancel.assert_called_once()
+        failing.cancel.assert_not_called()
+    
+    @patch('src.bigquery_client.time.monotonic')
+    @patch('src.bigquery_client.time.sleep')
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_as_completed_timeout_cancels(self, mock_client, mock_sleep, mock_monotonic):
+        """Test unfinished jobs are cancelled when the timeout expires."""
+        mock_monotonic.side_effect = [0.0, 5.0]
+        running = _job("running", done_after=100)
+        
+        client = BigQueryClient()
+        with pytest.raises(TimeoutError):
+            list(client.as_completed([running], timeout=1.0))
+        
+        running.cancel.assert_called_once()
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_replace_partitions_merges_date_range(self, mock_client):
+        """Test only the requested partitions are deleted and reinserted."""
+        client = BigQueryClient()
+        client.replace_partitions(
+            "SELECT DATE(ts) AS dt FROM `p.staging.events`;",
+            "production.daily",
+            "dt",
+            date(2025, 3, 1),
+            date(2025, 3, 3)
+        )
+        
+        merge = mock_client.return_value.query.call_args.args[0]
+        in_range = "BETWEEN DATE '2025-03-01' AND DATE '2025-03-03'"
+        assert merge.startswith("MERGE `")
+        assert f"WHERE dt {in_range}" in merge
+        assert f"WHEN NOT MATCHED BY SOURCE AND target.dt {in_range} THEN DELETE" in merge
+        assert "events`;" not in merge
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_is_partitioned_by_checks_column_and_granularity(self, mock_client):
+        """Test only day partitioning on the given column counts as partitioned by it."""
+        bq = mock_client.return_value
+        client = BigQueryClient()
+        
+        bq.get_table.return_value = Mock(time_partitioning=None)
+        assert not client.is_partitioned_by("production", "daily", "dt")
+        
+        bq.get_table.return_value = Mock(time_partitioning=Mock(field="dt", type_="DAY"))
+        assert client.is_partitioned_by("production", "daily", "dt")
+        assert not client.is_partitioned_by("production", "daily", "date")
+        
+        bq.get_table.return_value = Mock(time_partitioning=Mock(field="dt", type_="MONTH"))
+        assert not client.is_partitioned_by("production", "daily", "dt")
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_query_to_arrow_caches_until_table_changes(self, mock_client):
+        """Test repeated reads are served from cache until an input table changes."""
+        bq = mock_client.return_value
+        bq.get_table.return_value = Mock(modified="2025-03-01T00:00:00", table_type="TABLE")
+        bq.query.return_value.result.return_value.to_arrow.return_value = pa.table({"n": [1]})
+        
+        client = BigQueryClient()
+        query = "SELECT COUNT(*) AS n FROM `p.staging.events`"
+        
+        first = client.query_to_arrow(query)
+        second = client.query_to_arrow(query)
+        assert first.equals(second)
+        assert bq.query.call_count == 1
+        
+        client.query_to_arrow(query, use_cache=False)
+        assert bq.query.call_count == 2
+        
+        bq.get_table.return_value = Mock(modified="2025-03-02T00:00:00", table_type="TABLE")
+        client.query_to_arrow(query)
+        assert bq.query.call_count == 3
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_query_to_arrow_skips_cache_for_views_and_unquoted_tables(self, mock_client):
+        """Test results are only cached when every input resolves to a real table."""
+        bq = mock_client.return_value
+        tables = {
+            "staging.events": Mock(modified="v1", table_type="TABLE"),
+            "staging.events_view": Mock(modified="v1", table_type="VIEW"),
+        }
+        bq.get_table.side_effect = lambda ref: tables[".".join(ref.split(".")[-2:])]
+        bq.query.return_value.result.return_value.to_arrow.return_value = pa.table({"n": [1]})
+        
+        client = BigQueryClient()
+        for query in (
+            "SELECT COUNT(*) AS n FROM `p.staging.events_view`",
+            "SELECT COUNT(*) AS n FROM events",
+        ):
+            client.query_to_arrow(query)
+            client.query_to_arrow(query)
+        assert bq.query.call_count == 4
+        
+        # Unquoted references are versioned like backtick ones
+        query = "SELECT COUNT(*) AS n FROM staging.events"
+        client.query_to_arrow(query)
+        client.query_to_arrow(query)
+        assert bq.query.call_count == 5
+        tables["staging.events"] = Mock(modified="v2", table_type="TABLE")
+        client.query_to_arrow(query)
+        assert bq.query.call_count == 6
+
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_query_to_parquet_streams_batches(self, mock_client, tmp_path):
+        """Test result pages are written to Parquet batch by batch."""
+        bq = mock_client.return_value
+        rows = bq.query.return_value.result.return_value
+        rows.to_arrow_iterable.return_value = iter([
+            pa.record_batch({"n": [1, 2]}),
+            pa.record_batch({"n": [3]}),
+        ])
+        
+        client = BigQueryClient()
+        written = client.query_to_parquet("SELECT n FROM `p.staging.t`", str(tmp_path / "out.parquet"), page_size=2)
+        
+        assert written == 3
+        assert pq.read_table(tmp_path / "out.parquet").column("n").to_pylist() == [1, 2, 3]
+        bq.query.return_value.result.assert_called_with(page_size=2)
+        assert list(tmp_path.iterdir()) == [tmp_path / "out.parquet"]
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_query_to_record_batches_keeps_schema_of_empty_result(self, mock_client):
+        """Test an empty result still yields a reader with the result schema."""
+        rows = mock_client.return_value.query.return_value.result.return_value
+        rows.to_arrow_iterable.return_value = iter([])
+        rows.to_arrow.return_value = pa.table({"n": pa.array([], pa.int64())})
+        
+        reader = BigQueryClient().query_to_record_batches("SELECT n FROM `p.staging.t`")
+        
+        assert reader.schema.names == ["n"]
+        assert reader.read_all().num_rows == 0
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_query_to_record_batches_passes_stream_count_only_when_set(self, mock_client):
+        """Test max_stream_count is left out for releases that do not accept it."""
+        rows = mock_client.return_value.query.return_value.result.return_value
+        rows.to_arrow_iterable.return_value = iter([pa.record_batch({"n": [1]})])
+        client = BigQueryClient()
+        
+        client.query_to_record_batches("SELECT n FROM `p.staging.t`")
+        assert "max_stream_count" not in rows.to_arrow_iterable.call_args.kwargs
+        
+        rows.to_arrow_iterable.return_value = iter([pa.record_batch({"n": [1]})])
+        client.query_to_record_batches("SELECT n FROM `p.staging.t`", max_stream_count=4)
+        assert rows.to_arrow_iterable.call_args.kwargs["max_stream_count"] == 4
+
+    
+    @patch('src.bigquery_client.bigquery.Client')
+    def test_query_from_file_passes_typed_parameters(self, mock_client, tmp_path):
+        """Test dates go to BigQuery as query parameters, not SQL text."""
+        sql_file = tmp_path / "daily.sql"
+        sql_file.write_text("SELECT * FROM `${GCP_PROJECT_ID}.staging.t` WHERE dt = ${RUN_DATE}")
+        
+        client = BigQueryClient()
+        client.execute_query_from_file(str(sql_file), params={"RUN_DATE": date(2025, 3, 1)})
+        
+        query = mock_client.return_value.query.call_args.args[0]
+        job_config = mock_client.return_value.query.call_args.kwargs["job_config"]
+        assert query.endswith("WHERE dt = @RUN_DATE")
+        assert [p.name for p in job_config.query_parameters] == ["RUN_DATE"]
+        with pytest.raises(ValueError, match="RUN_DATE"):
+            client.render_sql_file(str(sql_file))
+
+
+def _job(job_id, done_after):
+    """Build a mock job that reports done on the given poll."""
+    job = Mock(job_id=job_id)
+    job.done.side_effect = [False] * (done_after - 1) + [True] * 100
+    return job
 
 
 # Add more tests as needed
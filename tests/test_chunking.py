@@ -0,0 +1,76 @@
+"""Unit tests for large-file chunking."""
+
+import csv
+import json
+from src.chunking import ChunkedLoadState, split_file
+
+
+class TestSplitFile:
+    """Test split_file function."""
+    
+    def test_csv_chunks_keep_header_and_rows(self, tmp_path):
+        """Test every chunk is a complete CSV and no row is lost or split."""
+        source = tmp_path / "events.csv"
+        rows = [["id", "note"]] + [[str(i), f"note {i}"] for i in range(100)]
+        rows[50][1] = 'multi\nline "quoted" note'
+        with open(source, "w", newline="") as f:
+            csv.writer(f).writerows(rows)
+        
+        chunks = split_file(str(source), str(tmp_path / "chunks"), chunk_bytes=64)
+        
+        assert len(chunks) > 1
+        loaded = []
+        for chunk in chunks:
+            with open(chunk, newline="") as f:
+                chunk_rows = list(csv.reader(f))
+            assert chunk_rows[0] == ["id", "note"]
+            loaded.extend(chunk_rows[1:])
+        assert loaded == rows[1:]
+    
+    def test_json_chunks_are_line_aligned(self, tmp_path):
+        """Test NDJSON chunks contain whole records and no header."""
+        source = tmp_path / "events.json"
+        source.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(20)))
+        
+        chunks = split_file(str(source), str(tmp_path / "chunks"), chunk_bytes=30)
+        
+        records = [json.loads(line) for chunk in chunks for line in open(chunk)]
+        assert records == [{"id": i} for i in range(20)]
+
+
+class TestChunkedLoadState:
+    """Test ChunkedLoadState class."""
+    
+    def test_resume_and_invalidate(self, tmp_path):
+        """Test progress survives a restart but not a change to the source."""
+        source = tmp_path / "events.csv"
+        source.write_text("id\n1\n")
+        
+        state = ChunkedLoadState(str(source), "raw.events", 100, str(tmp_path))
+        state.mark_completed(0, "job-0", 10)
+        
+        resumed = ChunkedLoadState(str(source), "raw.events", 100, str(tmp_path))
+        assert resumed.temp_table == state.temp_table
+        assert resumed.is_completed(0) and resumed.total_rows == 10
+        
+        source.write_text("id\n1\n2\n")
+        restarted = ChunkedLoadState(str(source), "raw.events", 100, str(tmp_path))
+        assert restarted.temp_table != state.temp_table
+        assert restarted.abandoned_temp_table == state.temp_table
+        assert not restarted.is_completed(0)
+    
+    def test_job_ids_survive_restarts_until_a_job_fails(self, tmp_path):
+        """Test a chunk keeps its job ID across restarts and moves on after a failure."""
+        source = tmp_path / "events.csv"
+        source.write_text("id\n1\n")
+        
+        state = ChunkedLoadState(str(source), "raw.events", 100, str(tmp_path))
+        state.save()
+        first = state.job_id(3)
+        resumed = ChunkedLoadState(str(source), "raw.events", 100, str(tmp_path))
+        assert resumed.job_id(3) == first
+        assert resumed.job_id(4) != first
+        
+        second = resumed.next_job_id(3)
+        assert second != first
+        assert ChunkedLoadState(str(source), "raw.events", 100, str(tmp_path)).job_id(3) == second
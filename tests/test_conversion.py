@@ -0,0 +1,62 @@
+"""Unit tests for Parquet conversion."""
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from src.conversion import convert_to_parquet
+
+
+class TestConvertToParquet:
+    """Test convert_to_parquet function."""
+    
+    def test_csv_streamed_in_blocks(self, tmp_path):
+        """Test a CSV spanning many blocks converts with consistent types."""
+        source = tmp_path / "events.csv"
+        rows = ["id,name,amount,created_at"]
+        rows += [f"{i},user {i},{i}.5,2024-01-01 10:00:00" for i in range(2000)]
+        source.write_text("\n".join(rows) + "\n")
+        
+        output = convert_to_parquet(str(source), str(tmp_path / "out"), block_size=4096)
+        table = pq.read_table(output)
+        
+        assert table.num_rows == 2000
+        assert table.schema.field("id").type == pa.int64()
+        assert table.schema.field("amount").type == pa.float64()
+        assert pa.types.is_timestamp(table.schema.field("created_at").type)
+        assert pq.ParquetFile(output).metadata.num_row_groups >= 1
+    
+    def test_json_with_explicit_schema(self, tmp_path):
+        """Test newline-delimited JSON honours an explicit schema."""
+        source = tmp_path / "users.json"
+        source.write_text('{"id": 1, "country": "SE"}\n{"id": 2, "country": null}\n')
+        schema = pa.schema([("id", pa.int32()), ("country", pa.string())])
+        
+        output = convert_to_parquet(str(source), str(tmp_path), schema=schema)
+        table = pq.read_table(output)
+        
+        assert table.schema.field("id").type == pa.int32()
+        assert table.column("country").to_pylist() == ["SE", None]
+    
+    def test_same_stem_sources_do_not_collide(self, tmp_path):
+        """Test x.csv and x.json converted into one directory keep separate files."""
+        (tmp_path / "x.csv").write_text("id\n1\n")
+        (tmp_path / "x.json").write_text('{"id": 2}\n{"id": 3}\n')
+        
+        from_csv = convert_to_parquet(str(tmp_path / "x.csv"), str(tmp_path / "out"))
+        from_json = convert_to_parquet(str(tmp_path / "x.json"), str(tmp_path / "out"))
+        
+        assert from_csv != from_json
+        assert pq.read_table(from_csv).num_rows == 1
+        assert pq.read_table(from_json).num_rows == 2
+    
+    def test_type_change_after_first_block_leaves_no_file(self, tmp_path):
+        """Test a later block that breaks the inferred types fails without a partial file."""
+        source = tmp_path / "events.csv"
+        rows = ["id,amount"] + [f"{i},{i}" for i in range(2000)] + ["2000,2000.5"]
+        source.write_text("\n".join(rows) + "\n")
+        output_dir = tmp_path / "out"
+        
+        with pytest.raises(pa.ArrowInvalid):
+            convert_to_parquet(str(source), str(output_dir), block_size=1024)
+        
+        assert list(output_dir.iterdir()) == []
@@ -0,0 +1,66 @@
+"""Unit tests for the cost baseline."""
+
+import pytest
+from unittest.mock import patch
+from src.config import Config
+from src.cost_baseline import CostBaseline, bytes_to_cost, find_regressions
+from src.pipeline import run_cost_estimate
+
+GIB = 1024 ** 3
+
+
+class TestCostFunctions:
+    """Test bytes_to_cost and find_regressions functions."""
+    
+    def test_bytes_to_cost(self):
+        """Test on-demand pricing per TiB."""
+        assert bytes_to_cost(1024 ** 4, price_per_tib=6.25) == 6.25
+    
+    def test_find_regressions_ignores_small_and_unknown_models(self):
+        """Test only large relative and absolute growth is reported."""
+        baseline = {"a.sql": 10 * GIB, "b.sql": 10 * GIB, "c.sql": 1000}
+        estimates = {
+            "a.sql": 40 * GIB,    # 4x: regression
+            "b.sql": 12 * GIB,    # 1.2x: within ratio
+            "c.sql": 5000,        # 5x but tiny
+            "d.sql": 100 * GIB,   # no baseline yet
+            "e.sql": None,        # dry run failed
+        }
+        
+        regressions = find_regressions(estimates, baseline, ratio=0.5, min_bytes=GIB)
+        
+        assert [r["model"] for r in regressions] == ["a.sql"]
+        assert regressions[0]["ratio"] == 4.0
+
+
+class TestCostBaseline:
+    """Test CostBaseline class."""
+    
+    def test_update_keeps_failed_models_and_persists(self, tmp_path):
+        """Test updating the baseline skips failed dry runs and saves to disk."""
+        path = tmp_path / "cost_baseline.json"
+        baseline = CostBaseline(str(path))
+        baseline.update({"a.sql": 100, "b.sql": 200})
+        baseline.update({"a.sql": 150, "b.sql": None})
+        
+        assert CostBaseline(str(path)).models == {"a.sql": 150, "b.sql": 200}
+
+
+class TestRunCostEstimate:
+    """Test the cost estimate gate."""
+    
+    @pytest.fixture(autouse=True)
+    def baseline_path(self, tmp_path, monkeypatch):
+        """Keep the baseline out of the project config directory."""
+        monkeypatch.setattr(Config, "COST_BASELINE_PATH", tmp_path / "cost_baseline.json")
+    
+    @patch('src.pipeline.DataTransformation')
+    def test_failed_dry_run_fails_the_gate(self, mock_transformation):
+        """Test a model without an estimate fails the gate instead of passing silently."""
+        mock_transformation.return_value.estimate_costs.return_value = {
+            "staging_events.sql": 1000, "prod_daily.sql": None
+        }
+        
+        run_cost_estimate()
+        with pytest.raises(RuntimeError, match=r"prod_daily\.sql \(dry run failed\)"):
+            run_cost_estimate(fail_on_regression=True)
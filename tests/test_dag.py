@@ -0,0 +1,121 @@
+"""Unit tests for the transformation dependency graph."""
+
+import threading
+import pytest
+from src.dag import (
+    TransformationDAG, TransformationNode, parse_model_config, parse_table_references
+)
+
+
+def _write_sql(tmp_path, name, body):
+    """Write a SQL file and return its path."""
+    path = tmp_path / name
+    path.write_text(body)
+    return path
+
+
+class TestParseTableReferences:
+    """Test table reference extraction."""
+    
+    def test_strips_project_placeholder(self):
+        """Test references compare as dataset.table."""
+        sql = """
+            SELECT * FROM `${GCP_PROJECT_ID}.staging.orders` o
+            JOIN `raw_data.users` u USING (user_id)
+            -- FROM `${GCP_PROJECT_ID}.staging.ignored`
+        """
+        assert parse_table_references(sql) == {"staging.orders", "raw_data.users"}
+
+
+class TestParseModelConfig:
+    """Test model settings in SQL headers."""
+    
+    def test_reads_leading_comment_block(self):
+        """Test settings are read from the header only."""
+        sql = """-- Example model
+-- materialized: incremental
+-- partition_by: date
+
+-- lookback_days: 7
+SELECT 1
+-- lookback_days: 30
+"""
+        assert parse_model_config(sql) == {
+            "materialized": "incremental", "partition_by": "date", "lookback_days": "7"
+        }
+    
+    def test_incremental_requires_partition_column(self):
+        """Test incremental models must name a partition column."""
+        with pytest.raises(ValueError, match="partition_by"):
+            parse_model_config("-- materialized: incremental\nSELECT 1")
+
+
+class TestTransformationDAG:
+    """Test TransformationDAG class."""
+    
+    def _dag(self, tmp_path):
+        """Build staging a, b and production c (reads a) and d (reads a and b)."""
+        _write_sql(tmp_path, "staging_a.sql", "SELECT * FROM `p.raw_data.a`")
+        _write_sql(tmp_path, "staging_b.sql", "SELECT * FROM `p.raw_data.b`")
+        _write_sql(tmp_path, "prod_c.sql", "SELECT * FROM `p.staging.a`")
+        _write_sql(
+            tmp_path, "prod_d.sql",
+            "SELECT * FROM `p.staging.a` JOIN `p.staging.b` USING (id)"
+        )
+        return TransformationDAG.from_sql_dir(
+            tmp_path, [("staging_", "staging"), ("prod_", "production")]
+        )
+    
+    def test_dependencies_from_references(self, tmp_path):
+        """Test edges follow the tables each file reads."""
+        dag = self._dag(tmp_path)
+        
+        assert dag.upstreams["staging_a.sql"] == set()
+        assert dag.upstreams["prod_c.sql"] == {"staging_a.sql"}
+        assert dag.upstreams["prod_d.sql"] == {"staging_a.sql", "staging_b.sql"}
+    
+    def test_downstream_starts_before_tier_finishes(self, tmp_path):
+        """Test a node starts once its own upstreams finish."""
+        dag = self._dag(tmp_path)
+        release_b = threading.Event()
+        finished = []
+        
+        def run_node(node):
+            if node.name == "staging_b.sql":
+                assert release_b.wait(timeout=5)
+            if node.name == "prod_c.sql":
+                # staging_b is still blocked while prod_c runs
+                assert "staging_b.sql" not in finished
+                release_b.set()
+            finished.append(node.name)
+        
+        completed = dag.run(run_node, max_workers=4)
+        
+        assert completed[-1] == "prod_d.sql"
+    
+    def test_failure_skips_downstream(self, tmp_path):
+        """Test nodes after a failure are not started."""
+        dag = self._dag(tmp_path)
+        started = []
+        
+        def run_node(node):
+            started.append(node.name)
+            if node.name == "staging_a.sql":
+                raise RuntimeError("boom")
+        
+        with pytest.raises(RuntimeError, match="boom"):
+            dag.run(run_node, max_workers=1)
+        
+        assert "prod_c.sql" not in started
+        assert "prod_d.sql" not in started
+    
+    def test_cycle_detected(self, tmp_path):
+        """Test cyclic references are rejected."""
+        a = _write_sql(tmp_path, "a.sql", "SELECT * FROM `p.staging.b`")
+        b = _write_sql(tmp_path, "b.sql", "SELECT * FROM `p.staging.a`")
+        
+        with pytest.raises(ValueError, match="cycle"):
+            TransformationDAG([
+                TransformationNode(a, "staging.a"),
+                TransformationNode(b, "staging.b"),
+            ])
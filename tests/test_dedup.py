@@ -0,0 +1,121 @@
+"""Unit tests for the event deduplication store."""
+
+import numpy as np
+import pandas as pd
+from src import dedup
+from src.dedup import EventDeduplicator, hash_event_id, hash_event_ids
+
+
+class TestHashing:
+    """Test event id hashing."""
+
+    def test_scalar_and_vectorized_hashes_match(self):
+        """Test both hash functions agree, including unicode and non-string ids."""
+        ids = ["", "a", "evt_000000001", "évènement", "x" * 40, 123]
+        hashes = hash_event_ids(ids)
+
+        assert hashes.dtype == np.uint64
+        assert [int(h) for h in hashes] == [hash_event_id(i) for i in ids]
+        assert len(set(hashes)) == len(ids)
+
+
+class TestEventDeduplicator:
+    """Test EventDeduplicator class."""
+
+    def test_observe_keeps_latest_time(self):
+        """Test observe reports the stored time and records newer copies."""
+        store = EventDeduplicator(segment_keys=2)
+
+        assert store.observe("a", 5) is None
+        assert store.observe("b", 1) is None
+        assert store.observe("a", 3) == 5
+        assert store.observe("a", 9) == 5
+        assert store.observe("a", 7) == 9
+
+    def test_keep_latest_matches_sort_and_drop_duplicates(self):
+        """Test batch dedup keeps the same rows as sorting by ts."""
+        rng = np.random.default_rng(0)
+        events = pd.DataFrame({
+            "event_id": pd.Series(rng.integers(0, 300, 1000)).map("e{}".format),
+            "ts": pd.to_datetime(rng.integers(0, 10**6, 1000), unit="s", utc=True),
+        })
+
+        mask = EventDeduplicator().keep_latest(events["event_id"], events["ts"])
+        expected = events.sort_values("ts").drop_duplicates("event_id", keep="last")
+
+        kept = events[mask].set_index("event_id")["ts"].sort_index()
+        assert kept.equals(expected.set_index("event_id")["ts"].sort_index())
+
+    def test_keep_latest_checks_earlier_batches(self):
+        """Test only copies newer than the stored one survive a later batch."""
+        store = EventDeduplicator()
+        store.keep_latest(["a", "b"], [10, 10])
+
+        mask = store.keep_latest(["a", "b", "c"], [10, 11, 1])
+
+        assert mask.tolist() == [False, True, True]
+
+    def test_keep_latest_with_missing_ids(self):
+        """Test missing ids count as one id and leave the last id's copies alone."""
+        mask = EventDeduplicator().keep_latest(pd.Series(["a", None, "a", None, "b"]), [1, 5, 2, 3, 4])
+
+        assert mask.tolist() == [False, True, True, False, True]
+        assert hash_event_ids(pd.Series([None], dtype=object))[0] == hash_event_id(None)
+
+    def test_colliding_hashes_stay_distinct(self, monkeypatch):
+        """Test ids with the same hash are confirmed against the stored ids."""
+        monkeypatch.setattr(dedup, "hash_event_id", lambda event_id: 7)
+        monkeypatch.setattr(dedup, "_hash_strings", lambda strings: np.full(len(strings), 7, dtype=np.uint64))
+        store = EventDeduplicator(segment_keys=2)
+
+        assert store.observe("a", 5) is None
+        assert store.observe("b", 6) is None
+        assert store.observe("c", 7) is None
+        assert store.observe("b", 1) == 6
+        assert store.keep_latest(["d", "a", "c", "e"], [1, 9, 2, 1]).tolist() == [True, True, False, True]
+        assert store.observe("e", 0) == 1
+
+    def test_expire_drops_old_segments(self):
+        """Test keys older than the TTL are forgotten."""
+        store = EventDeduplicator(ttl_seconds=1, segment_keys=2)
+        for i, event_time in enumerate([0, 1, 5 * 10**9, 6 * 10**9]):
+            store.observe(f"e{i}", event_time)
+
+        dropped = store.expire(6 * 10**9)
+
+        assert dropped == 2
+        assert store.observe("e0", 0) is None
+        assert store.observe("e3", 0) == 6 * 10**9
+
+    def test_spill_to_disk(self, tmp_path):
+        """Test sealed segments beyond the memory budget are memory-mapped files."""
+        store = EventDeduplicator(segment_keys=10, max_memory_keys=10, spill_dir=str(tmp_path))
+        for i in range(30):
+            store.observe(f"e{i}", i)
+
+        assert store.stats()["disk_keys"] == 20
+        assert len(list(tmp_path.glob("*.npy"))) == 8
+        assert store.observe("e3", 0) == 3
+
+        store.clear()
+        assert len(store) == 0
+        assert not list(tmp_path.glob("*.npy"))
+
+    def test_checkpoint_and_restore(self, tmp_path):
+        """Test segments are written once and a restored store knows every key."""
+        store = EventDeduplicator(ttl_seconds=10, segment_keys=2)
+        for i in range(5):
+            store.observe(f"e{i}", i)
+
+        state = store.checkpoint(str(tmp_path))
+        files = sorted(path.name for path in tmp_path.glob("dedup-*.npz"))
+        assert len(files) == 2
+
+        store.observe("e5", 5)
+        state = store.checkpoint(str(tmp_path))
+        EventDeduplicator.prune_checkpoint(str(tmp_path), state)
+        assert sorted(path.name for path in tmp_path.glob("dedup-*.npz"))[:2] == files
+
+        restored = EventDeduplicator.restore(str(tmp_path), state)
+        assert [restored.observe(f"e{i}", 0) for i in range(6)] == list(range(6))
+        assert restored.observe("e6", 6) is None
@@ -0,0 +1,26 @@
+"""Unit tests for the layout of the interview exercises."""
+
+import ast
+import pytest
+from src.config import Config
+
+EXERCISES = Config.PROJECT_ROOT / "exercises"
+
+# Packages of this repository, which candidates do not get
+REPO_PACKAGES = {"src", "benchmarks", "exercises", "tests"}
+
+
+@pytest.mark.parametrize("exercise", ["batch_level_1", "batch_level_2", "streaming_level_1"])
+def test_reference_solution_is_self_contained(exercise):
+    """Test a reference solution only imports installed packages, not the repository's."""
+    tree = ast.parse((EXERCISES / exercise / "reference_solution.py").read_text())
+    
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            assert node.level == 0, f"relative import in {exercise}"
+            imported.add(node.module.split(".")[0])
+    
+    assert not imported & REPO_PACKAGES
@@ -1,10 +1,23 @@
 """Unit tests for data ingestion."""
 
+import os
 import pytest
+import pyarrow as pa
 from unittest.mock import Mock, patch, MagicMock
+from src.config import Config
 from src.ingestion import DataIngestion
 
 
+@pytest.fixture(autouse=True)
+def manifest_path(tmp_path, monkeypatch):
+    """Keep the ingestion manifest and schemas out of the project config directory."""
+    path = tmp_path / "manifest" / "ingestion_manifest.json"
+    monkeypatch.setattr(Config, "INGEST_MANIFEST_PATH", path)
+    monkeypatch.setattr(Config, "SCHEMA_DIR", tmp_path / "manifest" / "schemas")
+    monkeypatch.setattr(Config, "CHUNK_STATE_DIR", tmp_path / "manifest" / "chunk_state")
+    return path
+
+
 class TestDataIngestion:
     """Test DataIngestion class."""
     
@@ -16,6 +29,320 @@ class TestDataIngestion:
         
         ingestion = DataIngestion()
         assert ingestion.bq_client is not None
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_returns_summary_per_file(self, mock_bq_client, tmp_path):
+        """Test concurrent directory ingestion summarizes every file."""
+        for name in ("b.csv", "a.csv", "notes.txt"):
+            (tmp_path / name).write_text("id\n1\n")
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = lambda **kwargs: _load_job(kwargs["table_id"])
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        ingestion = DataIngestion()
+        summaries = ingestion.ingest_directory(str(tmp_path), "*", max_workers=2)
+        
+        assert [s["table"] for s in summaries] == ["a", "b"]
+        assert [s["job_id"] for s in summaries] == ["job-a", "job-b"]
+        assert all(s["rows"] == 1 and s["error"] is None for s in summaries)
+        assert client.submit_load_from_file.call_count == 2
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_captures_errors(self, mock_bq_client, tmp_path):
+        """Test failing uploads and jobs are reported without aborting other files."""
+        for name in ("good.csv", "bad_upload.csv", "bad_job.csv"):
+            (tmp_path / name).write_text("id\n1\n")
+        
+        def submit(**kwargs):
+            if kwargs["table_id"] == "bad_upload":
+                raise ValueError("upload failed")
+            job = _load_job(kwargs["table_id"])
+            if kwargs["table_id"] == "bad_job":
+                job.exception.return_value = ValueError("job failed")
+            return job
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = submit
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        ingestion = DataIngestion()
+        summaries = {s["table"]: s for s in ingestion.ingest_directory(str(tmp_path))}
+        
+        assert summaries["bad_upload"]["error"] == "upload failed"
+        assert summaries["bad_job"]["error"] == "job failed"
+        assert summaries["good"]["error"] is None
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_reports_large_file_failures(self, mock_bq_client, tmp_path, monkeypatch, caplog):
+        """Test a directory of only large files still logs failures and the summary."""
+        for name in ("big_ok.csv", "big_bad.csv"):
+            (tmp_path / name).write_text("id\n1\n2\n")
+        monkeypatch.setattr(Config, "INGEST_CHUNK_THRESHOLD_BYTES", 0)
+        
+        def ingest_large_file(file_path, table_name, dataset, max_workers=None):
+            if table_name == "big_bad":
+                raise ValueError("chunk failed")
+            return {"job_id": f"job-{table_name}", "rows": 2, "bytes": 10}
+        
+        ingestion = DataIngestion()
+        monkeypatch.setattr(ingestion, "ingest_large_file", ingest_large_file)
+        with caplog.at_level("INFO", logger="src.ingestion"):
+            summaries = {s["table"]: s for s in ingestion.ingest_directory(str(tmp_path))}
+        
+        assert summaries["big_bad"]["error"] == "chunk failed"
+        assert summaries["big_ok"]["error"] is None and summaries["big_ok"]["rows"] == 2
+        assert "Failed to ingest" in caplog.text and "chunk failed" in caplog.text
+        assert "Ingested 1/2 files" in caplog.text
+        mock_bq_client.return_value.submit_load_from_file.assert_not_called()
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_skips_unchanged_files(self, mock_bq_client, tmp_path):
+        """Test a re-run only reloads files whose contents changed."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        for name in ("same.csv", "touched.csv", "edited.csv"):
+            (data_dir / name).write_text("id\n1\n")
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = lambda **kwargs: _load_job(kwargs["table_id"])
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        DataIngestion().ingest_directory(str(data_dir))
+        assert client.submit_load_from_file.call_count == 3
+        
+        # New mtime with identical contents, and an in-place edit of equal size
+        os.utime(data_dir / "touched.csv", ns=(0, 10**18))
+        (data_dir / "edited.csv").write_text("id\n2\n")
+        client.submit_load_from_file.reset_mock()
+        
+        summaries = {s["table"]: s for s in DataIngestion().ingest_directory(str(data_dir))}
+        
+        assert summaries["same"]["skipped"] and summaries["touched"]["skipped"]
+        assert not summaries["edited"]["skipped"]
+        loaded = [c.kwargs["table_id"] for c in client.submit_load_from_file.call_args_list]
+        assert loaded == ["edited"]
+        
+        DataIngestion().ingest_directory(str(data_dir), force=True)
+        assert client.submit_load_from_file.call_count == 4
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_records_file_state_before_upload(self, mock_bq_client, tmp_path):
+        """Test a file edited while its load runs is reloaded on the next run."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        source = data_dir / "live.csv"
+        source.write_text("id\n1\n")
+        
+        def submit(**kwargs):
+            # The file changes after it was uploaded, before the job finishes
+            source.write_text("id\n2\n")
+            return _load_job(kwargs["table_id"])
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = submit
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        DataIngestion().ingest_directory(str(data_dir))
+        summaries = DataIngestion().ingest_directory(str(data_dir))
+        
+        assert not summaries[0]["skipped"]
+        assert client.submit_load_from_file.call_count == 2
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_converts_to_parquet(self, mock_bq_client, tmp_path):
+        """Test files are uploaded as Parquet and the scratch copy is removed."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "sample.csv").write_text("id,name\n1,a\n2,b\n")
+        
+        uploaded = []
+        
+        def submit(**kwargs):
+            uploaded.append(kwargs["source_file"])
+            assert os.path.exists(kwargs["source_file"])
+            return _load_job(kwargs["table_id"])
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = submit
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        ingestion = DataIngestion(convert_to_parquet=True)
+        summaries = ingestion.ingest_directory(str(data_dir))
+        
+        assert summaries[0]["error"] is None
+        assert uploaded[0].endswith("sample.csv.parquet")
+        assert not os.path.exists(uploaded[0])
+    
+    @patch('src.ingestion.convert_to_parquet')
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_loads_source_when_conversion_fails(self, mock_bq_client, mock_convert, tmp_path):
+        """Test a file whose later rows break the Parquet types is loaded as it is."""
+        (tmp_path / "sample.csv").write_text("id,name\n1,a\n2,b\n")
+        mock_convert.side_effect = pa.ArrowInvalid("CSV conversion error to int64")
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = lambda **kwargs: _load_job(kwargs["table_id"])
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        summaries = DataIngestion(convert_to_parquet=True).ingest_directory(str(tmp_path))
+        
+        assert summaries[0]["error"] is None
+        load = client.submit_load_from_file.call_args.kwargs
+        assert load["source_file"] == str(tmp_path / "sample.csv")
+        assert [field.name for field in load["schema"]] == ["id", "name"]
+        assert (tmp_path / "sample.csv").exists()
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_reuses_registered_schema(self, mock_bq_client, tmp_path):
+        """Test later loads pass the registered schema instead of autodetecting."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "orders.csv").write_text("id,amount\n1,10\n")
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = lambda **kwargs: _load_job(kwargs["table_id"])
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        
+        DataIngestion().ingest_directory(str(data_dir))
+        first = client.submit_load_from_file.call_args.kwargs["schema"]
+        assert [(f.name, f.field_type) for f in first] == [("id", "INTEGER"), ("amount", "INTEGER")]
+        
+        # amount now looks like FLOAT and a new column appeared
+        (data_dir / "orders.csv").write_text("id,amount,note\n2,10.5,x\n")
+        DataIngestion().ingest_directory(str(data_dir))
+        second = client.submit_load_from_file.call_args.kwargs["schema"]
+        
+        assert [(f.name, f.field_type) for f in second] == [
+            ("id", "INTEGER"), ("amount", "FLOAT"), ("note", "STRING")
+        ]
+        registered = DataIngestion().schema_registry.get("raw_data.orders")
+        assert [f.field_type for f in registered] == ["INTEGER", "FLOAT", "STRING"]
+        
+        # Integers fit the widened FLOAT column, which stays registered as FLOAT
+        (data_dir / "orders.csv").write_text("id,amount,note\n3,7,y\n")
+        DataIngestion().ingest_directory(str(data_dir))
+        third = client.submit_load_from_file.call_args.kwargs["schema"]
+        assert [f.field_type for f in third] == ["INTEGER", "FLOAT", "STRING"]
+        client.get_table_info.assert_not_called()
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_directory_rejects_incompatible_drift(self, mock_bq_client, tmp_path):
+        """Test a column whose values no longer fit its registered type is not loaded."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "events.csv").write_text("id,created_at\n1,2024-01-01 10:00:00\n")
+        
+        client = mock_bq_client.return_value
+        client.submit_load_from_file.side_effect = lambda **kwargs: _load_job(kwargs["table_id"])
+        client.as_completed.side_effect = lambda jobs, timeout=None: iter(jobs)
+        DataIngestion().ingest_directory(str(data_dir))
+        
+        (data_dir / "events.csv").write_text("id,created_at\n2,1700000000\n")
+        summaries = DataIngestion().ingest_directory(str(data_dir))
+        
+        assert "created_at is registered as TIMESTAMP" in summaries[0]["error"]
+        assert client.submit_load_from_file.call_count == 1
+    
+    @patch('src.ingestion.time.sleep')
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_large_file_resumes_failed_chunks(self, mock_bq_client, mock_sleep, tmp_path):
+        """Test a rerun only reloads the chunks that failed, then swaps once."""
+        source = tmp_path / "big.csv"
+        source.write_text("id,name\n" + "".join(f"{i},name{i}\n" for i in range(40)))
+        
+        loaded = []
+        flaky = {"failing": True}
+        
+        def load(**kwargs):
+            if kwargs["source_file"].endswith("part00002.csv") and flaky["failing"]:
+                raise RuntimeError("connection reset")
+            loaded.append(kwargs["source_file"])
+            assert kwargs["write_disposition"] == "WRITE_APPEND"
+            assert kwargs["table_id"].startswith("big__chunks_")
+            return _load_job(kwargs["table_id"])
+        
+        client = mock_bq_client.return_value
+        client.load_data_from_file.side_effect = load
+        client.get_job.return_value = None
+        
+        ingestion = DataIngestion()
+        with pytest.raises(RuntimeError, match="rerun to resume"):
+            ingestion.ingest_large_file(str(source), "big", "raw", chunk_bytes=100, max_retries=2)
+        client.copy_table.assert_not_called()
+        first_run = len(loaded)
+        
+        flaky["failing"] = False
+        summary = ingestion.ingest_large_file(str(source), "big", "raw", chunk_bytes=100)
+        
+        assert len(loaded) == first_run + 1
+        assert summary["rows"] == summary["chunks"]
+        temp_table = client.copy_table.call_args.args[1]
+        assert client.copy_table.call_args.args == ("raw", temp_table, "big")
+        client.delete_table.assert_called_once_with("raw", temp_table)
+
+    
+    @patch('src.ingestion.time.sleep')
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_large_file_does_not_resubmit_started_chunk(
+        self, mock_bq_client, mock_sleep, tmp_path
+    ):
+        """Test a chunk whose job started before a client error is waited on, not appended again."""
+        source = tmp_path / "big.csv"
+        source.write_text("id,name\n" + "".join(f"{i},name{i}\n" for i in range(40)))
+        
+        submitted = {}
+        timed_out = set()
+        
+        def load(**kwargs):
+            job_id = kwargs["job_id"]
+            assert job_id not in submitted, f"{job_id} submitted twice"
+            submitted[job_id] = _load_job(kwargs["table_id"])
+            submitted[job_id].job_id = job_id
+            if kwargs["source_file"].endswith("part00002.csv") and not timed_out:
+                # The job was created, but the client never saw the response
+                timed_out.add(job_id)
+                raise TimeoutError("read timed out")
+            return submitted[job_id]
+        
+        client = mock_bq_client.return_value
+        client.load_data_from_file.side_effect = load
+        client.get_job.side_effect = submitted.get
+        
+        summary = DataIngestion().ingest_large_file(
+            str(source), "big", "raw", chunk_bytes=100, max_retries=2
+        )
+        
+        assert len(submitted) == summary["chunks"]
+        submitted[timed_out.pop()].result.assert_called_once()
+        assert summary["rows"] == summary["chunks"]
+    
+    @patch('src.ingestion.BigQueryClient')
+    def test_ingest_large_file_drops_abandoned_temp_table(self, mock_bq_client, tmp_path):
+        """Test chunks of an older version of the file are deleted when it changes."""
+        source = tmp_path / "big.csv"
+        source.write_text("id\n1\n")
+        client = mock_bq_client.return_value
+        client.get_job.return_value = None
+        client.load_data_from_file.side_effect = RuntimeError("quota exceeded")
+        
+        ingestion = DataIngestion()
+        with pytest.raises(RuntimeError):
+            ingestion.ingest_large_file(str(source), "big", "raw", chunk_bytes=100, max_retries=1)
+        abandoned = client.load_data_from_file.call_args.kwargs["table_id"]
+        
+        source.write_text("id\n1\n2\n")
+        client.load_data_from_file.side_effect = lambda **kwargs: _load_job(kwargs["table_id"])
+        ingestion.ingest_large_file(str(source), "big", "raw", chunk_bytes=100)
+        
+        assert client.delete_table.call_args_list[0].args == ("raw", abandoned)
+
+
+def _load_job(table_id):
+    """Build a finished mock load job for a table."""
+    job = Mock(job_id=f"job-{table_id}", output_rows=1, output_bytes=8, created=None, ended=None)
+    job.exception.return_value = None
+    return job
 
 
 # Add more tests as needed
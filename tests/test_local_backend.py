@@ -0,0 +1,92 @@
+"""Unit tests for the local DuckDB backend."""
+
+import pytest
+from datetime import date
+from google.api_core.exceptions import Conflict, NotFound
+from src.local_backend import LocalClient, translate_query
+
+
+def test_translate_query_rewrites_tables_and_functions():
+    """Test backtick tables and BigQuery-only functions are rewritten."""
+    sql, tables = translate_query(
+        "SELECT CAST(x AS FLOAT64), PARSE_TIMESTAMP('%Y-%m-%d', TRIM(ts)), "
+        "CURRENT_TIMESTAMP() FROM `proj.staging.events` e JOIN `raw.users` u ON TRUE;"
+    )
+    
+    assert tables == {("staging", "events"), ("raw", "users")}
+    assert '"staging"."events" e' in sql
+    assert "CAST(x AS DOUBLE)" in sql
+    assert "strptime(CAST(TRIM(ts) AS VARCHAR), '%Y-%m-%d')" in sql
+    assert "CURRENT_TIMESTAMP FROM" in sql
+    assert not sql.endswith(";")
+
+
+class TestLocalClient:
+    """Test LocalClient class."""
+    
+    @pytest.fixture
+    def client(self, tmp_path):
+        """Local client with an events table loaded from CSV."""
+        pytest.importorskip("duckdb")
+        source = tmp_path / "events.csv"
+        source.write_text(
+            "id,dt\n1,2025-03-01\n2,2025-03-02\n3,2025-03-03\n4,\n"
+        )
+        client = LocalClient(warehouse_dir=str(tmp_path / "warehouse"))
+        client.load_data_from_file(str(source), "raw", "events")
+        return client
+    
+    def test_load_and_query_to_table(self, client):
+        """Test a loaded file can be queried into a new table."""
+        client.execute_query(
+            "SELECT id * 10 AS id FROM `p.raw.events` WHERE id > 1", "staging.big"
+        )
+        
+        assert client.get_table_info("staging", "big").num_rows == 3
+        assert client.dry_run_query("SELECT * FROM `raw.events`") > 0
+    
+    def test_replace_partitions_keeps_rows_outside_window(self, client):
+        """Test only the date range is replaced, NULL partitions are kept."""
+        job = client.replace_partitions(
+            "SELECT id + 100 AS id, dt FROM `raw.events`",
+            "raw.events", "dt", date(2025, 3, 2), date(2025, 3, 3)
+        )
+        
+        ids = sorted(client.query_to_arrow("SELECT id FROM `raw.events`").column("id").to_pylist())
+        assert ids == [1, 4, 102, 103]
+        assert job.num_dml_affected_rows == 4
+    
+    def test_failed_query_raises_from_result(self, client):
+        """Test errors surface from the job like a failed BigQuery job."""
+        job = client.submit_query("SELECT * FROM `raw.missing`")
+        
+        assert job.done()
+        assert isinstance(job.exception(), NotFound)
+        with pytest.raises(NotFound):
+            job.result()
+    
+    def test_query_results_stream_in_pages(self, client, tmp_path):
+        """Test results come back in page-sized batches and as Parquet."""
+        reader = client.query_to_record_batches("SELECT id FROM `raw.events` ORDER BY id", page_size=3)
+        
+        assert [batch.num_rows for batch in reader] == [3, 1]
+        frames = list(client.query_to_dataframes("SELECT id FROM `raw.events`", page_size=2))
+        assert sum(len(frame) for frame in frames) == 4
+        assert client.query_to_parquet("SELECT * FROM `raw.events`", str(tmp_path / "events.parquet")) == 4
+    
+    def test_load_job_ids_are_unique(self, client, tmp_path):
+        """Test a job ID can be looked up and cannot be submitted twice."""
+        source = tmp_path / "more.csv"
+        source.write_text("id,dt\n5,2025-03-05\n")
+        
+        job = client.load_data_from_file(
+            str(source), "raw", "events", write_disposition="WRITE_APPEND", job_id="chunk_1"
+        )
+        
+        assert client.get_job("chunk_1") is job
+        assert client.get_job("chunk_2") is None
+        with pytest.raises(Conflict):
+            client.load_data_from_file(
+                str(source), "raw", "events", write_disposition="WRITE_APPEND", job_id="chunk_1"
+            )
+        assert client.get_table_info("raw", "events").num_rows == 5
@@ -0,0 +1,65 @@
+"""Unit tests for pipeline metrics."""
+
+import json
+import pytest
+from types import SimpleNamespace
+from src.metrics import MetricsRecorder
+
+
+class TestMetricsRecorder:
+    """Test MetricsRecorder class."""
+    
+    def test_spans_nest_and_record_errors(self):
+        """Test nested spans get a parent and failures are recorded."""
+        recorder = MetricsRecorder()
+        
+        with pytest.raises(ValueError):
+            with recorder.span("pipeline"):
+                with recorder.span("transform:a.sql") as span:
+                    span.set(rows_out=10)
+                raise ValueError("boom")
+        
+        spans = {span.name: span for span in recorder.spans}
+        assert spans["transform:a.sql"].parent == "pipeline"
+        assert spans["transform:a.sql"].attributes["rows_out"] == 10
+        assert spans["pipeline"].attributes["error"] == "ValueError: boom"
+        assert spans["pipeline"].duration_seconds >= spans["transform:a.sql"].duration_seconds
+    
+    def test_record_job_copies_available_figures(self):
+        """Test job figures are copied and missing ones skipped."""
+        recorder = MetricsRecorder()
+        job = SimpleNamespace(
+            job_id="job_1", total_bytes_processed=2048, slot_millis=15, cache_hit=False
+        )
+        
+        span = recorder.record("transform:a.sql", 1.5, job=job)
+        
+        assert span.duration_seconds == 1.5
+        assert span.to_dict()["bytes_processed"] == 2048
+        assert span.to_dict()["cache_hit"] is False
+        assert "bytes_billed" not in span.attributes
+    
+    def test_load_job_output_bytes_recorded_as_written(self):
+        """Test a load job's output bytes are not reported as bytes processed."""
+        recorder = MetricsRecorder()
+        job = SimpleNamespace(job_id="load_1", output_rows=3, output_bytes=512)
+        
+        span = recorder.record("ingest:a.csv", 0.5, job=job)
+        
+        assert span.attributes["bytes_written"] == 512
+        assert "bytes_processed" not in span.attributes
+    
+    def test_export_json_and_openmetrics(self, tmp_path):
+        """Test both export formats contain every span."""
+        recorder = MetricsRecorder()
+        recorder.record('ingest:"odd".csv', 0.5, rows_out=3, cache_hit=True)
+        
+        recorder.export(str(tmp_path))
+        
+        [span] = json.loads((tmp_path / "metrics.json").read_text())
+        assert span["rows_out"] == 3
+        prom = (tmp_path / "metrics.prom").read_text()
+        assert 'pipeline_span_rows_out{span="ingest:\\"odd\\".csv"} 3' in prom
+        assert 'pipeline_span_cache_hit{span="ingest:\\"odd\\".csv"} 1' in prom
+        assert prom.endswith("# EOF\n")
+        assert "ingest:" in recorder.summary_table()
@@ -0,0 +1,81 @@
+"""Unit tests for the key-partitioned process pool executor."""
+
+import numpy as np
+import pandas as pd
+from src.parallel import PartitionedExecutor, split_by_key
+
+
+def revenue_per_country(payments, scale=1):
+    """Revenue and distinct payers per country (runs in the workers)."""
+    return payments.groupby("country").agg(
+        revenue=("amount", lambda amount: amount.sum() * scale),
+        payers=("user_id", "nunique"),
+    ).reset_index()
+
+
+def combine_partials(partials):
+    """Sum partial results computed on disjoint users."""
+    return partials.groupby("country")[["revenue", "payers"]].sum().reset_index()
+
+
+def make_payments(rows=2000, seed=0):
+    """Random payments over 300 users."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "user_id": pd.Series(rng.integers(0, 300, rows)).map("U{}".format),
+        "country": rng.choice(["SE", "ES", "US", "DE"], rows),
+        "amount": rng.integers(1, 100, rows),
+    })
+
+
+class TestSplitByKey:
+    """Test hash partitioning."""
+    
+    def test_keys_stay_together_in_order(self):
+        """Test every key is in one partition and rows keep their order."""
+        payments = make_payments()
+        
+        parts = split_by_key(payments, "user_id", 4)
+        
+        assert sum(len(part) for part in parts) == len(payments)
+        owners = {}
+        for i, part in enumerate(parts):
+            assert part.index.is_monotonic_increasing
+            for user_id in part["user_id"].unique():
+                assert owners.setdefault(user_id, i) == i
+    
+    def test_partitioning_is_deterministic(self):
+        """Test the same keys map to the same partitions on every call."""
+        payments = make_payments()
+        
+        first = [part.index.tolist() for part in split_by_key(payments, "user_id", 3)]
+        second = [part.index.tolist() for part in split_by_key(payments, "user_id", 3)]
+        
+        assert first == second
+
+
+class TestPartitionedExecutor:
+    """Test PartitionedExecutor class."""
+    
+    def test_matches_single_process_result(self):
+        """Test combined partition results equal the aggregation of all rows."""
+        payments = make_payments()
+        expected = revenue_per_country(payments, scale=2)
+        
+        result = PartitionedExecutor(max_workers=3).map_partitions(
+            revenue_per_country, payments, "user_id",
+            combine=combine_partials, sort_by=["country"], scale=2
+        )
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_single_worker_runs_in_process(self):
+        """Test one worker skips the pool and still sorts the result."""
+        payments = make_payments()
+        
+        result = PartitionedExecutor(max_workers=1).map_partitions(
+            lambda frame: revenue_per_country(frame).iloc[::-1], payments, "user_id",
+            sort_by=["country"]
+        )
+        
+        pd.testing.assert_frame_equal(result, revenue_per_country(payments))
@@ -0,0 +1,85 @@
+"""Unit tests for the query result cache."""
+
+import pyarrow as pa
+from unittest.mock import patch
+from src.query_cache import (
+    QueryResultCache, is_cacheable, make_cache_key, normalize_query, table_references
+)
+
+
+def _table(n):
+    """Arrow table with n int64 rows."""
+    return pa.table({"x": list(range(n))})
+
+
+class TestCacheKeys:
+    """Test query normalization and keys."""
+    
+    def test_normalize_ignores_formatting_but_not_literals(self):
+        """Test whitespace and comments are ignored outside quotes."""
+        a = "SELECT  *\nFROM `p.d.t` -- comment\nWHERE s = 'a  b';"
+        b = "SELECT * FROM `p.d.t` WHERE s = 'a  b'"
+        c = "SELECT * FROM `p.d.t` WHERE s = 'a b'"
+        
+        assert normalize_query(a) == normalize_query(b)
+        assert normalize_query(b) != normalize_query(c)
+    
+    def test_key_depends_on_params_and_table_versions(self):
+        """Test params and table modification times change the key."""
+        base = make_cache_key("SELECT 1", {"d": "2025-01-01"}, {"p.d.t": "v1"})
+        
+        assert base == make_cache_key("SELECT  1", {"d": "2025-01-01"}, {"p.d.t": "v1"})
+        assert base != make_cache_key("SELECT 1", {"d": "2025-01-02"}, {"p.d.t": "v1"})
+        assert base != make_cache_key("SELECT 1", {"d": "2025-01-01"}, {"p.d.t": "v2"})
+    
+    def test_nondeterministic_queries_not_cacheable(self):
+        """Test queries using the current time are not cached."""
+        assert not is_cacheable("SELECT CURRENT_TIMESTAMP() AS processed_at")
+        assert is_cacheable("SELECT 'CURRENT_DATE' AS label")
+    
+    def test_table_references_include_unquoted_tables(self):
+        """Test unquoted dataset.table names count as inputs and CTEs do not."""
+        query = (
+            "WITH recent AS (SELECT * FROM staging.events) "
+            "SELECT * FROM recent r JOIN `p.raw.users` u ON TRUE, prod.daily d, UNNEST(r.tags) "
+            "WHERE r.note != 'from nowhere'"
+        )
+        
+        assert table_references(query) == {"staging.events", "p.raw.users", "prod.daily"}
+        assert table_references("SELECT * FROM events") is None
+
+
+class TestQueryResultCache:
+    """Test QueryResultCache class."""
+    
+    def test_lru_eviction_by_size(self):
+        """Test the least recently used entry is evicted first."""
+        cache = QueryResultCache(max_bytes=_table(10).nbytes * 2)
+        cache.put("a", _table(10))
+        cache.put("b", _table(10))
+        cache.get("a")
+        cache.put("c", _table(10))
+        
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+    
+    @patch('src.query_cache.time.time')
+    def test_ttl_expiry(self, mock_time):
+        """Test entries expire after the TTL."""
+        mock_time.return_value = 1000.0
+        cache = QueryResultCache(ttl_seconds=60)
+        cache.put("a", _table(3))
+        
+        mock_time.return_value = 1059.0
+        assert cache.get("a") is not None
+        mock_time.return_value = 1061.0
+        assert cache.get("a") is None
+    
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Test results persisted to disk are found by a fresh cache."""
+        QueryResultCache(disk_dir=str(tmp_path)).put("a", _table(5))
+        
+        cached = QueryResultCache(disk_dir=str(tmp_path)).get("a")
+        
+        assert cached.equals(_table(5))
@@ -0,0 +1,195 @@
+"""Unit tests for the streaming level 1 reference solution."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from exercises.streaming_level_1.reference_solution import (
+    SensorFileSource,
+    StreamingDeviceStats,
+    compute_sliding_window_stats,
+    create_sliding_windows,
+)
+
+
+def _per_window_stats(events, window_length_minutes=5, slide_minutes=1):
+    """Sliding window stats computed with the original per-window loop."""
+    results = []
+    for window_start, window_end in create_sliding_windows(
+        events['ts'].min(), events['ts'].max(), window_length_minutes, slide_minutes
+    ):
+        in_window = events[(events['ts'] >= window_start) & (events['ts'] < window_end)]
+        for device_id, group in in_window.groupby('device_id'):
+            results.append({
+                'device_id': device_id,
+                'window_start': window_start,
+                'window_end': window_end,
+                'avg_temp': round(group['temperature'].mean(), 2),
+                'event_count': len(group),
+                'min_temp': group['temperature'].min(),
+                'max_temp': group['temperature'].max()
+            })
+    output = pd.DataFrame(results)
+    return output.sort_values(['window_start', 'device_id']).reset_index(drop=True)
+
+
+def _random_events(seed, n=2000, decimals=1):
+    """Unordered events over five hours with some missing temperatures."""
+    rng = np.random.default_rng(seed)
+    events = pd.DataFrame({
+        'device_id': rng.choice(['device_001', 'device_002', 'device_003'], size=n),
+        'ts': pd.Timestamp('2025-03-01 10:00:00') + pd.to_timedelta(rng.integers(0, 5 * 3600, size=n), unit='s'),
+        'temperature': rng.integers(15 * 10 ** decimals, 30 * 10 ** decimals, size=n) / 10 ** decimals,
+    })
+    events.loc[rng.random(n) < 0.05, 'temperature'] = np.nan
+    return events
+
+
+class TestComputeSlidingWindowStats:
+    """Test compute_sliding_window_stats function."""
+    
+    def test_matches_per_window_loop(self):
+        """Test pane aggregation gives the loop's rows, including half-cent averages.
+        
+        One-decimal temperatures make averages of two or four values land on
+        half-cents often, where a differently ordered sum can round the other way.
+        """
+        for seed, decimals in [(1, 1), (2, 2)]:
+            events = _random_events(seed, decimals=decimals)
+            for window_length, slide in [(5, 1), (10, 4)]:
+                pd.testing.assert_frame_equal(
+                    compute_sliding_window_stats(events, window_length, slide),
+                    _per_window_stats(events, window_length, slide),
+                    check_dtype=False
+                )
+
+
+
+def _event(event_id, minute, second=0, device_id='device_001', temperature=20.0):
+    """One sensor event on 2025-03-01, minutes after 10:00."""
+    return {
+        'event_id': event_id,
+        'device_id': device_id,
+        'ts': pd.Timestamp('2025-03-01 10:00:00') + pd.Timedelta(minutes=minute, seconds=second),
+        'temperature': temperature,
+    }
+
+
+def _write_sensor_file(path, indexes, append=False):
+    """Write (or append) one event every 15 seconds, alternating two devices."""
+    with open(path, 'a' if append else 'w') as f:
+        if not append:
+            f.write('device_id,ts,temperature,humidity,event_id\n')
+        for i in indexes:
+            ts = pd.Timestamp('2025-03-01 10:00:00', tz='UTC') + pd.Timedelta(seconds=15 * i)
+            f.write(f"device_00{i % 2 + 1},{ts.isoformat()},{20 + i % 7 / 4},45.0,sensor_{i}\n")
+    return str(path)
+
+
+class TestStreamingDeviceStats:
+    """Test StreamingDeviceStats class."""
+    
+    def test_append_matches_batch_on_slide_aligned_data(self):
+        """Test APPEND emits the batch windows once each when windows line up."""
+        rng = np.random.default_rng(5)
+        seconds = np.sort(rng.integers(1, 2 * 3600, size=1500))
+        # Quarter degrees add exactly, so pane and per-window sums agree
+        events = pd.DataFrame({
+            'event_id': [f'evt_{i}' for i in range(len(seconds))],
+            'device_id': rng.choice(['device_001', 'device_002'], size=len(seconds)),
+            'ts': pd.Timestamp('2025-03-01 10:00:00') + pd.to_timedelta(seconds, unit='s'),
+            'temperature': rng.integers(60, 120, size=len(seconds)) / 4,
+        })
+        events.loc[0, 'ts'] = pd.Timestamp('2025-03-01 10:00:00')
+        
+        processor = StreamingDeviceStats(output_mode='append')
+        rows = pd.DataFrame(list(processor.run(events.to_dict('records'))))
+        
+        assert not rows.duplicated(['device_id', 'window_start']).any()
+        # Streaming also emits the windows that start before the first event
+        rows = rows[rows['window_start'] >= events['ts'].min()]
+        rows = rows.sort_values(['window_start', 'device_id']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(rows, compute_sliding_window_stats(events), check_dtype=False)
+        assert processor.counters['late_dropped'] == 0
+    
+    def test_late_and_duplicate_events_are_dropped_and_counted(self):
+        """Test events behind the watermark and repeated ids are counted, not aggregated."""
+        processor = StreamingDeviceStats(watermark_minutes=10, output_mode='append')
+        events = [
+            _event('evt_1', 0),
+            _event('evt_2', 20),
+            _event('evt_3', 5),
+            _event('evt_2', 20, 30),
+            _event('evt_4', 12),
+        ]
+        rows = [row for event in events for row in processor.process(event)] + processor.close()
+        
+        assert processor.counters['late_dropped'] == 1
+        assert processor.counters['duplicates'] == 1
+        assert processor.counters['events'] == 5
+        assert sum(row['event_count'] for row in rows) == 3 * 5
+    
+    def test_update_mode_re_emits_changed_windows(self):
+        """Test UPDATE emits a window again with new aggregates after a later event."""
+        processor = StreamingDeviceStats(output_mode='update')
+        first = processor.process(_event('evt_1', 0, 30, temperature=20.0))
+        assert processor.process(_event('evt_2', 0, 45, temperature=22.0)) == []
+        second = processor.process(_event('evt_3', 1, 10, temperature=30.0))
+        
+        window = pd.Timestamp('2025-03-01 10:00:00')
+        before = next(row for row in first if row['window_start'] == window)
+        after = next(row for row in second if row['window_start'] == window)
+        assert (before['event_count'], before['avg_temp']) == (1, 20.0)
+        assert (after['event_count'], after['avg_temp'], after['max_temp']) == (3, 24.0, 30.0)
+    
+    def test_state_stays_bounded_as_the_stream_advances(self):
+        """Test open panes and dedup keys stop growing once eviction starts."""
+        processor = StreamingDeviceStats(watermark_minutes=10, output_mode='append')
+        sizes = []
+        for second in range(0, 6 * 3600, 5):
+            for device_id in ('device_001', 'device_002'):
+                processor.process(_event(f'{device_id}_{second}', 0, second, device_id))
+            sizes.append(processor.state_size())
+        
+        # Two devices, at most watermark + window + one slide of one-minute panes
+        assert max(size['panes'] for size in sizes) <= 2 * (10 + 5 + 1)
+        # 24 ids a minute, kept for at most two watermark-long segments
+        first_hour = max(size['dedup_keys'] for size in sizes[:720])
+        assert first_hour <= 24 * (2 * 10 + 2)
+        assert max(size['dedup_keys'] for size in sizes) <= first_hour
+        assert processor.counters['panes_evicted'] > 0
+    
+    def test_resume_after_kill_emits_the_rest_of_the_stream(self, tmp_path):
+        """Test a run killed mid-stream resumes from its checkpoint with the same output."""
+        events_path = _write_sensor_file(tmp_path / 'events.csv', range(600))
+        expected = list(StreamingDeviceStats(output_mode='append').run(SensorFileSource(events_path)))
+        
+        checkpoint_dir = str(tmp_path / 'checkpoint')
+        processor = StreamingDeviceStats(output_mode='append')
+        for emitted, _ in enumerate(processor.run(SensorFileSource(events_path), checkpoint_dir, checkpoint_every=50), 1):
+            if emitted == 100:
+                break
+        
+        restored = StreamingDeviceStats.restore(checkpoint_dir)
+        assert 0 < restored.offset < 600
+        resumed = list(restored.run(SensorFileSource(events_path, restored.source_offset), checkpoint_dir))
+        
+        assert resumed == expected[len(expected) - len(resumed):]
+        assert restored.counters['events'] == 600
+    
+    def test_resume_after_end_of_stream_accepts_appended_events(self, tmp_path):
+        """Test a finished run's checkpoint still takes events appended to the file."""
+        events_path = _write_sensor_file(tmp_path / 'events.csv', range(300))
+        checkpoint_dir = str(tmp_path / 'checkpoint')
+        first = list(StreamingDeviceStats(output_mode='append').run(SensorFileSource(events_path), checkpoint_dir))
+        
+        _write_sensor_file(events_path, range(300, 600), append=True)
+        restored = StreamingDeviceStats.restore(checkpoint_dir)
+        second = list(restored.run(SensorFileSource(events_path, restored.source_offset), checkpoint_dir))
+        
+        assert restored.counters['late_dropped'] == 0
+        upserted = {(row['device_id'], row['window_start']): row for row in first + second}
+        expected = list(StreamingDeviceStats(output_mode='append').run(SensorFileSource(events_path)))
+        assert upserted == {(row['device_id'], row['window_start']): row for row in expected}
+        
+        with pytest.raises(ValueError):
+            restored.checkpoint(checkpoint_dir)
@@ -0,0 +1,104 @@
+"""Unit tests for SQL templates."""
+
+import os
+import pytest
+from datetime import date, datetime, timezone
+from src.templates import SQLTemplate, TemplateCache, inline_parameters
+
+SQL = """-- Placeholders in comments are text: ${DATASET}, don't parameterize
+SELECT '${LABEL}' AS label
+FROM `${GCP_PROJECT_ID}.${DATASET}.events`
+WHERE dt BETWEEN ${START} AND ${END} AND n > ${MIN_N} AND ${EXTRA}
+"""
+
+
+class TestSQLTemplate:
+    """Test SQLTemplate class."""
+    
+    def test_placeholders_found_once(self):
+        """Test every placeholder name is reported."""
+        template = SQLTemplate(SQL)
+        
+        assert template.placeholders == {
+            "LABEL", "GCP_PROJECT_ID", "DATASET", "START", "END", "MIN_N", "EXTRA"
+        }
+    
+    def test_compile_parameterizes_typed_values(self):
+        """Test typed standalone values become parameters and the text stays fixed."""
+        params = {
+            "LABEL": "daily", "GCP_PROJECT_ID": "proj", "DATASET": "staging",
+            "START": date(2025, 3, 1), "END": date(2025, 3, 3), "MIN_N": 5, "EXTRA": "TRUE",
+        }
+        
+        query, query_parameters = SQLTemplate(SQL).compile(params)
+        later, _ = SQLTemplate(SQL).compile({**params, "START": date(2025, 3, 2)})
+        
+        assert query == later
+        assert "`proj.staging.events`" in query
+        assert "'daily' AS label" in query
+        assert "BETWEEN @START AND @END AND n > @MIN_N AND TRUE" in query
+        assert [(p.name, p.type_, p.value) for p in query_parameters] == [
+            ("START", "DATE", date(2025, 3, 1)),
+            ("END", "DATE", date(2025, 3, 3)),
+            ("MIN_N", "INT64", 5),
+        ]
+    
+    def test_render_uses_literals(self):
+        """Test text rendering writes typed values as SQL literals."""
+        template = SQLTemplate("SELECT ${TS}, ${FLAG}, ${D}")
+        
+        rendered = template.render({
+            "TS": datetime(2025, 3, 1, tzinfo=timezone.utc), "FLAG": False, "D": date(2025, 3, 1)
+        })
+        
+        assert rendered == "SELECT TIMESTAMP '2025-03-01T00:00:00+00:00', FALSE, DATE '2025-03-01'"
+    
+    def test_unresolved_placeholders_fail(self):
+        """Test a missing value raises instead of leaving ${...} in the SQL."""
+        with pytest.raises(ValueError, match="END, EXTRA"):
+            SQLTemplate(SQL).compile({
+                "LABEL": "x", "GCP_PROJECT_ID": "p", "DATASET": "d", "START": 1, "MIN_N": 1
+            })
+    
+    def test_placeholders_only_in_comments_are_optional(self):
+        """Test a placeholder mentioned only in a comment needs no value."""
+        template = SQLTemplate("-- Runs daily for ${REGION}\n/* ${OWNER} */ SELECT ${N}")
+        
+        assert template.placeholders == {"N"}
+        assert template.render({"N": 1}) == "-- Runs daily for ${REGION}\n/* ${OWNER} */ SELECT 1"
+        assert template.compile({"N": 1, "REGION": "eu"})[0] == "-- Runs daily for eu\n/* ${OWNER} */ SELECT @N"
+    
+    def test_inline_parameters(self):
+        """Test parameters can be turned back into literals for local engines."""
+        query, query_parameters = SQLTemplate("WHERE d = ${D} AND e = ${DE}").compile(
+            {"D": date(2025, 3, 1), "DE": 2}
+        )
+        
+        assert inline_parameters(query, query_parameters) == "WHERE d = DATE '2025-03-01' AND e = 2"
+    
+    def test_inline_parameters_skips_literals_and_comments(self):
+        """Test @name inside strings, backticks or comments is not a parameter reference."""
+        query, query_parameters = SQLTemplate(
+            "SELECT '@D', \"@D\", `@D` -- @D\nWHERE d = ${D}"
+        ).compile({"D": date(2025, 3, 1)})
+        
+        assert inline_parameters(query, query_parameters) == (
+            "SELECT '@D', \"@D\", `@D` -- @D\nWHERE d = DATE '2025-03-01'"
+        )
+
+
+class TestTemplateCache:
+    """Test TemplateCache class."""
+    
+    def test_reparses_only_when_file_changes(self, tmp_path):
+        """Test a file is parsed once until its mtime changes."""
+        path = tmp_path / "model.sql"
+        path.write_text("SELECT ${A}")
+        cache = TemplateCache()
+        
+        first = cache.get(str(path))
+        assert cache.get(str(path)) is first
+        
+        path.write_text("SELECT ${B}")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+        assert cache.get(str(path)).placeholders == {"B"}
@@ -0,0 +1,118 @@
+"""Unit tests for data transformation."""
+
+import pytest
+from datetime import date
+from unittest.mock import patch
+from src.config import Config
+from src.transformation import DataTransformation
+
+
+INCREMENTAL_SQL = """-- materialized: incremental
+-- partition_by: dt
+-- lookback_days: 2
+SELECT DATE(ts) AS dt FROM `${GCP_PROJECT_ID}.staging.events`
+WHERE DATE(ts) BETWEEN ${PARTITION_START} AND ${PARTITION_END}
+"""
+
+
+class TestDataTransformation:
+    """Test DataTransformation class."""
+    
+    @pytest.fixture
+    def sql_dir(self, tmp_path, monkeypatch):
+        """Point the SQL directory at a temporary incremental model."""
+        (tmp_path / "prod_daily.sql").write_text(INCREMENTAL_SQL)
+        monkeypatch.setattr(Config, "SQL_DIR", tmp_path)
+        monkeypatch.setattr(Config, "GCP_PROJECT_ID", "proj")
+        return tmp_path
+    
+    @patch('src.transformation.BigQueryClient')
+    def test_incremental_replaces_lookback_window(self, mock_bq_client, sql_dir):
+        """Test an existing incremental table only recomputes its window."""
+        client = mock_bq_client.return_value
+        client.table_exists.return_value = True
+        client.compile_sql_file.return_value = ("SELECT 1", ["window"])
+        
+        transformation = DataTransformation()
+        transformation.run_transformation(
+            "prod_daily.sql", "production.daily", run_date=date(2025, 3, 10)
+        )
+        
+        client.execute_query.assert_not_called()
+        client.delete_table.assert_not_called()
+        _, destination, column, start, end = client.replace_partitions.call_args.args
+        assert (destination, column, start, end) == (
+            "production.daily", "dt", date(2025, 3, 8), date(2025, 3, 10)
+        )
+        assert client.replace_partitions.call_args.kwargs["query_parameters"] == ["window"]
+        params = client.compile_sql_file.call_args.args[1]
+        assert params["PARTITION_START"] == date(2025, 3, 8)
+        assert params["GCP_PROJECT_ID"] == "proj"
+    
+    @patch('src.transformation.BigQueryClient')
+    def test_incremental_first_run_builds_partitioned_table(self, mock_bq_client, sql_dir):
+        """Test a missing incremental table is built in full, partitioned."""
+        client = mock_bq_client.return_value
+        client.table_exists.return_value = False
+        client.compile_sql_file.return_value = ("SELECT 1", [])
+        
+        transformation = DataTransformation()
+        transformation.run_transformation("prod_daily.sql", "production.daily")
+        
+        client.replace_partitions.assert_not_called()
+        assert client.execute_query.call_args.kwargs["time_partitioning_field"] == "dt"
+    
+    @patch('src.transformation.BigQueryClient')
+    def test_existing_unpartitioned_table_is_rebuilt_partitioned(self, mock_bq_client, sql_dir):
+        """Test a table without the model's partitioning is dropped and built in full."""
+        client = mock_bq_client.return_value
+        client.table_exists.side_effect = [True, False]
+        client.is_partitioned_by.return_value = False
+        client.compile_sql_file.return_value = ("SELECT 1", [])
+        
+        transformation = DataTransformation()
+        transformation.run_transformation(
+            "prod_daily.sql", "production.daily", run_date=date(2025, 3, 10)
+        )
+        
+        client.is_partitioned_by.assert_called_once_with("production", "daily", "dt")
+        client.delete_table.assert_called_once_with("production", "daily")
+        client.replace_partitions.assert_not_called()
+        assert client.execute_query.call_args.kwargs["time_partitioning_field"] == "dt"
+        params = client.compile_sql_file.call_args.args[1]
+        assert params["PARTITION_START"] == date.min
+    
+    @patch('src.transformation.BigQueryClient')
+    def test_estimate_costs_dry_runs_rendered_window(self, mock_bq_client, sql_dir):
+        """Test estimates use the incremental window and tolerate failed dry runs."""
+        (sql_dir / "staging_events.sql").write_text("SELECT * FROM `raw_data.events`")
+        client = mock_bq_client.return_value
+        client.table_exists.return_value = True
+        client.render_sql_file.side_effect = lambda path, params: path
+        client.dry_run_query.side_effect = [1000, Exception("Not found: staging.events")]
+        
+        transformation = DataTransformation()
+        estimates = transformation.estimate_costs(run_date=date(2025, 3, 10))
+        
+        assert estimates == {"staging_events.sql": 1000, "prod_daily.sql": None}
+        client.execute_query.assert_not_called()
+        params = client.render_sql_file.call_args_list[1].args[1]
+        assert params["PARTITION_START"] == date(2025, 3, 8)
+    
+    @patch('src.transformation.BigQueryClient')
+    def test_production_tier_runs_incremental_models(self, mock_bq_client, sql_dir):
+        """Test tier runs resolve the partition window and MERGE incremental models."""
+        client = mock_bq_client.return_value
+        client.table_exists.return_value = True
+        client.compile_sql_file.return_value = ("SELECT 1", [])
+        
+        transformation = DataTransformation()
+        transformation.run_production_transformations(run_date=date(2025, 3, 10))
+        
+        client.execute_query.assert_not_called()
+        client.submit_query_from_file.assert_not_called()
+        assert client.replace_partitions.call_args.args[1] == "production.daily"
+        params = client.compile_sql_file.call_args.args[1]
+        assert (params["PARTITION_START"], params["PARTITION_END"]) == (
+            date(2025, 3, 8), date(2025, 3, 10)
+        )